@@ -0,0 +1,130 @@
+/* Asynchronous AXI Stream FIFO.
+ * Carries tdata/tlast beats from the s_aclk domain to the m_aclk domain.
+ * The read and write pointers cross the clock boundary as gray code
+ * through two synchroniser flops, so the full and empty flags are
+ * pessimistic by the synchroniser latency but never wrong.
+ *
+ * Each side reports the occupancy it sees, which lags the other side's
+ * updates by the same latency; the write side's view is the one that
+ * decides backpressure, so its high-water mark sizes the FIFO.
+ */
+
+`timescale 1ns/1ns
+`default_nettype none
+
+module abp_async_fifo
+#(
+   // Width of AXI Stream interfaces in bits
+   parameter integer DATA_WIDTH = 8,
+   // Number of beats the FIFO holds, a power of two of at least 4
+   parameter integer DEPTH = 16
+)
+(
+   // Write side
+   input  wire                     s_aclk,
+   input  wire                     s_aresetn,
+   input  wire                     s_axis_tvalid,
+   input  wire [DATA_WIDTH-1:0]    s_axis_tdata,
+   input  wire                     s_axis_tlast,
+   output wire                     s_axis_tready,
+   output wire [$clog2(DEPTH):0]   s_occupancy,
+
+   // Read side
+   input  wire                     m_aclk,
+   input  wire                     m_aresetn,
+   output wire                     m_axis_tvalid,
+   output wire [DATA_WIDTH-1:0]    m_axis_tdata,
+   output wire                     m_axis_tlast,
+   input  wire                     m_axis_tready,
+   output wire [$clog2(DEPTH):0]   m_occupancy
+);
+
+   localparam integer AddrBits = $clog2(DEPTH);
+
+   initial begin
+      if (DEPTH < 4 || (DEPTH & (DEPTH - 1)) != 0) begin
+         $error("abp_async_fifo: DEPTH must be a power of two of at least 4");
+      end
+   end
+
+   function automatic [AddrBits:0] gray_to_bin(input [AddrBits:0] gray);
+      integer i;
+      begin
+         gray_to_bin[AddrBits] = gray[AddrBits];
+         for (i = AddrBits - 1; i >= 0; i = i - 1) begin
+            gray_to_bin[i] = gray_to_bin[i + 1] ^ gray[i];
+         end
+      end
+   endfunction
+
+   // Beats with tlast in the top bit
+   reg [DATA_WIDTH:0] mem [0:DEPTH-1];
+
+   // Binary and gray pointers of each side, and the other side's gray
+   // pointer after the synchroniser
+   reg [AddrBits:0] wr_ptr_reg = {AddrBits+1{1'b0}};
+   reg [AddrBits:0] wr_ptr_gray_reg = {AddrBits+1{1'b0}};
+   (* ASYNC_REG = "TRUE" *) reg [AddrBits:0] rd_ptr_gray_meta_reg = {AddrBits+1{1'b0}};
+   (* ASYNC_REG = "TRUE" *) reg [AddrBits:0] rd_ptr_gray_sync_reg = {AddrBits+1{1'b0}};
+
+   reg [AddrBits:0] rd_ptr_reg = {AddrBits+1{1'b0}};
+   reg [AddrBits:0] rd_ptr_gray_reg = {AddrBits+1{1'b0}};
+   (* ASYNC_REG = "TRUE" *) reg [AddrBits:0] wr_ptr_gray_meta_reg = {AddrBits+1{1'b0}};
+   (* ASYNC_REG = "TRUE" *) reg [AddrBits:0] wr_ptr_gray_sync_reg = {AddrBits+1{1'b0}};
+
+   // Write domain
+   wire [AddrBits:0] wr_ptr_next = wr_ptr_reg + 1;
+   wire              full = wr_ptr_gray_reg == {~rd_ptr_gray_sync_reg[AddrBits:AddrBits-1], rd_ptr_gray_sync_reg[AddrBits-2:0]};
+   wire              write = s_axis_tvalid && s_axis_tready;
+
+   assign s_axis_tready = !full && s_aresetn;
+   assign s_occupancy = wr_ptr_reg - gray_to_bin(rd_ptr_gray_sync_reg);
+
+   always_ff @(posedge s_aclk) begin
+      if (write) begin
+         mem[wr_ptr_reg[AddrBits-1:0]] <= {s_axis_tlast, s_axis_tdata};
+      end
+   end
+
+   always_ff @(posedge s_aclk) begin
+      if (!s_aresetn) begin
+         wr_ptr_reg <= {AddrBits+1{1'b0}};
+         wr_ptr_gray_reg <= {AddrBits+1{1'b0}};
+         rd_ptr_gray_meta_reg <= {AddrBits+1{1'b0}};
+         rd_ptr_gray_sync_reg <= {AddrBits+1{1'b0}};
+      end else begin
+         if (write) begin
+            wr_ptr_reg <= wr_ptr_next;
+            wr_ptr_gray_reg <= wr_ptr_next ^ (wr_ptr_next >> 1);
+         end
+         rd_ptr_gray_meta_reg <= rd_ptr_gray_reg;
+         rd_ptr_gray_sync_reg <= rd_ptr_gray_meta_reg;
+      end
+   end
+
+   // Read domain
+   wire [AddrBits:0] rd_ptr_next = rd_ptr_reg + 1;
+   wire              empty = rd_ptr_gray_reg == wr_ptr_gray_sync_reg;
+   wire              read = m_axis_tvalid && m_axis_tready;
+
+   assign m_axis_tvalid = !empty && m_aresetn;
+   assign {m_axis_tlast, m_axis_tdata} = mem[rd_ptr_reg[AddrBits-1:0]];
+   assign m_occupancy = gray_to_bin(wr_ptr_gray_sync_reg) - rd_ptr_reg;
+
+   always_ff @(posedge m_aclk) begin
+      if (!m_aresetn) begin
+         rd_ptr_reg <= {AddrBits+1{1'b0}};
+         rd_ptr_gray_reg <= {AddrBits+1{1'b0}};
+         wr_ptr_gray_meta_reg <= {AddrBits+1{1'b0}};
+         wr_ptr_gray_sync_reg <= {AddrBits+1{1'b0}};
+      end else begin
+         if (read) begin
+            rd_ptr_reg <= rd_ptr_next;
+            rd_ptr_gray_reg <= rd_ptr_next ^ (rd_ptr_next >> 1);
+         end
+         wr_ptr_gray_meta_reg <= wr_ptr_gray_reg;
+         wr_ptr_gray_sync_reg <= wr_ptr_gray_meta_reg;
+      end
+   end
+
+endmodule
@@ -0,0 +1,291 @@
+/* Alternating bit protocol: multi-session engine.
+ * Runs SESSIONS independent ABP session engines (abp_receiver or
+ * abp_transmitter, selected by ROLE) over a single AXI Stream pair.
+ *
+ * Every frame on the shared link is prefixed with a one-beat header
+ * carrying the session ID, followed by the unchanged ABP frame:
+ *
+ *    | session ID | PACKET_SIZE bytes of ABP frame |
+ *
+ * Incoming frames are demultiplexed on the header beat and cut through to
+ * their session; frames for an unknown session are discarded. Outgoing
+ * frames are arbitrated round-robin between sessions, one whole frame per
+ * grant, and tagged with the header of the session that sent them. Each
+ * session keeps its own ABP state, so the protocol is unchanged per session.
+ */
+
+`timescale 1ns/1ns
+`default_nettype none
+
+module abp_mux
+#(
+   // Width of AXI Stream interfaces in bits
+   parameter integer DATA_WIDTH = 8,
+   // Number of bytes to read from packet to counter
+   parameter integer VALUE_SIZE = 4,
+   // Number of bytes in a packet, excluding the session header
+   parameter integer PACKET_SIZE = 64,
+   // Number of independent sessions
+   parameter integer SESSIONS = 4,
+   // Session engine: "RECEIVER" or "TRANSMITTER"
+   parameter ROLE = "RECEIVER",
+   // Transmitter timeout, only used with ROLE = "TRANSMITTER"
+   parameter integer TIMEOUT_CYCLES = 1200,
+   // Number of values packed into each packet
+   parameter integer BATCH_SIZE = 1,
+   // Frames allowed in flight per session (1 = plain ABP)
+   parameter integer WINDOW_SIZE = 1,
+   // Width of the sequence number carried in the last byte
+   parameter integer SEQ_BITS = 1,
+   // Width of the performance counters
+   parameter integer COUNTER_WIDTH = 32
+)
+(
+   input wire                      aclk,
+   input wire                      aresetn,
+
+   // Slave AXI Stream interface (shared link in)
+   input  wire                     s_axis_tvalid,
+   input  wire [DATA_WIDTH-1:0]    s_axis_tdata,
+   input  wire                     s_axis_tlast,
+   output wire                     s_axis_tready,
+
+   // Master AXI Stream interface (shared link out)
+   output wire                     m_axis_tvalid,
+   output wire [DATA_WIDTH-1:0]    m_axis_tdata,
+   output wire                     m_axis_tlast,
+   input  wire                     m_axis_tready,
+
+   // Performance counters (free-running, wrap at 2**COUNTER_WIDTH)
+   output wire [COUNTER_WIDTH-1:0] stat_cycles,
+   output wire [COUNTER_WIDTH-1:0] stat_frames_received,
+   output wire [COUNTER_WIDTH-1:0] stat_frames_sent,
+   output wire [COUNTER_WIDTH-1:0] stat_unknown_sessions,
+   output wire [COUNTER_WIDTH-1:0] stat_stall_cycles
+);
+
+   localparam integer SessionBits = SESSIONS > 1 ? $clog2(SESSIONS) : 1;
+
+   initial begin
+      if (SESSIONS < 1 || SESSIONS > (1 << DATA_WIDTH)) begin
+         $error("abp_mux: SESSIONS must fit in one header beat");
+      end
+      if (ROLE != "RECEIVER" && ROLE != "TRANSMITTER") begin
+         $error("abp_mux: ROLE must be \"RECEIVER\" or \"TRANSMITTER\"");
+      end
+   end
+
+   // Session engine streams, session i in bit i / slice i
+   wire [SESSIONS-1:0]            engine_s_tvalid;
+   wire [SESSIONS-1:0]            engine_s_tready;
+   wire [SESSIONS-1:0]            engine_m_tvalid;
+   wire [SESSIONS*DATA_WIDTH-1:0] engine_m_tdata;
+   wire [SESSIONS-1:0]            engine_m_tlast;
+   wire [SESSIONS-1:0]            engine_m_tready;
+
+   // Ingress: the header beat selects the session for the rest of the frame
+   reg                       rx_header_reg = 1'b1;
+   reg  [DATA_WIDTH-1:0]     rx_session_reg = {DATA_WIDTH{1'b0}};
+   wire                      rx_known;
+
+   assign rx_known = rx_session_reg < SESSIONS;
+   assign s_axis_tready = rx_header_reg || !rx_known || engine_s_tready[rx_session_reg[SessionBits-1:0]];
+
+   always_ff @(posedge aclk) begin
+      if (!aresetn) begin
+         rx_header_reg <= 1'b1;
+         rx_session_reg <= {DATA_WIDTH{1'b0}};
+      end else if (s_axis_tvalid && s_axis_tready) begin
+         if (rx_header_reg) begin
+            rx_session_reg <= s_axis_tdata;
+         end
+         rx_header_reg <= s_axis_tlast;
+      end
+   end
+
+   // Egress: round-robin over sessions with a frame ready, one frame per grant
+   typedef enum logic [1:0] {
+      TX_IDLE,
+      TX_HEADER,
+      TX_BODY
+   } tx_state_t;
+
+   tx_state_t tx_state_reg = TX_IDLE;
+   reg  [SessionBits-1:0]    grant_reg = SESSIONS - 1;
+   wire [DATA_WIDTH-1:0]     grant_id;
+   wire [SESSIONS-1:0]       grant_mask;
+   wire [SESSIONS-1:0]       requests;
+   reg  [SessionBits-1:0]    pick;
+   reg                       pick_valid;
+   integer                   rr_index;
+
+   assign grant_id = grant_reg;
+
+   // The session finishing its frame waits for the next round
+   assign requests = engine_m_tvalid & ~(tx_state_reg == TX_BODY ? grant_mask : {SESSIONS{1'b0}});
+
+   always_comb begin
+      pick = grant_reg;
+      pick_valid = 1'b0;
+      rr_index = 0;
+      for (int k = 1; k <= SESSIONS; k++) begin
+         rr_index = grant_reg + k;
+         if (rr_index >= SESSIONS) begin
+            rr_index = rr_index - SESSIONS;
+         end
+         if (!pick_valid && requests[rr_index]) begin
+            pick_valid = 1'b1;
+            pick = rr_index[SessionBits-1:0];
+         end
+      end
+   end
+
+   always_ff @(posedge aclk) begin
+      if (!aresetn) begin
+         tx_state_reg <= TX_IDLE;
+         grant_reg <= SESSIONS - 1;
+      end else begin
+         case (tx_state_reg)
+            TX_IDLE: begin
+               if (pick_valid) begin
+                  grant_reg <= pick;
+                  tx_state_reg <= TX_HEADER;
+               end
+            end
+            TX_HEADER: begin
+               if (m_axis_tready) begin
+                  tx_state_reg <= TX_BODY;
+               end
+            end
+            TX_BODY: begin
+               if (m_axis_tvalid && m_axis_tready && m_axis_tlast) begin
+                  if (pick_valid) begin
+                     grant_reg <= pick;
+                     tx_state_reg <= TX_HEADER;
+                  end else begin
+                     tx_state_reg <= TX_IDLE;
+                  end
+               end
+            end
+            default: tx_state_reg <= TX_IDLE;
+         endcase
+      end
+   end
+
+   assign m_axis_tvalid = tx_state_reg == TX_HEADER || (tx_state_reg == TX_BODY && engine_m_tvalid[grant_reg]);
+   assign m_axis_tdata = tx_state_reg == TX_HEADER ? grant_id : engine_m_tdata[grant_reg*DATA_WIDTH +: DATA_WIDTH];
+   assign m_axis_tlast = tx_state_reg == TX_BODY && engine_m_tlast[grant_reg];
+
+   // Session engines
+   genvar session;
+   generate
+      for (session = 0; session < SESSIONS; session = session + 1) begin : g_session
+         assign engine_s_tvalid[session] = s_axis_tvalid && !rx_header_reg && rx_session_reg == session;
+         assign grant_mask[session] = grant_reg == session;
+         assign engine_m_tready[session] = tx_state_reg == TX_BODY && grant_mask[session] && m_axis_tready;
+
+         if (ROLE == "TRANSMITTER") begin : g_transmitter
+            abp_transmitter #(
+               .DATA_WIDTH(DATA_WIDTH),
+               .VALUE_SIZE(VALUE_SIZE),
+               .PACKET_SIZE(PACKET_SIZE),
+               .TIMEOUT_CYCLES(TIMEOUT_CYCLES),
+               .BATCH_SIZE(BATCH_SIZE),
+               .WINDOW_SIZE(WINDOW_SIZE),
+               .SEQ_BITS(SEQ_BITS),
+               .COUNTER_WIDTH(COUNTER_WIDTH)
+            ) engine (
+               .aclk(aclk),
+               .aresetn(aresetn),
+               .s_axis_tvalid(engine_s_tvalid[session]),
+               .s_axis_tdata(s_axis_tdata),
+               .s_axis_tlast(s_axis_tlast),
+               .s_axis_tready(engine_s_tready[session]),
+               .m_axis_tvalid(engine_m_tvalid[session]),
+               .m_axis_tdata(engine_m_tdata[session*DATA_WIDTH +: DATA_WIDTH]),
+               .m_axis_tlast(engine_m_tlast[session]),
+               .m_axis_tready(engine_m_tready[session]),
+               .stat_cycles(),
+               .stat_frames_sent(),
+               .stat_frames_received(),
+               .stat_retransmissions(),
+               .stat_timeouts(),
+               .stat_bit_mismatches(),
+               .stat_early_terminations(),
+               .stat_stall_cycles(),
+               .stat_rtt_min(),
+               .stat_rtt_max()
+            );
+         end else begin : g_receiver
+            abp_receiver #(
+               .DATA_WIDTH(DATA_WIDTH),
+               .VALUE_SIZE(VALUE_SIZE),
+               .PACKET_SIZE(PACKET_SIZE),
+               .BATCH_SIZE(BATCH_SIZE),
+               .WINDOW_SIZE(WINDOW_SIZE),
+               .SEQ_BITS(SEQ_BITS),
+               .COUNTER_WIDTH(COUNTER_WIDTH)
+            ) engine (
+               .aclk(aclk),
+               .aresetn(aresetn),
+               .s_axis_tvalid(engine_s_tvalid[session]),
+               .s_axis_tdata(s_axis_tdata),
+               .s_axis_tlast(s_axis_tlast),
+               .s_axis_tready(engine_s_tready[session]),
+               .m_axis_tvalid(engine_m_tvalid[session]),
+               .m_axis_tdata(engine_m_tdata[session*DATA_WIDTH +: DATA_WIDTH]),
+               .m_axis_tlast(engine_m_tlast[session]),
+               .m_axis_tready(engine_m_tready[session]),
+               .stat_cycles(),
+               .stat_frames_received(),
+               .stat_frames_sent(),
+               .stat_bit_mismatches(),
+               .stat_early_terminations(),
+               .stat_stall_cycles()
+            );
+         end
+      end
+   endgenerate
+
+   // Performance counters
+   reg [COUNTER_WIDTH-1:0] stat_cycles_reg;
+   reg [COUNTER_WIDTH-1:0] stat_frames_received_reg;
+   reg [COUNTER_WIDTH-1:0] stat_frames_sent_reg;
+   reg [COUNTER_WIDTH-1:0] stat_unknown_sessions_reg;
+   reg [COUNTER_WIDTH-1:0] stat_stall_cycles_reg;
+
+   assign stat_cycles = stat_cycles_reg;
+   assign stat_frames_received = stat_frames_received_reg;
+   assign stat_frames_sent = stat_frames_sent_reg;
+   assign stat_unknown_sessions = stat_unknown_sessions_reg;
+   assign stat_stall_cycles = stat_stall_cycles_reg;
+
+   always_ff @(posedge aclk) begin
+      if (!aresetn) begin
+         stat_cycles_reg <= {COUNTER_WIDTH{1'b0}};
+         stat_frames_received_reg <= {COUNTER_WIDTH{1'b0}};
+         stat_frames_sent_reg <= {COUNTER_WIDTH{1'b0}};
+         stat_unknown_sessions_reg <= {COUNTER_WIDTH{1'b0}};
+         stat_stall_cycles_reg <= {COUNTER_WIDTH{1'b0}};
+      end else begin
+         stat_cycles_reg <= stat_cycles_reg + 1;
+
+         if (s_axis_tvalid && s_axis_tready && s_axis_tlast && !rx_header_reg && rx_known) begin
+            stat_frames_received_reg <= stat_frames_received_reg + 1;
+         end
+
+         if (s_axis_tvalid && s_axis_tready && rx_header_reg && s_axis_tdata >= SESSIONS) begin
+            stat_unknown_sessions_reg <= stat_unknown_sessions_reg + 1;
+         end
+
+         if (m_axis_tvalid && m_axis_tready && m_axis_tlast) begin
+            stat_frames_sent_reg <= stat_frames_sent_reg + 1;
+         end
+
+         if (m_axis_tvalid && !m_axis_tready) begin
+            stat_stall_cycles_reg <= stat_stall_cycles_reg + 1;
+         end
+      end
+   end
+
+endmodule
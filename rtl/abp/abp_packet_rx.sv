@@ -15,7 +15,16 @@ module abp_packet_rx
     parameter integer VALUE_SIZE = 0,
 
     // #of bytes in a packet
-    parameter integer PACKET_SIZE = 0
+    parameter integer PACKET_SIZE = 0,
+
+    // #of values packed back to back at the start of a packet
+    parameter integer BATCH_SIZE = 1,
+
+    // Width of the sequence field in the last byte (1 = alternating bit)
+    parameter integer SEQ_BITS = 1,
+
+    // Width of the performance counters
+    parameter integer COUNTER_WIDTH = 32
 ) (
     input wire         aclk,
     input wire         resetn,
@@ -29,15 +38,27 @@ module abp_packet_rx
     // ABP Frame Output
     input  wire                       abp_tx_ready,
     output logic                      abp_tx_valid,
-    output logic [VALUE_SIZE*8-1:0]   abp_tx_value,
-    output logic                      abp_tx_bit,
+    output logic [BATCH_SIZE*VALUE_SIZE*8-1:0] abp_tx_value,
+    output logic [SEQ_BITS-1:0]       abp_tx_bit,
 
     // Status signals
     output logic        busy,
-    output logic        error_early_termination
+    output logic        error_early_termination,
+
+    // Performance counters (free-running, wrap at 2**COUNTER_WIDTH)
+    output logic [COUNTER_WIDTH-1:0]  stat_frames_received,
+    output logic [COUNTER_WIDTH-1:0]  stat_early_terminations,
+    output logic [COUNTER_WIDTH-1:0]  stat_stall_cycles
 );
 
 localparam integer CounterWidth = $clog2(PACKET_SIZE);
+localparam integer PayloadBytes = BATCH_SIZE * VALUE_SIZE;
+
+initial begin
+    if (PayloadBytes > PACKET_SIZE - 1) begin
+        $error("abp_packet_rx: BATCH_SIZE values do not fit in PACKET_SIZE - 1 bytes");
+    end
+end
 
 initial begin
     busy = 1'b0;
@@ -46,7 +67,7 @@ end
 logic eth_rx_tready_reg = 1'b0, eth_rx_tready_next;
 logic abp_tx_valid_reg = 1'b0, abp_tx_valid_next;
 
-logic [VALUE_SIZE*8-1:0] abp_value_reg = {VALUE_SIZE*8{1'b0}}, abp_value_next;
+logic [PayloadBytes*8-1:0] abp_value_reg = {PayloadBytes*8{1'b0}}, abp_value_next;
 logic [DATA_WIDTH-1:0] abp_bit_reg = {DATA_WIDTH{1'b0}}, abp_bit_next;
 
 logic read_abp_payload_reg = 1'b1, read_abp_payload_next;
@@ -54,21 +75,28 @@ logic [CounterWidth-1:0] byte_counter_reg = 1'b0, byte_counter_next;
 
 logic error_early_termination_reg = 1'b0, error_early_termination_next;
 
+logic [COUNTER_WIDTH-1:0] stat_frames_received_reg = {COUNTER_WIDTH{1'b0}};
+logic [COUNTER_WIDTH-1:0] stat_early_terminations_reg = {COUNTER_WIDTH{1'b0}};
+logic [COUNTER_WIDTH-1:0] stat_stall_cycles_reg = {COUNTER_WIDTH{1'b0}};
 
 assign eth_rx_tready = eth_rx_tready_reg;
 assign abp_tx_valid = abp_tx_valid_reg;
 assign abp_tx_value = abp_value_reg;
-assign abp_tx_bit = abp_bit_reg[0];
+assign abp_tx_bit = abp_bit_reg[SEQ_BITS-1:0];
 assign error_early_termination = error_early_termination_reg;
+assign stat_frames_received = stat_frames_received_reg;
+assign stat_early_terminations = stat_early_terminations_reg;
+assign stat_stall_cycles = stat_stall_cycles_reg;
 
 always_comb begin
     abp_tx_valid_next = abp_tx_valid_reg && !abp_tx_ready;
-    eth_rx_tready_next = 1'b1;
 
     abp_value_next = abp_value_reg;
     abp_bit_next = abp_bit_reg;
 
-    byte_counter_next = {$clog2(PACKET_SIZE){1'b0}};
+    // Only accepted beats move the count, so idle cycles inside a frame
+    // leave it alone; it is cleared by an accepted tlast and by reset
+    byte_counter_next = byte_counter_reg;
 
     error_early_termination_next = error_early_termination_reg;
 
@@ -77,23 +105,19 @@ always_comb begin
     if (eth_rx_tvalid && eth_rx_tready) begin
         byte_counter_next = byte_counter_reg + 1;
 
-        `define _PACKET_FIELD_(offset, field) \
-            if (byte_counter_reg == offset) begin \
-                field = eth_rx_tdata; \
-            end
-
-        `_PACKET_FIELD_(0, abp_value_next[31:24])
-        `_PACKET_FIELD_(1, abp_value_next[23:16])
-        `_PACKET_FIELD_(2, abp_value_next[15:8])
-        `_PACKET_FIELD_(3, abp_value_next[7:0])
-        `_PACKET_FIELD_(63, abp_bit_next)
+        // Values are packed big-endian from byte 0, the bit is the last byte
+        if (byte_counter_reg < PayloadBytes) begin
+            abp_value_next[(PayloadBytes - 1 - byte_counter_reg)*8 +: 8] = eth_rx_tdata;
+        end
 
-        `undef _PACKET_FIELD_
+        if (byte_counter_reg == PACKET_SIZE - 1) begin
+            abp_bit_next = eth_rx_tdata;
+        end
     end
 
-    // End of Ethernet Packet in
-    if (eth_rx_tlast) begin
-        if (byte_counter_reg < 63) begin
+    // End of Ethernet Packet in (tlast only counts on an accepted beat)
+    if (eth_rx_tvalid && eth_rx_tready && eth_rx_tlast) begin
+        if (byte_counter_reg < PACKET_SIZE - 1) begin
             error_early_termination_next = 1'b1;
         end else begin
             abp_tx_valid_next = 1'b1;
@@ -102,6 +126,10 @@ always_comb begin
 
         byte_counter_next = {CounterWidth{1'b0}};
     end
+
+    // Hold off the next frame while a parsed one waits for the consumer,
+    // so its bytes cannot overwrite the held value and bit
+    eth_rx_tready_next = !abp_tx_valid_next;
 end
 
 always_ff @(posedge aclk) begin
@@ -114,7 +142,7 @@ always_ff @(posedge aclk) begin
 
     if (!resetn) begin
         abp_tx_valid_reg <= 1'b0;
-        abp_value_reg <= {VALUE_SIZE*8{1'b0}};
+        abp_value_reg <= {PayloadBytes*8{1'b0}};
         abp_bit_reg <= {DATA_WIDTH-1{1'b0}};
         byte_counter_reg <= {CounterWidth-1{1'b0}};
         error_early_termination_reg <= 1'b0;
@@ -122,4 +150,26 @@ always_ff @(posedge aclk) begin
     end
 end
 
+// Performance counters
+always_ff @(posedge aclk) begin
+    if (!resetn) begin
+        stat_frames_received_reg <= {COUNTER_WIDTH{1'b0}};
+        stat_early_terminations_reg <= {COUNTER_WIDTH{1'b0}};
+        stat_stall_cycles_reg <= {COUNTER_WIDTH{1'b0}};
+    end else begin
+        if (eth_rx_tvalid && eth_rx_tready && eth_rx_tlast) begin
+            if (byte_counter_reg < PACKET_SIZE - 1) begin
+                stat_early_terminations_reg <= stat_early_terminations_reg + 1;
+            end else begin
+                stat_frames_received_reg <= stat_frames_received_reg + 1;
+            end
+        end
+
+        // Parsed frame held because the consumer is not ready
+        if (abp_tx_valid_reg && !abp_tx_ready) begin
+            stat_stall_cycles_reg <= stat_stall_cycles_reg + 1;
+        end
+    end
+end
+
 endmodule
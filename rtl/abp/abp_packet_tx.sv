@@ -15,7 +15,13 @@ module abp_packet_tx
     parameter integer VALUE_SIZE = 4,
 
     // #of bytes in a packet
-    parameter integer PACKET_SIZE = 64
+    parameter integer PACKET_SIZE = 64,
+
+    // #of values packed back to back at the start of a packet
+    parameter integer BATCH_SIZE = 1,
+
+    // Width of the sequence field in the last byte (1 = alternating bit)
+    parameter integer SEQ_BITS = 1
 ) (
     input wire         aclk,
     input wire         resetn,
@@ -29,20 +35,27 @@ module abp_packet_tx
     // ABP Hyperdata Input
     output wire                       s_abp_ready,
     input  logic                      s_abp_valid,
-    input  logic [VALUE_SIZE*8-1:0]   s_abp_value,
-    input  logic                      s_abp_bit,
+    input  logic [BATCH_SIZE*VALUE_SIZE*8-1:0] s_abp_value,
+    input  logic [SEQ_BITS-1:0]       s_abp_bit,
 
     // Status signals
     output logic        busy
 );
 
 localparam integer CounterWidth = $clog2(PACKET_SIZE);
+localparam integer PayloadBytes = BATCH_SIZE * VALUE_SIZE;
+
+initial begin
+    if (PayloadBytes > PACKET_SIZE - 1) begin
+        $error("abp_packet_tx: BATCH_SIZE values do not fit in PACKET_SIZE - 1 bytes");
+    end
+end
 
 // Internal Registers
 logic [CounterWidth-1:0] byte_counter_reg, byte_counter_next;
 logic                    sending_packet_reg, sending_packet_next;
-logic [8*VALUE_SIZE-1:0] abp_value_reg, abp_value_next;
-logic                    abp_bit_reg, abp_bit_next;
+logic [8*PayloadBytes-1:0] abp_value_reg, abp_value_next;
+logic [SEQ_BITS-1:0]     abp_bit_reg, abp_bit_next;
 
 // Ethernet AXIS Frame Registers
 logic m_eth_tx_tvalid_reg = 1'b0, m_eth_tx_tvalid_next;
@@ -68,28 +81,28 @@ always_comb begin
     abp_value_next = abp_value_reg;
     abp_bit_next = abp_bit_reg;
 
-    if (sending_packet_reg && m_eth_tx_tready) begin
+    // A beat is held on the output until the sink accepts it, and the next
+    // one is loaded in its place, without tvalid waiting for tready
+    if (sending_packet_reg && (!m_eth_tx_tvalid_reg || m_eth_tx_tready)) begin
         m_eth_tx_tvalid_next = 1'b1;
         byte_counter_next = byte_counter_reg + 1;
 
-        case (byte_counter_reg)
-            0: m_eth_tx_tdata_next = abp_value_reg[3*8 +: 8];
-            1: m_eth_tx_tdata_next = abp_value_reg[2*8 +: 8];
-            2: m_eth_tx_tdata_next = abp_value_reg[1*8 +: 8];
-            3: m_eth_tx_tdata_next = abp_value_reg[0*8 +: 8];
-            PACKET_SIZE - 1: begin
-                m_eth_tx_tdata_next = {7'd0, abp_bit_reg};
-                m_eth_tx_tlast_next = 1'b1;
-                sending_packet_next = 1'b0;
-            end
-            default: m_eth_tx_tdata_next = {DATA_WIDTH{1'b0}};
-        endcase
+        // Values are packed big-endian from byte 0, the bit is the last byte
+        if (byte_counter_reg < PayloadBytes) begin
+            m_eth_tx_tdata_next = abp_value_reg[(PayloadBytes - 1 - byte_counter_reg)*8 +: 8];
+        end else if (byte_counter_reg == PACKET_SIZE - 1) begin
+            m_eth_tx_tdata_next = {DATA_WIDTH{1'b0}};
+            m_eth_tx_tdata_next[SEQ_BITS-1:0] = abp_bit_reg;
+        end else begin
+            m_eth_tx_tdata_next = {DATA_WIDTH{1'b0}};
+        end
 
         if (byte_counter_reg == PACKET_SIZE - 1) begin
             m_eth_tx_tlast_next = 1'b1;
             sending_packet_next = 1'b0;
         end
-    end else if (!sending_packet_reg) begin
+    end else if (!sending_packet_reg && (!m_eth_tx_tvalid_reg || m_eth_tx_tready)) begin
+        // Last beat accepted, or nothing in flight
         m_eth_tx_tvalid_next = 1'b0;
         m_eth_tx_tlast_next = 1'b0;
         s_abp_ready_next = 1'b1;
@@ -100,7 +113,9 @@ always_comb begin
         sending_packet_next = 1'b1;
         byte_counter_next = {CounterWidth{1'b0}};
         abp_bit_next = s_abp_bit;
-        abp_value_next = s_abp_value + 1;
+        for (int i = 0; i < BATCH_SIZE; i++) begin
+            abp_value_next[i*VALUE_SIZE*8 +: VALUE_SIZE*8] = s_abp_value[i*VALUE_SIZE*8 +: VALUE_SIZE*8] + 1;
+        end
     end
 end
 
@@ -112,8 +127,8 @@ always_ff @ (posedge aclk) begin
         s_abp_ready_reg <= 1'b0;
         byte_counter_reg <= {CounterWidth{1'b0}};
         sending_packet_reg <= 1'b0;
-        abp_value_reg <= {(8*VALUE_SIZE){1'b0}};
-        abp_bit_reg <= 1'b0;
+        abp_value_reg <= {(8*PayloadBytes){1'b0}};
+        abp_bit_reg <= {SEQ_BITS{1'b0}};
     end else begin
         m_eth_tx_tvalid_reg <= m_eth_tx_tvalid_next;
         m_eth_tx_tlast_reg <= m_eth_tx_tlast_next;
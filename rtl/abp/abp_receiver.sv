@@ -1,6 +1,14 @@
 /* Alternating bit protocol: packet receiver.
  * Receives packets, processes them according to the ABP protocol,
  * increments the value, and transmits the new packet.
+ *
+ * With WINDOW_SIZE > 1 the receiver runs the go-back-N side of the
+ * sliding-window protocol: only the next expected sequence number is
+ * accepted, and every frame is answered with a cumulative acknowledgement
+ * of the last in-order frame.
+ *
+ * With BATCH_SIZE > 1 each frame carries BATCH_SIZE values, and the whole
+ * batch is echoed back incremented under a single acknowledgement.
  */
 
 `timescale 1ns/1ns
@@ -13,7 +21,15 @@ module abp_receiver
    // Number of bytes to read from packet to counter
    parameter integer VALUE_SIZE = 4,
    // Number of bytes in a packet
-   parameter integer PACKET_SIZE = 64
+   parameter integer PACKET_SIZE = 64,
+   // Number of values packed into each packet
+   parameter integer BATCH_SIZE = 1,
+   // Frames the peer transmitter may have outstanding (1 = plain ABP)
+   parameter integer WINDOW_SIZE = 1,
+   // Width of the sequence number carried in the last byte
+   parameter integer SEQ_BITS = 1,
+   // Width of the performance counters
+   parameter integer COUNTER_WIDTH = 32
 )
 (
    input wire                      aclk,
@@ -29,25 +45,38 @@ module abp_receiver
    output wire                     m_axis_tvalid,
    output wire [DATA_WIDTH-1:0]    m_axis_tdata,
    output wire                     m_axis_tlast,
-   input  wire                     m_axis_tready
+   input  wire                     m_axis_tready,
+
+   // Performance counters (free-running, wrap at 2**COUNTER_WIDTH)
+   output wire [COUNTER_WIDTH-1:0] stat_cycles,
+   output wire [COUNTER_WIDTH-1:0] stat_frames_received,
+   output wire [COUNTER_WIDTH-1:0] stat_frames_sent,
+   output wire [COUNTER_WIDTH-1:0] stat_bit_mismatches,
+   output wire [COUNTER_WIDTH-1:0] stat_early_terminations,
+   output wire [COUNTER_WIDTH-1:0] stat_stall_cycles
 );
 
    // Internal signals
    wire                      rx_abp_valid;
-   wire [VALUE_SIZE*8-1:0]   rx_abp_value;
-   wire                      rx_abp_bit;
+   wire [BATCH_SIZE*VALUE_SIZE*8-1:0] rx_abp_value;
+   wire [SEQ_BITS-1:0]       rx_abp_bit;
    wire                      rx_abp_ready;
 
    wire                      tx_abp_valid;
-   wire [VALUE_SIZE*8-1:0]   tx_abp_value;
-   wire                      tx_abp_bit;
+   wire [BATCH_SIZE*VALUE_SIZE*8-1:0] tx_abp_value;
+   wire [SEQ_BITS-1:0]       tx_abp_bit;
    wire                      tx_abp_ready;
 
+   // Frame repeats a sequence number that was already accepted
+   wire                      rx_abp_mismatch;
+
    // Instantiate abp_packet_rx
    abp_packet_rx #(
       .DATA_WIDTH(DATA_WIDTH),
       .VALUE_SIZE(VALUE_SIZE),
-      .PACKET_SIZE(PACKET_SIZE)
+      .PACKET_SIZE(PACKET_SIZE),
+      .BATCH_SIZE(BATCH_SIZE),
+      .SEQ_BITS(SEQ_BITS)
    ) rx_inst (
       .aclk(aclk),
       .resetn(aresetn),
@@ -60,20 +89,66 @@ module abp_receiver
       .abp_tx_value(rx_abp_value),
       .abp_tx_bit(rx_abp_bit),
       .busy(),
-      .error_early_termination()
+      .error_early_termination(),
+      .stat_frames_received(stat_frames_received),
+      .stat_early_terminations(stat_early_terminations),
+      .stat_stall_cycles()
    );
 
-   // Increment the value
-   assign tx_abp_value = rx_abp_value;
-   assign tx_abp_bit = rx_abp_bit;
    assign tx_abp_valid = rx_abp_valid;
    assign rx_abp_ready = tx_abp_ready;
 
+   generate
+      if (WINDOW_SIZE == 1) begin : g_abp
+         reg                       last_bit_reg;
+         reg                       seen_frame_reg;
+
+         // Echo every frame; the transmitter discards the stale bit
+         assign tx_abp_value = rx_abp_value;
+         assign tx_abp_bit = rx_abp_bit;
+         assign rx_abp_mismatch = seen_frame_reg && rx_abp_bit == last_bit_reg;
+
+         always_ff @(posedge aclk) begin
+            if (!aresetn) begin
+               last_bit_reg <= 1'b0;
+               seen_frame_reg <= 1'b0;
+            end else if (rx_abp_valid && rx_abp_ready) begin
+               last_bit_reg <= rx_abp_bit;
+               seen_frame_reg <= 1'b1;
+            end
+         end
+      end else begin : g_go_back_n
+         reg  [SEQ_BITS-1:0]       expected_seq_reg;
+         reg  [BATCH_SIZE*VALUE_SIZE*8-1:0] last_value_reg;
+         wire                      in_order;
+
+         assign in_order = rx_abp_bit == expected_seq_reg;
+
+         // Out-of-order and duplicate frames re-acknowledge the last
+         // in-order frame so the transmitter can go back to it
+         assign tx_abp_value = in_order ? rx_abp_value : last_value_reg;
+         assign tx_abp_bit = in_order ? rx_abp_bit : expected_seq_reg - 1'b1;
+         assign rx_abp_mismatch = !in_order;
+
+         always_ff @(posedge aclk) begin
+            if (!aresetn) begin
+               expected_seq_reg <= {SEQ_BITS{1'b0}};
+               last_value_reg <= {BATCH_SIZE*VALUE_SIZE*8{1'b0}};
+            end else if (rx_abp_valid && rx_abp_ready && in_order) begin
+               expected_seq_reg <= expected_seq_reg + 1'b1;
+               last_value_reg <= rx_abp_value;
+            end
+         end
+      end
+   endgenerate
+
    // Instantiate abp_packet_tx
    abp_packet_tx #(
       .DATA_WIDTH(DATA_WIDTH),
       .VALUE_SIZE(VALUE_SIZE),
-      .PACKET_SIZE(PACKET_SIZE)
+      .PACKET_SIZE(PACKET_SIZE),
+      .BATCH_SIZE(BATCH_SIZE),
+      .SEQ_BITS(SEQ_BITS)
    ) tx_inst (
       .aclk(aclk),
       .resetn(aresetn),
@@ -88,4 +163,38 @@ module abp_receiver
       .busy()
    );
 
+   // Performance counters
+   reg [COUNTER_WIDTH-1:0] stat_cycles_reg;
+   reg [COUNTER_WIDTH-1:0] stat_frames_sent_reg;
+   reg [COUNTER_WIDTH-1:0] stat_bit_mismatches_reg;
+   reg [COUNTER_WIDTH-1:0] stat_stall_cycles_reg;
+
+   assign stat_cycles = stat_cycles_reg;
+   assign stat_frames_sent = stat_frames_sent_reg;
+   assign stat_bit_mismatches = stat_bit_mismatches_reg;
+   assign stat_stall_cycles = stat_stall_cycles_reg;
+
+   always_ff @(posedge aclk) begin
+      if (!aresetn) begin
+         stat_cycles_reg <= {COUNTER_WIDTH{1'b0}};
+         stat_frames_sent_reg <= {COUNTER_WIDTH{1'b0}};
+         stat_bit_mismatches_reg <= {COUNTER_WIDTH{1'b0}};
+         stat_stall_cycles_reg <= {COUNTER_WIDTH{1'b0}};
+      end else begin
+         stat_cycles_reg <= stat_cycles_reg + 1;
+
+         if (tx_abp_valid && tx_abp_ready) begin
+            stat_frames_sent_reg <= stat_frames_sent_reg + 1;
+            if (rx_abp_mismatch) begin
+               stat_bit_mismatches_reg <= stat_bit_mismatches_reg + 1;
+            end
+         end
+
+         // MAC is holding off the acknowledgement
+         if (m_axis_tvalid && !m_axis_tready) begin
+            stat_stall_cycles_reg <= stat_stall_cycles_reg + 1;
+         end
+      end
+   end
+
 endmodule
@@ -1,3 +1,17 @@
+/* Alternating bit protocol: transmitter.
+ * Originates the counter sequence, waits for the acknowledgement and
+ * retransmits after TIMEOUT_CYCLES without one.
+ *
+ * With WINDOW_SIZE > 1 the transmitter runs go-back-N: up to WINDOW_SIZE
+ * frames numbered modulo 2**SEQ_BITS are kept in flight, their values are
+ * held in a retransmit buffer, and a timeout on the oldest unacknowledged
+ * frame resends the whole window from that frame. WINDOW_SIZE must be a
+ * power of two smaller than 2**SEQ_BITS.
+ *
+ * With BATCH_SIZE > 1 every frame carries BATCH_SIZE consecutive counter
+ * values and is acknowledged as a whole.
+ */
+
 `timescale 1ns/1ns
 `default_nettype none
 
@@ -6,7 +20,15 @@ module abp_transmitter
    parameter integer DATA_WIDTH = 8,
    parameter integer VALUE_SIZE = 4,
    parameter integer PACKET_SIZE = 64,
-   parameter integer TIMEOUT_CYCLES = 1200
+   parameter integer TIMEOUT_CYCLES = 1200,
+   // Consecutive values carried per frame
+   parameter integer BATCH_SIZE = 1,
+   // Frames allowed in flight (1 = plain ABP)
+   parameter integer WINDOW_SIZE = 1,
+   // Width of the sequence number carried in the last byte
+   parameter integer SEQ_BITS = 1,
+   // Width of the performance counters
+   parameter integer COUNTER_WIDTH = 32
 )
 (
    input wire                      aclk,
@@ -22,23 +44,63 @@ module abp_transmitter
    output wire                     m_axis_tvalid,
    output wire [DATA_WIDTH-1:0]    m_axis_tdata,
    output wire                     m_axis_tlast,
-   input  wire                     m_axis_tready
+   input  wire                     m_axis_tready,
+
+   // Performance counters (free-running, wrap at 2**COUNTER_WIDTH)
+   output wire [COUNTER_WIDTH-1:0] stat_cycles,
+   output wire [COUNTER_WIDTH-1:0] stat_frames_sent,
+   output wire [COUNTER_WIDTH-1:0] stat_frames_received,
+   output wire [COUNTER_WIDTH-1:0] stat_retransmissions,
+   output wire [COUNTER_WIDTH-1:0] stat_timeouts,
+   output wire [COUNTER_WIDTH-1:0] stat_bit_mismatches,
+   output wire [COUNTER_WIDTH-1:0] stat_early_terminations,
+   output wire [COUNTER_WIDTH-1:0] stat_stall_cycles,
+   // Round trip from abp_packet_tx accepting a frame to its acknowledgement,
+   // sampled only for frames that were not retransmitted. rtt_min reads all
+   // ones until the first sample.
+   output wire [COUNTER_WIDTH-1:0] stat_rtt_min,
+   output wire [COUNTER_WIDTH-1:0] stat_rtt_max
 );
 
-   // Internal signals
-   reg  [VALUE_SIZE*8-1:0]   tx_value_reg = {VALUE_SIZE*8{1'b0}}, tx_value_next;
-   reg                       tx_bit_reg = 1'b1, tx_bit_next;
-   reg                       expected_bit_reg = 1'b1, expected_bit_next;
-   reg                       tx_valid, tx_valid_next;
+   initial begin
+      if (WINDOW_SIZE > 1 && (WINDOW_SIZE & (WINDOW_SIZE - 1)) != 0) begin
+         $error("abp_transmitter: WINDOW_SIZE must be a power of two");
+      end
+      if (WINDOW_SIZE >= (1 << SEQ_BITS)) begin
+         $error("abp_transmitter: WINDOW_SIZE must be smaller than 2**SEQ_BITS");
+      end
+   end
 
+   // Internal signals, tx_value/rx_value are the first value of the batch
+   wire                      tx_valid;
+   wire [VALUE_SIZE*8-1:0]   tx_value;
+   wire [SEQ_BITS-1:0]       tx_seq;
    wire                      tx_ready;
+
    wire                      rx_valid;
    wire [VALUE_SIZE*8-1:0]   rx_value;
-   wire                      rx_bit;
-   reg                       rx_ready = 1'b1, rx_ready_next;
+   wire [SEQ_BITS-1:0]       rx_seq;
+   wire                      rx_ready;
 
-   // Timeout counter
-   reg [$clog2(TIMEOUT_CYCLES)-1:0] timeout_counter, timeout_counter_next;
+   wire [BATCH_SIZE*VALUE_SIZE*8-1:0] tx_batch;
+   wire [BATCH_SIZE*VALUE_SIZE*8-1:0] rx_batch;
+
+   // Batches are packed first value in the most significant slot
+   genvar slot;
+   generate
+      for (slot = 0; slot < BATCH_SIZE; slot = slot + 1) begin : g_batch
+         assign tx_batch[(BATCH_SIZE-1-slot)*VALUE_SIZE*8 +: VALUE_SIZE*8] = tx_value + slot;
+      end
+   endgenerate
+
+   assign rx_value = rx_batch[BATCH_SIZE*VALUE_SIZE*8-1 -: VALUE_SIZE*8];
+
+   // Per-cycle events for the performance counters
+   wire                      ev_retransmit;
+   wire                      ev_timeout;
+   wire                      ev_mismatch;
+   wire                      ev_rtt_valid;
+   wire [COUNTER_WIDTH-1:0]  ev_rtt;
 
    // State machine
    typedef enum logic [2:0] {
@@ -48,90 +110,294 @@ module abp_transmitter
       TIMEOUT
    } state_t;
 
-   state_t state_reg, state_next;
+   generate
+      if (WINDOW_SIZE == 1) begin : g_abp
+         reg  [VALUE_SIZE*8-1:0]   tx_value_reg = {VALUE_SIZE*8{1'b0}}, tx_value_next;
+         reg                       tx_bit_reg = 1'b1, tx_bit_next;
+         reg                       expected_bit_reg = 1'b1, expected_bit_next;
+         reg                       tx_valid_reg, tx_valid_next;
+         reg                       rx_ready_reg = 1'b1, rx_ready_next;
 
-   always_ff @(posedge aclk or negedge aresetn) begin
-      if (!aresetn) begin
-         tx_value_reg <= 0;
-         tx_bit_reg <= 1;
-         expected_bit_reg <= 1;
-         tx_valid <= 1'b0;
-         rx_ready <= 1'b1;
-         state_reg <= IDLE;
-         timeout_counter <= 0;
-      end else begin
-         tx_value_reg <= tx_value_next;
-         rx_ready_reg <= rx_ready_next;
-         tx_bit_reg <= tx_bit_next;
-         expected_bit_reg <= expected_bit_next;
-         tx_valid <= tx_valid_next;
-         state_reg <= state_next;
-         timeout_counter <= timeout_counter_next;
-      end
-   end
+         // Timeout counter
+         reg [$clog2(TIMEOUT_CYCLES)-1:0] timeout_counter, timeout_counter_next;
+
+         // Round trip measurement, invalidated by a retransmission
+         reg [COUNTER_WIDTH-1:0]   rtt_counter;
+         reg                       retransmitting_reg;
+
+         state_t state_reg, state_next;
+
+         assign tx_valid = tx_valid_reg;
+         assign tx_value = tx_value_reg;
+         assign tx_seq = tx_bit_reg;
+         assign rx_ready = rx_ready_reg;
 
-   always_comb begin
-      tx_value_next = tx_value_reg;
-      tx_bit_next = tx_bit_reg;
-      expected_bit_next = expected_bit_reg;
-      tx_valid_next = tx_valid;
-      rx_ready_next = rx_ready_reg;
-      state_next = state_reg;
-      timeout_counter_next = timeout_counter;
-
-      case (state_reg)
-         IDLE: begin
-            // Initiate first transmission
-            tx_value_next = 0;
-            tx_bit_next = 1'b1;
-            tx_valid_next = 1'b1;
-            state_next = TRANSMIT;
-            timeout_counter_next = 0;
+         assign ev_retransmit = tx_valid_reg && tx_ready && retransmitting_reg;
+         assign ev_timeout = state_reg == TIMEOUT;
+         assign ev_mismatch = rx_valid && rx_ready_reg && rx_seq[0] != expected_bit_reg;
+         assign ev_rtt_valid = state_reg == WAIT_FOR_RX && rx_valid && rx_ready_reg
+                               && rx_seq[0] == expected_bit_reg && !retransmitting_reg;
+         assign ev_rtt = rtt_counter;
+
+         always_ff @(posedge aclk or negedge aresetn) begin
+            if (!aresetn) begin
+               rtt_counter <= 0;
+               retransmitting_reg <= 1'b0;
+            end else begin
+               rtt_counter <= (tx_valid_reg && tx_ready) ? 0 : rtt_counter + 1;
+               if (state_reg == TIMEOUT) begin
+                  retransmitting_reg <= 1'b1;
+               end else if (state_next == TRANSMIT && state_reg != TRANSMIT) begin
+                  retransmitting_reg <= 1'b0;
+               end
+            end
          end
 
-         TRANSMIT: begin
-            if (tx_ready) begin
-               tx_valid_next = 1'b0;
-               state_next = WAIT_FOR_RX;
-               timeout_counter_next = 0;
+         always_ff @(posedge aclk or negedge aresetn) begin
+            if (!aresetn) begin
+               tx_value_reg <= 0;
+               tx_bit_reg <= 1;
+               expected_bit_reg <= 1;
+               tx_valid_reg <= 1'b0;
+               rx_ready_reg <= 1'b1;
+               state_reg <= IDLE;
+               timeout_counter <= 0;
+            end else begin
+               tx_value_reg <= tx_value_next;
+               rx_ready_reg <= rx_ready_next;
+               tx_bit_reg <= tx_bit_next;
+               expected_bit_reg <= expected_bit_next;
+               tx_valid_reg <= tx_valid_next;
+               state_reg <= state_next;
+               timeout_counter <= timeout_counter_next;
             end
          end
 
-         WAIT_FOR_RX: begin
-            if (rx_valid && rx_ready_reg) begin
-               if (rx_bit == expected_bit_reg) begin
-                  tx_value_next = rx_value + 1;
-                  tx_bit_next = ~rx_bit;
-                  expected_bit_next = ~rx_bit;
+         always_comb begin
+            tx_value_next = tx_value_reg;
+            tx_bit_next = tx_bit_reg;
+            expected_bit_next = expected_bit_reg;
+            tx_valid_next = tx_valid_reg;
+            rx_ready_next = rx_ready_reg;
+            state_next = state_reg;
+            timeout_counter_next = timeout_counter;
+
+            case (state_reg)
+               IDLE: begin
+                  // Initiate first transmission
+                  tx_value_next = 0;
+                  tx_bit_next = 1'b1;
+                  tx_valid_next = 1'b1;
+                  state_next = TRANSMIT;
+                  timeout_counter_next = 0;
+               end
+
+               TRANSMIT: begin
+                  if (tx_ready) begin
+                     tx_valid_next = 1'b0;
+                     state_next = WAIT_FOR_RX;
+                     timeout_counter_next = 0;
+                  end
+               end
+
+               WAIT_FOR_RX: begin
+                  if (rx_valid && rx_ready_reg) begin
+                     if (rx_seq[0] == expected_bit_reg) begin
+                        tx_value_next = rx_value + BATCH_SIZE;
+                        tx_bit_next = ~rx_seq[0];
+                        expected_bit_next = ~rx_seq[0];
+                        tx_valid_next = 1'b1;
+                        state_next = TRANSMIT;
+                        timeout_counter_next = 0;
+                     end
+                  end else begin
+                     if (timeout_counter == TIMEOUT_CYCLES - 1) begin
+                        state_next = TIMEOUT;
+                     end else begin
+                        timeout_counter_next = timeout_counter + 1;
+                     end
+                  end
+               end
+
+               TIMEOUT: begin
+                  // Retransmit the current packet
                   tx_valid_next = 1'b1;
                   state_next = TRANSMIT;
                   timeout_counter_next = 0;
                end
+
+               default: state_next = IDLE;
+            endcase
+         end
+      end else begin : g_go_back_n
+         localparam integer SlotBits = $clog2(WINDOW_SIZE);
+
+         // Retransmit buffer, one slot per frame in flight
+         reg  [VALUE_SIZE*8-1:0]   retx_buffer [0:WINDOW_SIZE-1];
+         reg                       retx_buffer_we;
+
+         reg  [VALUE_SIZE*8-1:0]   tx_value_reg = {VALUE_SIZE*8{1'b0}}, tx_value_next;
+         reg  [SEQ_BITS-1:0]       tx_seq_reg = {SEQ_BITS{1'b0}}, tx_seq_next;
+         reg                       tx_valid_reg, tx_valid_next;
+         reg                       tx_retx_reg, tx_retx_next;
+         reg  [VALUE_SIZE*8-1:0]   next_value_reg, next_value_next;
+
+         // base: oldest unacknowledged, send: next to put on the wire,
+         // next: one past the newest frame in the retransmit buffer
+         reg  [SEQ_BITS-1:0]       base_seq_reg, base_seq_next;
+         reg  [SEQ_BITS-1:0]       send_seq_reg, send_seq_next;
+         reg  [SEQ_BITS-1:0]       next_seq_reg, next_seq_next;
+
+         wire [SEQ_BITS-1:0]       in_flight;
+         wire [SEQ_BITS-1:0]       ack_offset;
+         wire [SEQ_BITS-1:0]       send_offset;
+         reg  [SEQ_BITS-1:0]       window_used;
+
+         // Timeout counter for the oldest unacknowledged frame
+         reg [$clog2(TIMEOUT_CYCLES)-1:0] timeout_counter, timeout_counter_next;
+         reg                       ack_accepted;
+         reg                       timeout_expired;
+
+         // Round trip measurement of one frame at a time
+         reg  [COUNTER_WIDTH-1:0]  rtt_counter;
+         reg                       rtt_active_reg;
+         reg  [SEQ_BITS-1:0]       rtt_seq_reg;
+         wire [SEQ_BITS-1:0]       rtt_offset;
+
+         assign tx_valid = tx_valid_reg;
+         assign tx_value = tx_value_reg;
+         assign tx_seq = tx_seq_reg;
+         assign rx_ready = 1'b1;
+
+         assign in_flight = next_seq_reg - base_seq_reg;
+         assign ack_offset = rx_seq - base_seq_reg;
+         assign send_offset = send_seq_reg - base_seq_reg;
+         assign rtt_offset = rtt_seq_reg - base_seq_reg;
+
+         assign ev_retransmit = tx_valid_reg && tx_ready && tx_retx_reg;
+         assign ev_timeout = timeout_expired;
+         assign ev_mismatch = rx_valid && !ack_accepted;
+         assign ev_rtt_valid = rtt_active_reg && ack_accepted && rtt_offset <= ack_offset;
+         assign ev_rtt = rtt_counter;
+
+         always_ff @(posedge aclk or negedge aresetn) begin
+            if (!aresetn) begin
+               rtt_counter <= 0;
+               rtt_active_reg <= 1'b0;
+               rtt_seq_reg <= 0;
             end else begin
-               if (timeout_counter == TIMEOUT_CYCLES - 1) begin
-                  state_next = TIMEOUT;
-               end else begin
-                  timeout_counter_next = timeout_counter + 1;
+               rtt_counter <= rtt_counter + 1;
+               if (ev_rtt_valid || timeout_expired) begin
+                  // Karn: a go-back makes the sample ambiguous, drop it
+                  rtt_active_reg <= 1'b0;
+               end else if (!rtt_active_reg && tx_valid_reg && tx_ready && !tx_retx_reg) begin
+                  rtt_active_reg <= 1'b1;
+                  rtt_seq_reg <= tx_seq_reg;
+                  rtt_counter <= 0;
                end
             end
          end
 
-         TIMEOUT: begin
-            // Retransmit the current packet
-            tx_valid_next = 1'b1;
-            state_next = TRANSMIT;
-            timeout_counter_next = 0;
+         always_ff @(posedge aclk or negedge aresetn) begin
+            if (!aresetn) begin
+               tx_value_reg <= 0;
+               tx_seq_reg <= 0;
+               tx_valid_reg <= 1'b0;
+               tx_retx_reg <= 1'b0;
+               next_value_reg <= 0;
+               base_seq_reg <= 0;
+               send_seq_reg <= 0;
+               next_seq_reg <= 0;
+               timeout_counter <= 0;
+            end else begin
+               tx_value_reg <= tx_value_next;
+               tx_seq_reg <= tx_seq_next;
+               tx_valid_reg <= tx_valid_next;
+               tx_retx_reg <= tx_retx_next;
+               next_value_reg <= next_value_next;
+               base_seq_reg <= base_seq_next;
+               send_seq_reg <= send_seq_next;
+               next_seq_reg <= next_seq_next;
+               timeout_counter <= timeout_counter_next;
+            end
          end
 
-         default: state_next = IDLE;
-      endcase
-   end
+         always_ff @(posedge aclk) begin
+            if (retx_buffer_we) begin
+               retx_buffer[next_seq_reg[SlotBits-1:0]] <= next_value_reg;
+            end
+         end
+
+         always_comb begin
+            tx_value_next = tx_value_reg;
+            tx_seq_next = tx_seq_reg;
+            tx_valid_next = tx_valid_reg;
+            tx_retx_next = tx_retx_reg;
+            next_value_next = next_value_reg;
+            base_seq_next = base_seq_reg;
+            send_seq_next = send_seq_reg;
+            next_seq_next = next_seq_reg;
+            timeout_counter_next = timeout_counter;
+            retx_buffer_we = 1'b0;
+            ack_accepted = 1'b0;
+            timeout_expired = 1'b0;
+
+            if (tx_valid_reg && tx_ready) begin
+               tx_valid_next = 1'b0;
+            end
+
+            if (rx_valid && ack_offset < in_flight) begin
+               // Cumulative acknowledgement of every frame up to rx_seq
+               ack_accepted = 1'b1;
+               base_seq_next = rx_seq + 1'b1;
+               if (ack_offset >= send_offset) begin
+                  send_seq_next = rx_seq + 1'b1;
+               end
+               timeout_counter_next = 0;
+            end else if (in_flight == 0) begin
+               timeout_counter_next = 0;
+            end else if (timeout_counter == TIMEOUT_CYCLES - 1) begin
+               // Go back to the oldest unacknowledged frame
+               timeout_expired = 1'b1;
+               send_seq_next = base_seq_reg;
+               timeout_counter_next = 0;
+            end else begin
+               timeout_counter_next = timeout_counter + 1;
+            end
+
+            window_used = next_seq_reg - base_seq_next;
+
+            if (!tx_valid_reg) begin
+               if (send_seq_next != next_seq_reg) begin
+                  // Retransmission out of the buffer
+                  tx_value_next = retx_buffer[send_seq_next[SlotBits-1:0]];
+                  tx_seq_next = send_seq_next;
+                  tx_valid_next = 1'b1;
+                  tx_retx_next = 1'b1;
+                  send_seq_next = send_seq_next + 1'b1;
+               end else if (window_used < WINDOW_SIZE) begin
+                  // Window has room for a new frame
+                  tx_value_next = next_value_reg;
+                  tx_seq_next = next_seq_reg;
+                  tx_valid_next = 1'b1;
+                  tx_retx_next = 1'b0;
+                  retx_buffer_we = 1'b1;
+                  next_value_next = next_value_reg + BATCH_SIZE;
+                  next_seq_next = next_seq_reg + 1'b1;
+                  send_seq_next = next_seq_reg + 1'b1;
+               end
+            end
+         end
+      end
+   endgenerate
 
    // Instantiate abp_packet_tx
    abp_packet_tx #(
       .DATA_WIDTH(DATA_WIDTH),
       .VALUE_SIZE(VALUE_SIZE),
-      .PACKET_SIZE(PACKET_SIZE)
+      .PACKET_SIZE(PACKET_SIZE),
+      .BATCH_SIZE(BATCH_SIZE),
+      .SEQ_BITS(SEQ_BITS)
    ) tx_inst (
       .aclk(aclk),
       .resetn(aresetn),
@@ -143,8 +409,8 @@ module abp_transmitter
 
       .s_abp_ready(tx_ready),
       .s_abp_valid(tx_valid),
-      .s_abp_value(tx_value_reg),
-      .s_abp_bit(tx_bit_reg),
+      .s_abp_value(tx_batch),
+      .s_abp_bit(tx_seq),
 
       .busy()
    );
@@ -153,7 +419,9 @@ module abp_transmitter
    abp_packet_rx #(
       .DATA_WIDTH(DATA_WIDTH),
       .VALUE_SIZE(VALUE_SIZE),
-      .PACKET_SIZE(PACKET_SIZE)
+      .PACKET_SIZE(PACKET_SIZE),
+      .BATCH_SIZE(BATCH_SIZE),
+      .SEQ_BITS(SEQ_BITS)
    ) rx_inst (
       .aclk(aclk),
       .resetn(aresetn),
@@ -163,13 +431,77 @@ module abp_transmitter
       .eth_rx_tlast(s_axis_tlast),
       .eth_rx_tready(s_axis_tready),
 
-      .abp_tx_ready(rx_ready_reg),
+      .abp_tx_ready(rx_ready),
       .abp_tx_valid(rx_valid),
-      .abp_tx_value(rx_value),
-      .abp_tx_bit(rx_bit),
+      .abp_tx_value(rx_batch),
+      .abp_tx_bit(rx_seq),
 
       .busy(),
-      .error_early_termination()
+      .error_early_termination(),
+      .stat_frames_received(stat_frames_received),
+      .stat_early_terminations(stat_early_terminations),
+      .stat_stall_cycles()
    );
 
+   // Performance counters
+   reg [COUNTER_WIDTH-1:0] stat_cycles_reg;
+   reg [COUNTER_WIDTH-1:0] stat_frames_sent_reg;
+   reg [COUNTER_WIDTH-1:0] stat_retransmissions_reg;
+   reg [COUNTER_WIDTH-1:0] stat_timeouts_reg;
+   reg [COUNTER_WIDTH-1:0] stat_bit_mismatches_reg;
+   reg [COUNTER_WIDTH-1:0] stat_stall_cycles_reg;
+   reg [COUNTER_WIDTH-1:0] stat_rtt_min_reg;
+   reg [COUNTER_WIDTH-1:0] stat_rtt_max_reg;
+
+   assign stat_cycles = stat_cycles_reg;
+   assign stat_frames_sent = stat_frames_sent_reg;
+   assign stat_retransmissions = stat_retransmissions_reg;
+   assign stat_timeouts = stat_timeouts_reg;
+   assign stat_bit_mismatches = stat_bit_mismatches_reg;
+   assign stat_stall_cycles = stat_stall_cycles_reg;
+   assign stat_rtt_min = stat_rtt_min_reg;
+   assign stat_rtt_max = stat_rtt_max_reg;
+
+   always_ff @(posedge aclk or negedge aresetn) begin
+      if (!aresetn) begin
+         stat_cycles_reg <= {COUNTER_WIDTH{1'b0}};
+         stat_frames_sent_reg <= {COUNTER_WIDTH{1'b0}};
+         stat_retransmissions_reg <= {COUNTER_WIDTH{1'b0}};
+         stat_timeouts_reg <= {COUNTER_WIDTH{1'b0}};
+         stat_bit_mismatches_reg <= {COUNTER_WIDTH{1'b0}};
+         stat_stall_cycles_reg <= {COUNTER_WIDTH{1'b0}};
+         stat_rtt_min_reg <= {COUNTER_WIDTH{1'b1}};
+         stat_rtt_max_reg <= {COUNTER_WIDTH{1'b0}};
+      end else begin
+         stat_cycles_reg <= stat_cycles_reg + 1;
+
+         if (tx_valid && tx_ready) begin
+            stat_frames_sent_reg <= stat_frames_sent_reg + 1;
+         end
+         if (ev_retransmit) begin
+            stat_retransmissions_reg <= stat_retransmissions_reg + 1;
+         end
+         if (ev_timeout) begin
+            stat_timeouts_reg <= stat_timeouts_reg + 1;
+         end
+         if (ev_mismatch) begin
+            stat_bit_mismatches_reg <= stat_bit_mismatches_reg + 1;
+         end
+
+         // MAC is holding off the outgoing frame
+         if (m_axis_tvalid && !m_axis_tready) begin
+            stat_stall_cycles_reg <= stat_stall_cycles_reg + 1;
+         end
+
+         if (ev_rtt_valid) begin
+            if (ev_rtt < stat_rtt_min_reg) begin
+               stat_rtt_min_reg <= ev_rtt;
+            end
+            if (ev_rtt > stat_rtt_max_reg) begin
+               stat_rtt_max_reg <= ev_rtt;
+            end
+         end
+      end
+   end
+
 endmodule
@@ -192,6 +192,16 @@ module fpga_core
    wire                 s_axi_aclk;
    wire                 rx_mac_aclk;
    wire                 tx_mac_aclk;
+   // board clock and MMCM outputs
+   wire                 clk_25mhz_bufg;
+   wire                 mmcm_clkfb;
+   wire                 mmcm_locked;
+   wire                 clk_100mhz_mmcm_out;
+   wire                 clk_125mhz_mmcm_out;
+   wire                 clk_333mhz_mmcm_out;
+   wire                 clk_100mhz_int;
+   wire                 clk_125mhz_int;
+   wire                 clk_333mhz_int;
    // resets (and reset generation)
    wire                 s_axi_resetn;
    wire                 chk_resetn;
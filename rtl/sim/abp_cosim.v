@@ -0,0 +1,171 @@
+// Language: Verilog 2001
+
+`resetall
+`timescale 1ps / 1ps
+`default_nettype none
+
+/*
+ * Dual-clock ABP co-simulation top.
+ *
+ * Alice (abp_transmitter) and Bob (abp_receiver) each run on their own
+ * clock and reset, and talk to each other only through a pair of
+ * abp_async_fifo instances, one per direction, as they would across a
+ * clock domain crossing on the board. The clocks are generated by the
+ * testbench (see tb/abp_cosim_test.py), which sets their ratio and drift
+ * and samples the FIFO occupancy outputs.
+ *
+ * The 1 ps timescale sets the simulator precision, so the testbench can
+ * drift one clock against the other in picosecond steps.
+ */
+module abp_cosim #
+(
+    parameter DATA_WIDTH = 8,
+    parameter VALUE_SIZE = 4,
+    parameter PACKET_SIZE = 64,
+    parameter TIMEOUT_CYCLES = 1200,
+    parameter BATCH_SIZE = 1,
+    parameter WINDOW_SIZE = 1,
+    parameter SEQ_BITS = 1,
+    parameter FIFO_DEPTH = 16
+)
+(
+    input  wire                         alice_aclk,
+    input  wire                         alice_aresetn,
+    input  wire                         bob_aclk,
+    input  wire                         bob_aresetn,
+
+    /*
+     * FIFO occupancy, as seen from the write side and the read side
+     */
+    output wire [$clog2(FIFO_DEPTH):0]  alice_to_bob_s_occupancy,
+    output wire [$clog2(FIFO_DEPTH):0]  alice_to_bob_m_occupancy,
+    output wire [$clog2(FIFO_DEPTH):0]  bob_to_alice_s_occupancy,
+    output wire [$clog2(FIFO_DEPTH):0]  bob_to_alice_m_occupancy
+);
+
+// Alice to Bob, written in Alice's domain
+wire                  alice_tx_tvalid;
+wire [DATA_WIDTH-1:0] alice_tx_tdata;
+wire                  alice_tx_tlast;
+wire                  alice_tx_tready;
+
+wire                  bob_rx_tvalid;
+wire [DATA_WIDTH-1:0] bob_rx_tdata;
+wire                  bob_rx_tlast;
+wire                  bob_rx_tready;
+
+// Bob to Alice, written in Bob's domain
+wire                  bob_tx_tvalid;
+wire [DATA_WIDTH-1:0] bob_tx_tdata;
+wire                  bob_tx_tlast;
+wire                  bob_tx_tready;
+
+wire                  alice_rx_tvalid;
+wire [DATA_WIDTH-1:0] alice_rx_tdata;
+wire                  alice_rx_tlast;
+wire                  alice_rx_tready;
+
+abp_transmitter #(
+    .DATA_WIDTH(DATA_WIDTH),
+    .VALUE_SIZE(VALUE_SIZE),
+    .PACKET_SIZE(PACKET_SIZE),
+    .TIMEOUT_CYCLES(TIMEOUT_CYCLES),
+    .BATCH_SIZE(BATCH_SIZE),
+    .WINDOW_SIZE(WINDOW_SIZE),
+    .SEQ_BITS(SEQ_BITS)
+)
+alice (
+    .aclk(alice_aclk),
+    .aresetn(alice_aresetn),
+    .s_axis_tvalid(alice_rx_tvalid),
+    .s_axis_tdata(alice_rx_tdata),
+    .s_axis_tlast(alice_rx_tlast),
+    .s_axis_tready(alice_rx_tready),
+    .m_axis_tvalid(alice_tx_tvalid),
+    .m_axis_tdata(alice_tx_tdata),
+    .m_axis_tlast(alice_tx_tlast),
+    .m_axis_tready(alice_tx_tready),
+    .stat_cycles(),
+    .stat_frames_sent(),
+    .stat_frames_received(),
+    .stat_retransmissions(),
+    .stat_timeouts(),
+    .stat_bit_mismatches(),
+    .stat_early_terminations(),
+    .stat_stall_cycles(),
+    .stat_rtt_min(),
+    .stat_rtt_max()
+);
+
+abp_async_fifo #(
+    .DATA_WIDTH(DATA_WIDTH),
+    .DEPTH(FIFO_DEPTH)
+)
+alice_to_bob_fifo (
+    .s_aclk(alice_aclk),
+    .s_aresetn(alice_aresetn),
+    .s_axis_tvalid(alice_tx_tvalid),
+    .s_axis_tdata(alice_tx_tdata),
+    .s_axis_tlast(alice_tx_tlast),
+    .s_axis_tready(alice_tx_tready),
+    .s_occupancy(alice_to_bob_s_occupancy),
+    .m_aclk(bob_aclk),
+    .m_aresetn(bob_aresetn),
+    .m_axis_tvalid(bob_rx_tvalid),
+    .m_axis_tdata(bob_rx_tdata),
+    .m_axis_tlast(bob_rx_tlast),
+    .m_axis_tready(bob_rx_tready),
+    .m_occupancy(alice_to_bob_m_occupancy)
+);
+
+abp_receiver #(
+    .DATA_WIDTH(DATA_WIDTH),
+    .VALUE_SIZE(VALUE_SIZE),
+    .PACKET_SIZE(PACKET_SIZE),
+    .BATCH_SIZE(BATCH_SIZE),
+    .WINDOW_SIZE(WINDOW_SIZE),
+    .SEQ_BITS(SEQ_BITS)
+)
+bob (
+    .aclk(bob_aclk),
+    .aresetn(bob_aresetn),
+    .s_axis_tvalid(bob_rx_tvalid),
+    .s_axis_tdata(bob_rx_tdata),
+    .s_axis_tlast(bob_rx_tlast),
+    .s_axis_tready(bob_rx_tready),
+    .m_axis_tvalid(bob_tx_tvalid),
+    .m_axis_tdata(bob_tx_tdata),
+    .m_axis_tlast(bob_tx_tlast),
+    .m_axis_tready(bob_tx_tready),
+    .stat_cycles(),
+    .stat_frames_received(),
+    .stat_frames_sent(),
+    .stat_bit_mismatches(),
+    .stat_early_terminations(),
+    .stat_stall_cycles()
+);
+
+abp_async_fifo #(
+    .DATA_WIDTH(DATA_WIDTH),
+    .DEPTH(FIFO_DEPTH)
+)
+bob_to_alice_fifo (
+    .s_aclk(bob_aclk),
+    .s_aresetn(bob_aresetn),
+    .s_axis_tvalid(bob_tx_tvalid),
+    .s_axis_tdata(bob_tx_tdata),
+    .s_axis_tlast(bob_tx_tlast),
+    .s_axis_tready(bob_tx_tready),
+    .s_occupancy(bob_to_alice_s_occupancy),
+    .m_aclk(alice_aclk),
+    .m_aresetn(alice_aresetn),
+    .m_axis_tvalid(alice_rx_tvalid),
+    .m_axis_tdata(alice_rx_tdata),
+    .m_axis_tlast(alice_rx_tlast),
+    .m_axis_tready(alice_rx_tready),
+    .m_occupancy(bob_to_alice_m_occupancy)
+);
+
+endmodule
+
+`resetall
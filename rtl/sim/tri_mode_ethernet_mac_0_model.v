@@ -0,0 +1,181 @@
+// Language: Verilog 2001
+
+`resetall
+`timescale 1ps / 1ps
+`default_nettype none
+
+/*
+ * Simulation stand-in for the Xilinx Tri-Mode Ethernet MAC core.
+ *
+ * Port compatible with the tri_mode_ethernet_mac_0 instance in
+ * temac_fifo_block, but with no MAC or RGMII logic behind it: the client
+ * side AXI Stream interfaces are left as plain registers for a cocotb
+ * testbench to drive and sample (see tb/fpga_core_test.py).
+ *
+ *  - rx_axis_mac_* is driven by the testbench, clocked by rx_mac_aclk,
+ *    which follows rgmii_rxc as the recovered receive clock would
+ *  - tx_axis_mac_tready is driven by the testbench, clocked by
+ *    tx_mac_aclk, which follows gtx_clk
+ *
+ * rx_reset and tx_reset follow glbl_rstn into their clock domains, the AXI
+ * Lite configuration port accepts and ignores every access, and the
+ * statistics, RGMII and MDIO outputs are tied off.
+ */
+module tri_mode_ethernet_mac_0
+(
+    input  wire        gtx_clk,
+
+    input  wire        glbl_rstn,
+    input  wire        rx_axi_rstn,
+    input  wire        tx_axi_rstn,
+
+    // Receiver Interface
+    output wire [27:0] rx_statistics_vector,
+    output wire        rx_statistics_valid,
+
+    output wire        rx_mac_aclk,
+    output wire        rx_reset,
+    output reg  [7:0]  rx_axis_mac_tdata = 8'd0,
+    output reg         rx_axis_mac_tvalid = 1'b0,
+    output reg         rx_axis_mac_tlast = 1'b0,
+    output reg         rx_axis_mac_tuser = 1'b0,
+    output wire        rx_axis_filter_tuser,
+
+    // Transmitter Interface
+    input  wire [7:0]  tx_ifg_delay,
+    output wire [31:0] tx_statistics_vector,
+    output wire        tx_statistics_valid,
+
+    output wire        tx_mac_aclk,
+    output wire        tx_reset,
+    input  wire [7:0]  tx_axis_mac_tdata,
+    input  wire        tx_axis_mac_tvalid,
+    input  wire        tx_axis_mac_tlast,
+    input  wire        tx_axis_mac_tuser,
+    output reg         tx_axis_mac_tready = 1'b0,
+
+    // Flow Control
+    input  wire        pause_req,
+    input  wire [15:0] pause_val,
+
+    input  wire        refclk,
+
+    // Speed Control
+    output wire        speedis100,
+    output wire        speedis10100,
+
+    // RGMII Interface
+    output wire [3:0]  rgmii_txd,
+    output wire        rgmii_tx_ctl,
+    output wire        rgmii_txc,
+    input  wire [3:0]  rgmii_rxd,
+    input  wire        rgmii_rx_ctl,
+    input  wire        rgmii_rxc,
+    output wire        inband_link_status,
+    output wire [1:0]  inband_clock_speed,
+    output wire        inband_duplex_status,
+
+    // MDIO Interface
+    output wire        mdc,
+    input  wire        mdio_i,
+    output wire        mdio_o,
+    output wire        mdio_t,
+
+    // AXI Lite Interface
+    input  wire        s_axi_aclk,
+    input  wire        s_axi_resetn,
+    input  wire [11:0] s_axi_awaddr,
+    input  wire        s_axi_awvalid,
+    output wire        s_axi_awready,
+    input  wire [31:0] s_axi_wdata,
+    input  wire        s_axi_wvalid,
+    output wire        s_axi_wready,
+    output wire [1:0]  s_axi_bresp,
+    output reg         s_axi_bvalid = 1'b0,
+    input  wire        s_axi_bready,
+    input  wire [11:0] s_axi_araddr,
+    input  wire        s_axi_arvalid,
+    output wire        s_axi_arready,
+    output wire [31:0] s_axi_rdata,
+    output wire [1:0]  s_axi_rresp,
+    output reg         s_axi_rvalid = 1'b0,
+    input  wire        s_axi_rready,
+    output wire        mac_irq
+);
+
+// Clocks: 1G operation, so the MAC clocks run at the RGMII rates
+assign rx_mac_aclk = rgmii_rxc;
+assign tx_mac_aclk = gtx_clk;
+
+// Resets: asserted asynchronously with glbl_rstn, released on the local clock
+reg [1:0] rx_reset_sync = 2'b11;
+reg [1:0] tx_reset_sync = 2'b11;
+
+always @(posedge rx_mac_aclk or negedge glbl_rstn) begin
+    if (!glbl_rstn) begin
+        rx_reset_sync <= 2'b11;
+    end else begin
+        rx_reset_sync <= {rx_reset_sync[0], 1'b0};
+    end
+end
+
+always @(posedge tx_mac_aclk or negedge glbl_rstn) begin
+    if (!glbl_rstn) begin
+        tx_reset_sync <= 2'b11;
+    end else begin
+        tx_reset_sync <= {tx_reset_sync[0], 1'b0};
+    end
+end
+
+assign rx_reset = rx_reset_sync[1];
+assign tx_reset = tx_reset_sync[1];
+
+// AXI Lite: complete every write and read, reads return zero
+assign s_axi_awready = s_axi_awvalid && s_axi_wvalid && !s_axi_bvalid;
+assign s_axi_wready = s_axi_awready;
+assign s_axi_bresp = 2'b00;
+assign s_axi_arready = s_axi_arvalid && !s_axi_rvalid;
+assign s_axi_rdata = 32'd0;
+assign s_axi_rresp = 2'b00;
+
+always @(posedge s_axi_aclk) begin
+    if (!s_axi_resetn) begin
+        s_axi_bvalid <= 1'b0;
+        s_axi_rvalid <= 1'b0;
+    end else begin
+        if (s_axi_awready) begin
+            s_axi_bvalid <= 1'b1;
+        end else if (s_axi_bready) begin
+            s_axi_bvalid <= 1'b0;
+        end
+
+        if (s_axi_arready) begin
+            s_axi_rvalid <= 1'b1;
+        end else if (s_axi_rready) begin
+            s_axi_rvalid <= 1'b0;
+        end
+    end
+end
+
+// Tie-offs
+assign rx_statistics_vector = 28'd0;
+assign rx_statistics_valid = 1'b0;
+assign rx_axis_filter_tuser = 1'b0;
+assign tx_statistics_vector = 32'd0;
+assign tx_statistics_valid = 1'b0;
+assign speedis100 = 1'b0;
+assign speedis10100 = 1'b0;
+assign rgmii_txd = 4'd0;
+assign rgmii_tx_ctl = 1'b0;
+assign rgmii_txc = gtx_clk;
+assign inband_link_status = 1'b1;
+assign inband_clock_speed = 2'b10;
+assign inband_duplex_status = 1'b1;
+assign mdc = 1'b0;
+assign mdio_o = 1'b0;
+assign mdio_t = 1'b1;
+assign mac_irq = 1'b0;
+
+endmodule
+
+`resetall
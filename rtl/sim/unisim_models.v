@@ -0,0 +1,165 @@
+// Language: Verilog 2001
+
+`resetall
+`timescale 1ps / 1ps
+`default_nettype none
+
+/*
+ * Behavioral stand-ins for the Xilinx UNISIM primitives used by fpga_core
+ * and the TEMAC support files, so the design elaborates in an open-source
+ * simulator. Only the behavior fpga_core relies on is modeled; these are
+ * simulation models and must not be added to the synthesis file lists.
+ */
+
+module BUFG
+(
+    input  wire I,
+    output wire O
+);
+
+assign O = I;
+
+endmodule
+
+module FDRE
+#(
+    parameter [0:0] INIT = 1'b0
+)
+(
+    input  wire C,
+    input  wire CE,
+    input  wire D,
+    input  wire R,
+    output reg  Q
+);
+
+initial Q = INIT;
+
+always @(posedge C) begin
+    if (R) begin
+        Q <= 1'b0;
+    end else if (CE) begin
+        Q <= D;
+    end
+end
+
+endmodule
+
+module FDPE
+#(
+    parameter [0:0] INIT = 1'b1
+)
+(
+    input  wire C,
+    input  wire CE,
+    input  wire D,
+    input  wire PRE,
+    output reg  Q
+);
+
+initial Q = INIT;
+
+always @(posedge C or posedge PRE) begin
+    if (PRE) begin
+        Q <= 1'b1;
+    end else if (CE) begin
+        Q <= D;
+    end
+end
+
+endmodule
+
+/*
+ * MMCM model: CLKOUT0..2 run at CLKIN1 * CLKFBOUT_MULT_F / (DIVCLK_DIVIDE *
+ * CLKOUTn_DIVIDE) with a 50% duty cycle and no phase offset. LOCKED rises
+ * after LOCK_CYCLES input clock edges with RST low. The feedback path is
+ * not modeled; CLKFBOUT simply follows CLKIN1.
+ */
+module MMCME4_BASE
+#(
+    parameter BANDWIDTH = "OPTIMIZED",
+    parameter real CLKFBOUT_MULT_F = 5.0,
+    parameter real CLKFBOUT_PHASE = 0.0,
+    parameter real CLKIN1_PERIOD = 10.0,
+    parameter real CLKOUT0_DIVIDE_F = 1.0,
+    parameter real CLKOUT0_DUTY_CYCLE = 0.5,
+    parameter real CLKOUT0_PHASE = 0.0,
+    parameter integer CLKOUT1_DIVIDE = 1,
+    parameter real CLKOUT1_DUTY_CYCLE = 0.5,
+    parameter real CLKOUT1_PHASE = 0.0,
+    parameter integer CLKOUT2_DIVIDE = 1,
+    parameter real CLKOUT2_DUTY_CYCLE = 0.5,
+    parameter real CLKOUT2_PHASE = 0.0,
+    parameter integer CLKOUT3_DIVIDE = 1,
+    parameter real CLKOUT3_DUTY_CYCLE = 0.5,
+    parameter real CLKOUT3_PHASE = 0.0,
+    parameter integer CLKOUT4_DIVIDE = 1,
+    parameter real CLKOUT4_DUTY_CYCLE = 0.5,
+    parameter real CLKOUT4_PHASE = 0.0,
+    parameter integer CLKOUT5_DIVIDE = 1,
+    parameter real CLKOUT5_DUTY_CYCLE = 0.5,
+    parameter real CLKOUT5_PHASE = 0.0,
+    parameter integer CLKOUT6_DIVIDE = 1,
+    parameter real CLKOUT6_DUTY_CYCLE = 0.5,
+    parameter real CLKOUT6_PHASE = 0.0,
+    parameter CLKOUT4_CASCADE = "FALSE",
+    parameter integer DIVCLK_DIVIDE = 1,
+    parameter real REF_JITTER1 = 0.0,
+    parameter STARTUP_WAIT = "FALSE",
+    parameter integer LOCK_CYCLES = 16
+)
+(
+    input  wire CLKIN1,
+    input  wire CLKFBIN,
+    input  wire RST,
+    input  wire PWRDWN,
+    output reg  CLKOUT0 = 1'b0,
+    output wire CLKOUT0B,
+    output reg  CLKOUT1 = 1'b0,
+    output wire CLKOUT1B,
+    output reg  CLKOUT2 = 1'b0,
+    output wire CLKOUT2B,
+    output wire CLKOUT3,
+    output wire CLKOUT3B,
+    output wire CLKOUT4,
+    output wire CLKOUT5,
+    output wire CLKOUT6,
+    output wire CLKFBOUT,
+    output wire CLKFBOUTB,
+    output reg  LOCKED = 1'b0
+);
+
+// VCO period in ps; CLKIN1_PERIOD is given in ns
+localparam real VcoPeriod = CLKIN1_PERIOD * 1000.0 * DIVCLK_DIVIDE / CLKFBOUT_MULT_F;
+
+integer lock_count = 0;
+
+always @(posedge CLKIN1 or posedge RST) begin
+    if (RST || PWRDWN) begin
+        lock_count <= 0;
+        LOCKED <= 1'b0;
+    end else if (lock_count < LOCK_CYCLES) begin
+        lock_count <= lock_count + 1;
+    end else begin
+        LOCKED <= 1'b1;
+    end
+end
+
+always #(VcoPeriod * CLKOUT0_DIVIDE_F / 2.0) CLKOUT0 = !CLKOUT0;
+always #(VcoPeriod * CLKOUT1_DIVIDE / 2.0) CLKOUT1 = !CLKOUT1;
+always #(VcoPeriod * CLKOUT2_DIVIDE / 2.0) CLKOUT2 = !CLKOUT2;
+
+assign CLKOUT0B = !CLKOUT0;
+assign CLKOUT1B = !CLKOUT1;
+assign CLKOUT2B = !CLKOUT2;
+assign CLKOUT3 = 1'b0;
+assign CLKOUT3B = 1'b1;
+assign CLKOUT4 = 1'b0;
+assign CLKOUT5 = 1'b0;
+assign CLKOUT6 = 1'b0;
+assign CLKFBOUT = CLKIN1;
+assign CLKFBOUTB = !CLKIN1;
+
+endmodule
+
+`resetall
@@ -0,0 +1,198 @@
+import cocotb
+from cocotb.triggers import ClockCycles, RisingEdge, Timer
+
+import logging
+import os
+
+from utils.abp_stats import AbpCounters, RECEIVER_COUNTERS, TRANSMITTER_COUNTERS
+
+# Clock configuration of test_cosim_configured, and the ratios swept by
+# test_cosim_ratio_sweep. A ratio is Bob's clock period over Alice's.
+ALICE_PERIOD_PS = int(os.environ.get('COSIM_ALICE_PS', '8000'))
+RATIO = float(os.environ.get('COSIM_RATIO', '1.0'))
+DRIFT_PPM = float(os.environ.get('COSIM_DRIFT_PPM', '100'))
+PHASE_PS = int(os.environ.get('COSIM_PHASE_PS', '1234'))
+SWEEP_RATIOS = [float(r) for r in os.environ.get('COSIM_RATIOS', '1.0,0.5,0.8,1.25,2.0').split(',')]
+RUN_CYCLES = int(os.environ.get('COSIM_CYCLES', '20000'))
+
+async def drifting_clock(signal, period_ps, drift_ppm=0.0, phase_ps=0):
+    """
+    Square wave of period_ps scaled by drift_ppm, starting after phase_ps.
+
+    Edges are placed on the 1 ps grid, carrying the rounding error forward,
+    so a drift well below 1 ps per cycle still slides the phase of this
+    clock smoothly through every alignment with the other one.
+    """
+    signal.value = 0
+    if phase_ps:
+        await Timer(phase_ps, units='ps')
+    half_period = period_ps * (1 + drift_ppm * 1e-6) / 2
+    ideal = 0.0
+    now = 0
+    level = 1
+    while True:
+        signal.value = level
+        ideal += half_period
+        step = max(1, round(ideal) - now)
+        now += step
+        await Timer(step, units='ps')
+        level ^= 1
+
+class ABP_Cosim_Testbench:
+    """
+    Runs abp_cosim: Alice (abp_transmitter) and Bob (abp_receiver) in their
+    own clock domains, connected by a pair of abp_async_fifo instances.
+    Alice's clock is the reference; Bob's runs at ratio times its period
+    plus a drift in ppm, so the two slide in phase against each other.
+    Occupancy of both FIFOs is sampled on both sides every cycle.
+    """
+    def __init__(self, dut):
+        self.dut = dut
+        self.log = logging.getLogger("abp_cosim.tb")
+        self.log.setLevel(logging.DEBUG)
+
+        self.fifo_depth = int(dut.FIFO_DEPTH.value)
+        self.batch_size = int(dut.BATCH_SIZE.value)
+        self.window_size = int(dut.WINDOW_SIZE.value)
+
+        self.clocks = []
+        self.monitors = []
+        self.high_water = {}
+
+    def start_clocks(self, alice_period_ps, ratio=1.0, drift_ppm=0.0, phase_ps=0):
+        """(Re)start both clocks. Bob's period is ratio times Alice's, then drifted."""
+        for task in self.clocks + self.monitors:
+            task.kill()
+        self.alice_period_ps = alice_period_ps
+        self.bob_period_ps = alice_period_ps * ratio * (1 + drift_ppm * 1e-6)
+        self.clocks = [
+            cocotb.start_soon(drifting_clock(self.dut.alice_aclk, alice_period_ps)),
+            cocotb.start_soon(drifting_clock(self.dut.bob_aclk, alice_period_ps * ratio, drift_ppm, phase_ps)),
+        ]
+        self.monitors = [
+            cocotb.start_soon(self._watch(self.dut.alice_aclk, ('alice_to_bob_s', 'bob_to_alice_m'))),
+            cocotb.start_soon(self._watch(self.dut.bob_aclk, ('alice_to_bob_m', 'bob_to_alice_s'))),
+        ]
+
+    async def _watch(self, clock, sides):
+        handles = [(side, getattr(self.dut, f'{side}_occupancy')) for side in sides]
+        while True:
+            await RisingEdge(clock)
+            for side, handle in handles:
+                if handle.value.is_resolvable:
+                    occupancy = handle.value.integer
+                    assert occupancy <= self.fifo_depth, f"{side} occupancy {occupancy} exceeds FIFO_DEPTH"
+                    self.high_water[side] = max(self.high_water.get(side, 0), occupancy)
+
+    async def reset(self):
+        self.dut.alice_aresetn.value = 0
+        self.dut.bob_aresetn.value = 0
+        await ClockCycles(self.dut.alice_aclk, 4)
+        await ClockCycles(self.dut.bob_aclk, 4)
+        self.dut.alice_aresetn.value = 1
+        await RisingEdge(self.dut.bob_aclk)
+        self.dut.bob_aresetn.value = 1
+        await RisingEdge(self.dut.alice_aclk)
+
+    async def run(self, cycles):
+        """Run for cycles of Alice's clock and return the measured statistics."""
+        alice_before = AbpCounters.from_dut(self.dut.alice, TRANSMITTER_COUNTERS)
+        bob_before = AbpCounters.from_dut(self.dut.bob, RECEIVER_COUNTERS)
+        self.high_water = {}
+
+        await ClockCycles(self.dut.alice_aclk, cycles)
+
+        alice = AbpCounters.from_dut(self.dut.alice, TRANSMITTER_COUNTERS).delta(alice_before)
+        bob = AbpCounters.from_dut(self.dut.bob, RECEIVER_COUNTERS).delta(bob_before)
+        seconds = alice['cycles'] * self.alice_period_ps * 1e-12
+        return {
+            'alice_mhz': 1e6 / self.alice_period_ps,
+            'bob_mhz': 1e6 / self.bob_period_ps,
+            'frames_per_sec': alice['frames_received'] / seconds,
+            'values_per_sec': alice['frames_received'] * self.batch_size / seconds,
+            'frames_acknowledged': alice['frames_received'],
+            'bob_frames_received': bob['frames_received'],
+            'retransmissions': alice['retransmissions'],
+            'timeouts': alice['timeouts'],
+            'bit_mismatches': bob['bit_mismatches'],
+            'early_terminations': alice['early_terminations'] + bob['early_terminations'],
+            'high_water': dict(self.high_water),
+        }
+
+    def report(self, label, stats, baseline=None):
+        relative = f", {100 * stats['frames_per_sec'] / baseline:.1f}% of matched clocks" if baseline else ""
+        hw = stats['high_water']
+        self.log.info(
+            f"{label}: Alice {stats['alice_mhz']:.3f} MHz, Bob {stats['bob_mhz']:.3f} MHz, "
+            f"{stats['frames_per_sec'] / 1e6:.4f} Mframes/s{relative}, "
+            f"{stats['retransmissions']} retransmissions"
+        )
+        self.log.info(
+            f"{label}: FIFO high water (write/read side) "
+            f"Alice->Bob {hw.get('alice_to_bob_s', 0)}/{hw.get('alice_to_bob_m', 0)}, "
+            f"Bob->Alice {hw.get('bob_to_alice_s', 0)}/{hw.get('bob_to_alice_m', 0)} "
+            f"of {self.fifo_depth}"
+        )
+
+@cocotb.test(timeout_time=10, timeout_unit="ms")
+async def test_cosim_configured(dut):
+    """
+    Test Alice and Bob across the CDC FIFOs with the configured clocks.
+
+    This test verifies:
+    - Frames flow both ways through the async FIFOs with drifting clocks
+    - Every frame Alice sends is acknowledged, with no timeouts
+    - Bob never sees a sequence mismatch, and neither side a frame cut short
+    - Sustained throughput and FIFO high-water marks are reported
+    """
+    tb = ABP_Cosim_Testbench(dut)
+    tb.start_clocks(ALICE_PERIOD_PS, RATIO, DRIFT_PPM, PHASE_PS)
+
+    await tb.reset()
+
+    stats = await tb.run(RUN_CYCLES)
+    tb.report(f"ratio {RATIO}, drift {DRIFT_PPM} ppm", stats)
+
+    assert stats['frames_acknowledged'] > 0, "No frame made it around the loop"
+    assert stats['timeouts'] == 0 and stats['retransmissions'] == 0, \
+        f"{stats['timeouts']} timeouts and {stats['retransmissions']} retransmissions on a lossless link"
+    assert stats['bit_mismatches'] == 0, f"Bob saw {stats['bit_mismatches']} sequence mismatches"
+    assert stats['early_terminations'] == 0, \
+        f"{stats['early_terminations']} frames cut short, the FIFO output has tvalid gaps the parsers must ride out"
+    # Frames in flight at either end of the window are counted by one side only
+    assert abs(stats['bob_frames_received'] - stats['frames_acknowledged']) <= tb.window_size, \
+        f"Bob received {stats['bob_frames_received']} frames, Alice got {stats['frames_acknowledged']} acknowledgements"
+
+@cocotb.test(timeout_time=50, timeout_unit="ms")
+async def test_cosim_ratio_sweep(dut):
+    """
+    Test throughput and FIFO occupancy across a sweep of clock ratios.
+
+    This test verifies:
+    - Throughput and high-water marks are reported for every ratio in
+      COSIM_RATIOS, relative to matched clocks
+    - The link stays lossless at every ratio. When the reading side is
+      faster, the FIFO output has tvalid gaps inside frames and each
+      parser must count only accepted beats. When it is slower, the FIFO
+      fills and the sender must hold its beats, tlast included, until
+      there is room. Either way no frame is cut short, retransmitted or
+      timed out
+    - No FIFO is ever seen holding more than FIFO_DEPTH beats
+    """
+    tb = ABP_Cosim_Testbench(dut)
+    baseline = None
+
+    for ratio in SWEEP_RATIOS:
+        tb.start_clocks(ALICE_PERIOD_PS, ratio, DRIFT_PPM, PHASE_PS)
+        await tb.reset()
+
+        stats = await tb.run(RUN_CYCLES)
+        if ratio == 1.0:
+            baseline = stats['frames_per_sec']
+        tb.report(f"ratio {ratio}", stats, baseline)
+
+        assert stats['frames_acknowledged'] > 0, f"No frame made it around the loop at ratio {ratio}"
+        assert stats['timeouts'] == 0 and stats['retransmissions'] == 0, \
+            f"{stats['timeouts']} timeouts and {stats['retransmissions']} retransmissions at ratio {ratio}"
+        assert stats['bit_mismatches'] == 0, f"Bob saw {stats['bit_mismatches']} sequence mismatches at ratio {ratio}"
+        assert stats['early_terminations'] == 0, f"{stats['early_terminations']} frames cut short at ratio {ratio}"
@@ -0,0 +1,201 @@
+import cocotb
+from cocotb.clock import Clock
+from cocotb.queue import Queue
+from cocotb.triggers import RisingEdge, Timer
+from cocotb.utils import get_sim_time
+from cocotbext.axi import AxiStreamBus, AxiStreamSource, AxiStreamSink
+
+import logging
+import random
+
+from utils.abp_stats import AbpCounters, MUX_COUNTERS
+
+class ABP_Mux_Testbench:
+    """
+    Drives abp_mux built with ROLE = "RECEIVER" from a set of Python ABP
+    senders, one per session, all sharing the mux's single link. Every
+    frame is prefixed with its session ID; acknowledgements are routed back
+    to their sender by the same header.
+    """
+    def __init__(self, dut):
+        self.dut = dut
+        self.log = logging.getLogger("abp_mux.tb")
+        self.log.setLevel(logging.DEBUG)
+
+        self.packet_size = int(dut.PACKET_SIZE.value)
+        self.sessions = int(dut.SESSIONS.value)
+        self.clock_period_ns = 8
+
+        cocotb.start_soon(Clock(dut.aclk, self.clock_period_ns, units='ns').start())
+
+        # AXI Stream interfaces
+        self.source = AxiStreamSource(AxiStreamBus.from_prefix(dut, "s_axis"), dut.aclk, dut.aresetn, reset_active_level=False)
+        self.sink = AxiStreamSink(AxiStreamBus.from_prefix(dut, "m_axis"), dut.aclk, dut.aresetn, reset_active_level=False)
+
+        # Acknowledgements per session, and the order sessions were served in
+        self.acks = [Queue() for _ in range(self.sessions)]
+        self.served = []
+        cocotb.start_soon(self._route_acks())
+
+    async def reset(self):
+        self.dut.aresetn.setimmediatevalue(1)
+        await RisingEdge(self.dut.aclk)
+        await RisingEdge(self.dut.aclk)
+        self.dut.aresetn.value = 0
+        await RisingEdge(self.dut.aclk)
+        await RisingEdge(self.dut.aclk)
+        self.dut.aresetn.value = 1
+        await RisingEdge(self.dut.aclk)
+        await RisingEdge(self.dut.aclk)
+
+    def frame(self, session, value, bit):
+        packet = value.to_bytes(4, 'big')
+        packet += bytes([0] * (self.packet_size - 5))  # Padding
+        packet += bytes([bit])
+        return bytes([session]) + packet
+
+    async def _route_acks(self):
+        while True:
+            rx_frame = await self.sink.recv()
+            tdata = rx_frame.tdata
+            assert len(tdata) == self.packet_size + 1, f"Frame size is incorrect: {len(tdata)}"
+            session = tdata[0]
+            assert session < self.sessions, f"Acknowledgement for unknown session {session}"
+            self.served.append(session)
+            self.acks[session].put_nowait((int.from_bytes(tdata[1:5], 'big'), tdata[-1]))
+
+    async def run_session(self, session, frames, first_value):
+        """Stop-and-wait ABP sender: one frame, wait for its acknowledgement, repeat."""
+        value = first_value
+        for i in range(frames):
+            bit = i % 2
+            await self.source.send(self.frame(session, value, bit))
+            ack_value, ack_bit = await self.acks[session].get()
+            assert ack_bit == bit, f"Session {session}: frame {i} acknowledged with bit {ack_bit}"
+            assert ack_value == value + 1, f"Session {session}: expected {value + 1}, got {ack_value}"
+            value = ack_value
+
+    async def run_sessions(self, active, frames):
+        """Run the first active sessions concurrently and return the aggregate frames/sec."""
+        start = get_sim_time('ns')
+        tasks = [
+            cocotb.start_soon(self.run_session(session, frames, 1000 * session))
+            for session in range(active)
+        ]
+        for task in tasks:
+            await task
+        elapsed = get_sim_time('ns') - start
+        return active * frames / (elapsed * 1e-9)
+
+def throttle(rng, probability):
+    """Pause generator holding tready low on a random fraction of cycles."""
+    while True:
+        yield rng.random() < probability
+
+@cocotb.test(timeout_time=100, timeout_unit="us")
+async def test_sessions_are_independent(dut):
+    """
+    Test that frames are demultiplexed to the session named in their header.
+
+    This test verifies:
+    - Each session's acknowledgement carries that session's ID
+    - Interleaved sessions keep their own values and bits
+    """
+    tb = ABP_Mux_Testbench(dut)
+
+    await tb.reset()
+
+    await tb.run_sessions(tb.sessions, frames=4)
+
+    # The last acknowledgement's tlast is counted on the edge it is accepted
+    await RisingEdge(dut.aclk)
+    counters = AbpCounters.from_dut(dut, MUX_COUNTERS)
+    assert counters['frames_received'] == 4 * tb.sessions, f"frames_received={counters['frames_received']}"
+    assert counters['frames_sent'] == 4 * tb.sessions, f"frames_sent={counters['frames_sent']}"
+
+@cocotb.test(timeout_time=20, timeout_unit="us")
+async def test_unknown_session_dropped(dut):
+    """
+    Test that a frame for a session that does not exist is discarded.
+
+    This test verifies:
+    - No acknowledgement is produced for an unknown session ID
+    - The frame is counted in stat_unknown_sessions
+    - The next frame for a valid session is handled normally
+    """
+    tb = ABP_Mux_Testbench(dut)
+
+    await tb.reset()
+
+    await tb.source.send(tb.frame(tb.sessions, 0x1234, 0))
+    await tb.source.wait()
+    await Timer(2 * tb.packet_size * tb.clock_period_ns, units='ns')
+    assert tb.sink.empty() and not tb.served, "Frame for unknown session was acknowledged"
+    assert dut.stat_unknown_sessions.value == 1, "Unknown session was not counted"
+
+    await tb.run_session(0, frames=2, first_value=10)
+
+@cocotb.test(timeout_time=2000, timeout_unit="us")
+async def test_round_robin_fairness(dut):
+    """
+    Test fairness of the output arbiter under backpressure.
+
+    This test verifies:
+    - With the link out throttled, every session keeps a frame waiting
+    - The arbiter serves waiting sessions in round-robin order
+    - No session gets more than two frames ahead of another
+    """
+    tb = ABP_Mux_Testbench(dut)
+    rng = random.Random(31)
+    frames = 16
+
+    await tb.reset()
+
+    tb.sink.set_pause_generator(throttle(rng, 0.75))
+    await tb.run_sessions(tb.sessions, frames)
+    tb.sink.clear_pause_generator()
+
+    counts = [tb.served.count(session) for session in range(tb.sessions)]
+    assert counts == [frames] * tb.sessions, f"Sessions served unevenly: {counts}"
+
+    # Sessions advance in rounds, so none gets ahead of another by more than a round
+    progress = [0] * tb.sessions
+    for session in tb.served:
+        progress[session] += 1
+        assert max(progress) - min(progress) <= 2, f"Sessions diverged: {progress}"
+
+@cocotb.test(timeout_time=5000, timeout_unit="us")
+async def test_throughput_scaling(dut):
+    """
+    Test aggregate throughput as the number of active sessions grows.
+
+    This test verifies:
+    - Aggregate frames/sec is reported for 1 to SESSIONS active sessions
+    - Throughput never drops as sessions are added
+    - SESSIONS sessions get well beyond what one stop-and-wait session can
+    """
+    tb = ABP_Mux_Testbench(dut)
+    frames = 16
+
+    await tb.reset()
+
+    link_fps = 1e9 / ((tb.packet_size + 1) * tb.clock_period_ns)
+    results = {}
+    for active in range(1, tb.sessions + 1):
+        prev = AbpCounters.from_dut(dut, MUX_COUNTERS)
+        fps = await tb.run_sessions(active, frames)
+        await RisingEdge(dut.aclk)
+        rates = AbpCounters.from_dut(dut, MUX_COUNTERS).rates(prev, 1e9 / tb.clock_period_ns)
+        results[active] = fps
+        tb.log.info(
+            f"{active:>3} session(s): {fps / 1e6:.3f} Mframes/s, "
+            f"{100 * fps / link_fps:.1f}% of the link, "
+            f"output stalled {100 * rates['stall_fraction']:.1f}%"
+        )
+
+    for active in range(2, tb.sessions + 1):
+        assert results[active] >= 0.95 * results[active - 1], \
+            f"Throughput dropped from {results[active - 1]:.0f} to {results[active]:.0f} frames/s at {active} sessions"
+    if tb.sessions > 1:
+        assert results[tb.sessions] >= 1.5 * results[1], \
+            f"{tb.sessions} sessions reached only {results[tb.sessions] / results[1]:.2f}x one session"
@@ -0,0 +1,127 @@
+import cocotb
+from cocotb.clock import Clock
+from cocotb.triggers import RisingEdge
+from cocotbext.axi import AxiStreamBus, AxiStreamSource, AxiStreamSink
+
+import logging
+import random
+
+from abp_mux_test import throttle
+from utils.abp_stats import AbpCounters, MUX_COUNTERS
+
+class ABP_Mux_Transmitter_Testbench:
+    """
+    Drives abp_mux built with ROLE = "TRANSMITTER" from a Python ABP
+    receiver. Every session starts sending on its own after reset, so all
+    of them contend for the shared link at once; each frame is checked
+    against that session's expected value and bit and acknowledged back
+    through the mux under the same session ID.
+    """
+    def __init__(self, dut):
+        self.dut = dut
+        self.log = logging.getLogger("abp_mux_transmitter.tb")
+        self.log.setLevel(logging.DEBUG)
+
+        self.packet_size = int(dut.PACKET_SIZE.value)
+        self.sessions = int(dut.SESSIONS.value)
+        self.batch_size = int(dut.BATCH_SIZE.value)
+        self.clock_period_ns = 8
+
+        cocotb.start_soon(Clock(dut.aclk, self.clock_period_ns, units='ns').start())
+
+        # AXI Stream interfaces
+        self.source = AxiStreamSource(AxiStreamBus.from_prefix(dut, "s_axis"), dut.aclk, dut.aresetn, reset_active_level=False)
+        self.sink = AxiStreamSink(AxiStreamBus.from_prefix(dut, "m_axis"), dut.aclk, dut.aresetn, reset_active_level=False)
+
+    async def reset(self):
+        self.dut.aresetn.setimmediatevalue(1)
+        await RisingEdge(self.dut.aclk)
+        await RisingEdge(self.dut.aclk)
+        self.dut.aresetn.value = 0
+        await RisingEdge(self.dut.aclk)
+        await RisingEdge(self.dut.aclk)
+        self.dut.aresetn.value = 1
+
+    def frame(self, session, value, bit):
+        packet = value.to_bytes(4, 'big')
+        packet += bytes([0] * (self.packet_size - 5))  # Padding
+        packet += bytes([bit])
+        return bytes([session]) + packet
+
+    async def run(self, frames):
+        """
+        Acknowledge frames per session until every session has sent that
+        many, and return the order sessions were served in.
+
+        The first frame of a session carries 1 and bit 1. Acknowledging
+        value v moves the transmitter to v + BATCH_SIZE, and abp_packet_tx
+        adds one on the way out, with the bit flipped.
+        """
+        expected = [(1, 1)] * self.sessions
+        sent = [0] * self.sessions
+        served = []
+        while min(sent) < frames:
+            rx_frame = await self.sink.recv()
+            tdata = rx_frame.tdata
+            assert len(tdata) == self.packet_size + 1, f"Frame size is incorrect: {len(tdata)}"
+            session = tdata[0]
+            assert session < self.sessions, f"Frame from unknown session {session}"
+            value, bit = int.from_bytes(tdata[1:5], 'big'), tdata[-1]
+            assert (value, bit) == expected[session], \
+                f"Session {session}: frame {sent[session]} carried ({value}, {bit}), expected {expected[session]}"
+
+            served.append(session)
+            sent[session] += 1
+            expected[session] = (value + self.batch_size + 1, bit ^ 1)
+            await self.source.send(self.frame(session, value, bit))
+        return served
+
+@cocotb.test(timeout_time=200, timeout_unit="us")
+async def test_transmitter_sessions(dut):
+    """
+    Test transmitter sessions sharing the link.
+
+    This test verifies:
+    - Every session's first frame reaches the link after reset
+    - Each session's frames carry its own values and alternating bit
+    - Acknowledgements are routed back to the session named in their header
+    """
+    tb = ABP_Mux_Transmitter_Testbench(dut)
+    frames = 4
+
+    await tb.reset()
+
+    served = await tb.run(frames)
+
+    assert sorted(set(served)) == list(range(tb.sessions)), f"Sessions served: {sorted(set(served))}"
+
+    await tb.source.wait()
+    await RisingEdge(dut.aclk)
+    counters = AbpCounters.from_dut(dut, MUX_COUNTERS)
+    assert counters['frames_received'] == len(served), f"frames_received={counters['frames_received']}"
+    assert counters['frames_sent'] >= len(served), f"frames_sent={counters['frames_sent']}"
+
+@cocotb.test(timeout_time=2000, timeout_unit="us")
+async def test_transmitter_backpressure(dut):
+    """
+    Test transmitter sessions with the link out throttled.
+
+    This test verifies:
+    - Frames held by a stalled link are not lost or merged, including
+      the tlast beat
+    - The arbiter serves every waiting session in round-robin order
+    """
+    tb = ABP_Mux_Transmitter_Testbench(dut)
+    rng = random.Random(31)
+    frames = 8
+
+    await tb.reset()
+
+    tb.sink.set_pause_generator(throttle(rng, 0.75))
+    served = await tb.run(frames)
+    tb.sink.clear_pause_generator()
+
+    progress = [0] * tb.sessions
+    for session in served:
+        progress[session] += 1
+        assert max(progress) - min(progress) <= 2, f"Sessions diverged: {progress}"
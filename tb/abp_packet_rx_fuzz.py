@@ -0,0 +1,292 @@
+import cocotb
+from cocotb.clock import Clock
+from cocotb.triggers import RisingEdge
+import json
+import logging
+import random
+import time
+
+from utils import abp_fuzz
+from utils.abp_fuzz import Corpus, FuzzCase, Mutator
+
+class Finding(Exception):
+    """An invariant of the parser was broken by the case being executed."""
+
+class ABP_Packet_Rx_Fuzzer:
+    """
+    Executes abp_fuzz cases against abp_packet_rx one beat per cycle and
+    checks the parser against a reference model of the frame format.
+
+    Coverage comes from the parser's own registers, sampled every cycle, so
+    it works on any simulator: the parser state (byte counter region, output
+    valid, early termination flag), the transitions between states, what
+    each beat did in each state, and the length class of each frame.
+    """
+    # Cycles run after the last beat so its effects reach the outputs
+    DRAIN_CYCLES = 4
+
+    def __init__(self, dut):
+        self.dut = dut
+        self.log = logging.getLogger("abp_packet_rx.fuzz")
+        self.log.setLevel(logging.DEBUG)
+
+        self.packet_size = int(dut.PACKET_SIZE.value)
+        self.payload_bytes = int(dut.VALUE_SIZE.value) * int(dut.BATCH_SIZE.value)
+        self.bit_mask = (1 << int(dut.SEQ_BITS.value)) - 1
+        # byte_counter_reg is $clog2(PACKET_SIZE) bits wide and wraps on long frames
+        self.counter_mask = (1 << (self.packet_size - 1).bit_length()) - 1
+
+        cocotb.start_soon(Clock(dut.aclk, 8, units='ns').start())
+
+    async def reset(self):
+        self.dut.eth_rx_tvalid.setimmediatevalue(0)
+        self.dut.eth_rx_tdata.setimmediatevalue(0)
+        self.dut.eth_rx_tlast.setimmediatevalue(0)
+        self.dut.abp_tx_ready.setimmediatevalue(0)
+        self.dut.resetn.value = 0
+        await RisingEdge(self.dut.aclk)
+        await RisingEdge(self.dut.aclk)
+        self.dut.resetn.value = 1
+        await RisingEdge(self.dut.aclk)
+
+    def region(self, counter):
+        if counter == 0:
+            return 'start'
+        if counter < self.payload_bytes:
+            return 'payload'
+        if counter < self.packet_size - 1:
+            return 'padding'
+        if counter == self.packet_size - 1:
+            return 'bit'
+        return 'over'
+
+    def length_class(self, length):
+        if length < self.payload_bytes:
+            return 'truncated_payload'
+        if length < self.packet_size - 1:
+            return 'short'
+        if length == self.packet_size - 1:
+            return 'one_short'
+        if length == self.packet_size:
+            return 'exact'
+        if length <= self.counter_mask + 1:
+            return 'long'
+        return 'wrapped'
+
+    async def execute(self, case):
+        """Run one case from reset. Returns the coverage points it reached and a finding or None."""
+        coverage = set()
+        try:
+            await self.reset()
+            await self._run(case, coverage)
+        except Finding as finding:
+            return coverage, str(finding)
+        return coverage, None
+
+    async def _run(self, case, coverage):
+        dut = self.dut
+        beats = case.beats
+        ready = case.ready
+
+        i = 0
+        gap = beats[0][0] if beats else 0
+        drain = self.DRAIN_CYCLES
+        cycle = 0
+
+        frame = bytearray()
+        frames = 0
+        expected_received = expected_early = 0
+        expect = None
+        prev_state = None
+        prev_valid = prev_ready = prev_error = 0
+
+        while i < len(beats) or drain:
+            # Drive this cycle's inputs
+            if i < len(beats):
+                _, data, last, idle_data, idle_last = beats[i]
+                if gap:
+                    dut.eth_rx_tvalid.value = 0
+                    dut.eth_rx_tdata.value = idle_data
+                    dut.eth_rx_tlast.value = idle_last
+                else:
+                    dut.eth_rx_tvalid.value = 1
+                    dut.eth_rx_tdata.value = data
+                    dut.eth_rx_tlast.value = last
+            else:
+                dut.eth_rx_tvalid.value = 0
+                dut.eth_rx_tlast.value = 0
+                drain -= 1
+            dut.abp_tx_ready.value = int(ready[cycle % len(ready)])
+            cycle += 1
+
+            await RisingEdge(dut.aclk)
+
+            # Sample the parser as it was during the cycle that just ended
+            for name in ('eth_rx_tready', 'abp_tx_valid', 'error_early_termination', 'byte_counter_reg'):
+                if not getattr(dut, name).value.is_resolvable:
+                    raise Finding(f"{name} is {getattr(dut, name).value} on cycle {cycle}")
+            tvalid = int(dut.eth_rx_tvalid.value)
+            tlast = int(dut.eth_rx_tlast.value)
+            tready = int(dut.eth_rx_tready.value)
+            abp_ready = int(dut.abp_tx_ready.value)
+            valid = int(dut.abp_tx_valid.value)
+            error = int(dut.error_early_termination.value)
+            region = self.region(int(dut.byte_counter_reg.value))
+
+            # Check what the previous accepted tlast should have produced
+            if expect is not None:
+                accept, length, payload, bit = expect
+                if error != (not accept):
+                    raise Finding(f"{length} byte frame left error_early_termination={error}")
+                if accept and not valid:
+                    raise Finding(f"{length} byte frame was not presented on abp_tx")
+                if accept and length == self.packet_size:
+                    value = int(dut.abp_tx_value.value)
+                    if value != int.from_bytes(payload, 'big') or int(dut.abp_tx_bit.value) != bit:
+                        raise Finding(
+                            f"{length} byte frame parsed as value {value:#x} bit {int(dut.abp_tx_bit.value)}, "
+                            f"expected {int.from_bytes(payload, 'big'):#x} bit {bit}"
+                        )
+            elif valid and not prev_valid:
+                raise Finding(f"abp_tx_valid rose on cycle {cycle} without an accepted tlast beat")
+            elif error != prev_error:
+                raise Finding(f"error_early_termination changed on cycle {cycle} without an accepted tlast beat")
+            if prev_valid and not prev_ready and expect is None and not valid:
+                raise Finding(f"abp_tx_valid dropped on cycle {cycle} while abp_tx_ready was low")
+            if int(dut.stat_frames_received.value) != expected_received:
+                raise Finding(f"stat_frames_received={int(dut.stat_frames_received.value)}, expected {expected_received}")
+            if int(dut.stat_early_terminations.value) != expected_early:
+                raise Finding(f"stat_early_terminations={int(dut.stat_early_terminations.value)}, expected {expected_early}")
+            expect = None
+
+            state = f"{region}:{valid}:{error}"
+            coverage.add(f"state:{state}")
+            if prev_state is not None:
+                coverage.add(f"edge:{prev_state}>{state}")
+            prev_state = state
+            if valid and not abp_ready:
+                coverage.add(f"stall:{region}")
+            if not tvalid and tlast:
+                coverage.add(f"idle_tlast:{region}")
+
+            if valid and tready:
+                raise Finding(f"eth_rx_tready high on cycle {cycle} while a parsed frame was held")
+
+            # Handshake on the edge just sampled
+            if tvalid:
+                coverage.add(f"beat:{region}:{tlast}:{tready}")
+                if tready:
+                    frame.append(int(dut.eth_rx_tdata.value))
+                    if tlast:
+                        length = len(frame)
+                        accept = ((length - 1) & self.counter_mask) >= self.packet_size - 1
+                        expect = (accept, length, bytes(frame[:self.payload_bytes]), frame[-1] & self.bit_mask)
+                        if accept:
+                            expected_received += 1
+                        else:
+                            expected_early += 1
+                        coverage.add(f"frame:{self.length_class(length)}:{int(accept)}")
+                        frames += 1
+                        frame = bytearray()
+                    i += 1
+                    gap = beats[i][0] if i < len(beats) else 0
+            elif i < len(beats):
+                gap -= 1
+
+            prev_valid, prev_ready, prev_error = valid, abp_ready, error
+
+        coverage.add(f"frames:{min(frames, 4)}")
+        if frame:
+            coverage.add("unterminated")
+
+def load_case(path):
+    with open(path) as f:
+        return FuzzCase.from_json(json.load(f)['case'])
+
+@cocotb.test(skip=bool(abp_fuzz.REPLAY))
+async def test_abp_rx_fuzz(dut):
+    """
+    Coverage-guided fuzzing of the frame parser.
+
+    This test verifies, for every generated case:
+    - Outputs never go X or Z after reset
+    - Exactly the frames whose tlast lands on the last byte are presented
+    - A PACKET_SIZE frame is presented with its value and bit
+    - Anything else raises error_early_termination and nothing on abp_tx
+    - tlast with tvalid low, and tdata while idle, change nothing
+    - No beat is accepted while a parsed frame waits on abp_tx
+    - The stat counters agree with the frames seen
+    Cases that reach new coverage are kept in the corpus, and cases that
+    break an invariant are written to its crashes directory.
+    """
+    fuzzer = ABP_Packet_Rx_Fuzzer(dut)
+    rng = random.Random(abp_fuzz.SEED)
+    mutator = Mutator(rng, fuzzer.packet_size)
+    corpus = Corpus(abp_fuzz.CORPUS)
+    coverage = set()
+    queue = []
+    findings = 0
+    execs = 0
+    start = last_report = time.time()
+
+    async def run(case):
+        nonlocal execs, findings
+        points, finding = await fuzzer.execute(case)
+        execs += 1
+        if finding:
+            findings += 1
+            corpus.add_crash(case, finding)
+            fuzzer.log.error(f"Finding {case.key}: {finding}")
+        if points - coverage:
+            coverage.update(points)
+            queue.append(case)
+            corpus.add(case, points)
+
+    def report():
+        elapsed = time.time() - start
+        fuzzer.log.info(
+            f"worker {abp_fuzz.WORKER}: {execs} execs, {execs / elapsed:.1f} execs/s, "
+            f"{len(queue)} queued, {len(coverage)} coverage points, {findings} finding(s)"
+        )
+        corpus.write_stats(abp_fuzz.WORKER, {'execs': execs, 'seconds': elapsed, 'findings': findings})
+
+    for case, points in corpus.sync():
+        coverage.update(points)
+        queue.append(case)
+    if not queue:
+        for case in abp_fuzz.seed_cases(fuzzer.packet_size, fuzzer.payload_bytes):
+            await run(case)
+    fuzzer.log.info(f"Starting from {len(queue)} corpus entries and {len(coverage)} coverage points")
+
+    while True:
+        elapsed = time.time() - start
+        if abp_fuzz.EXECS and execs >= abp_fuzz.EXECS or abp_fuzz.TIME and elapsed >= abp_fuzz.TIME:
+            break
+        await run(mutator.mutate(rng.choice(queue), rng.choice(queue)))
+
+        if time.time() - last_report >= abp_fuzz.REPORT_INTERVAL:
+            last_report = time.time()
+            for case, points in corpus.sync():
+                coverage.update(points)
+                queue.append(case)
+            report()
+
+    report()
+    assert findings == 0, f"{findings} case(s) broke the parser, see {abp_fuzz.CORPUS}/crashes"
+
+@cocotb.test(skip=not abp_fuzz.REPLAY)
+async def test_abp_rx_fuzz_replay(dut):
+    """
+    Test the cases listed in FUZZ_REPLAY, such as saved crashes.
+
+    This test verifies:
+    - Every case runs through the parser without breaking an invariant
+    """
+    fuzzer = ABP_Packet_Rx_Fuzzer(dut)
+    failed = []
+    for path in abp_fuzz.REPLAY:
+        _, finding = await fuzzer.execute(load_case(path))
+        if finding:
+            fuzzer.log.error(f"{path}: {finding}")
+            failed.append(path)
+    assert not failed, f"{len(failed)} of {len(abp_fuzz.REPLAY)} case(s) failed"
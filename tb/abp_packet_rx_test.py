@@ -1,8 +1,12 @@
 import cocotb
 from cocotb.clock import Clock
-from cocotb.triggers import RisingEdge 
+from cocotb.triggers import RisingEdge, Timer
 from cocotbext.axi import AxiStreamBus, AxiStreamSource, AxiStreamFrame
+import itertools
 import logging
+import random
+
+from utils import activity_profile
 
 class ABP_Packet_Rx_Testbench:
     def __init__(self, dut):
@@ -146,4 +150,104 @@ async def test_abp_rr_correctly_receives_chained_packets(dut):
     tb.dut.abp_tx_ready.value = 1
     await RisingEdge(tb.dut.aclk)
     await RisingEdge(tb.dut.aclk)
-    assert tb.dut.abp_tx_valid.value == 0
\ No newline at end of file
+    assert tb.dut.abp_tx_valid.value == 0
+
+"""
+Test 4: Performance counters track received, truncated and stalled frames
+"""
+@cocotb.test(timeout_time=30, timeout_unit='us')
+async def test_abp_rr_counters(dut):
+    tb = ABP_Packet_Rx_Testbench(dut)
+    await tb.reset()
+    tb.dut.abp_tx_ready.value = 1
+
+    good_frames = 3
+    short_frames = 2
+    for i in range(good_frames):
+        await tb.source.send(AxiStreamFrame(tdata=packet_generator(i, i % 2)))
+    for _ in range(short_frames):
+        await tb.source.send(AxiStreamFrame(tdata=bytes(16)))
+    await tb.source.wait()
+    await Timer(80, units='ns')
+
+    assert tb.dut.stat_frames_received.value == good_frames
+    assert tb.dut.stat_early_terminations.value == short_frames
+    assert tb.dut.stat_stall_cycles.value == 0
+
+    # Count the edges at which the parsed value is held, as the counter does
+    stalled = 0
+    async def count_stalls():
+        nonlocal stalled
+        while True:
+            await RisingEdge(dut.aclk)
+            if dut.abp_tx_valid.value == 1 and dut.abp_tx_ready.value == 0:
+                stalled += 1
+    monitor = cocotb.start_soon(count_stalls())
+
+    # Hold the parsed value for a known number of cycles
+    tb.dut.abp_tx_ready.value = 0
+    await tb.source.send(AxiStreamFrame(tdata=packet_generator(0x0a0b0c0d, 1)))
+    while True:
+        await RisingEdge(dut.aclk)
+        if dut.abp_tx_valid.value == 1:
+            break
+    for _ in range(10):
+        await RisingEdge(dut.aclk)
+    tb.dut.abp_tx_ready.value = 1
+    await RisingEdge(dut.aclk)
+    await RisingEdge(dut.aclk)
+    monitor.kill()
+
+    assert tb.dut.stat_frames_received.value == good_frames + 1
+    assert stalled >= 10, f"Only {stalled} stalled cycles were seen"
+    assert tb.dut.stat_stall_cycles.value == stalled, \
+        f"stat_stall_cycles={int(tb.dut.stat_stall_cycles.value)}, counted {stalled}"
+
+"""
+Test 5: A frame with tvalid gaps inside it is parsed like a contiguous one
+"""
+@cocotb.test(timeout_time=15, timeout_unit='us')
+async def test_abp_rr_gapped_frame(dut):
+    tb = ABP_Packet_Rx_Testbench(dut)
+    VALUE = 0x0a0b0c0d
+    await tb.reset()
+    tb.dut.abp_tx_ready.value = 0
+
+    # tvalid drops for one cycle in every seven, and for three in the payload
+    tb.source.set_pause_generator(itertools.chain([0, 0, 1, 1, 1], itertools.cycle([0, 0, 0, 0, 0, 0, 1])))
+    await tb.source.send(AxiStreamFrame(tdata=packet_generator(VALUE, 1)))
+    await tb.source.wait()
+    tb.source.clear_pause_generator()
+
+    while True:
+        await RisingEdge(dut.aclk)
+        if dut.abp_tx_valid.value == 1:
+            break
+
+    assert tb.dut.abp_tx_value.value == VALUE
+    assert tb.dut.abp_tx_bit.value == 1
+    assert tb.dut.error_early_termination.value == 0, "Gapped frame reported as an early termination"
+    assert tb.dut.stat_frames_received.value == 1
+    assert tb.dut.stat_early_terminations.value == 0
+
+"""
+Test 6: Switching activity while receiving back to back packets (opt-in with ACTIVITY=1)
+"""
+@cocotb.test(timeout_time=200, timeout_unit='us', skip=not activity_profile.ENABLED)
+async def test_abp_rr_activity(dut):
+    tb = ABP_Packet_Rx_Testbench(dut)
+    rng = random.Random(30)
+    packets = 64
+
+    await tb.reset()
+    tb.dut.abp_tx_ready.value = 1
+    profiler = activity_profile.ActivityProfiler(dut, dut.aclk)
+    profiler.start(activity_profile.WINDOW)
+
+    for i in range(packets):
+        await tb.source.send(AxiStreamFrame(tdata=packet_generator(rng.getrandbits(32), i % 2)))
+    await tb.source.wait()
+
+    if activity_profile.WINDOW:
+        await profiler.wait()
+    activity_profile.save(profiler.stop(), "abp_packet_rx", tb.log)
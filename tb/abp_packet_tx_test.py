@@ -5,6 +5,9 @@ from cocotbext.axi import AxiStreamBus, AxiStreamSink
 from cocotb.regression import TestFactory
 
 import logging
+import random
+
+from utils import activity_profile
 
 class ABP_Packet_Tx_Testbench:
     def __init__(self, dut):
@@ -300,6 +303,32 @@ async def test_abp_packet_tx_second_value_after_transmission(dut):
     assert rx_frame1.tdata[0:4] == expected_value1.to_bytes(4, 'big'), f"First packet data does not match. Expected: {expected_value1:08X}, Got: {int.from_bytes(rx_frame1.tdata[0:4], 'big'):08X}"
     assert rx_frame2.tdata[0:4] == expected_value2.to_bytes(4, 'big'), f"Second packet data does not match. Expected: {expected_value2:08X}, Got: {int.from_bytes(rx_frame2.tdata[0:4], 'big'):08X}"
 
+@cocotb.test(timeout_time=200, timeout_unit="us", skip=not activity_profile.ENABLED)
+async def test_abp_packet_tx_activity(dut):
+    """
+    Profile switching activity while streaming packets back to back.
+
+    Opt-in with ACTIVITY=1. This test:
+    - Streams a fixed workload of random values with m_eth_tx_tready held high
+    - Counts toggles per net over the workload, or ACTIVITY_WINDOW cycles
+    - Writes a SAIF file and logs the hottest nets
+    """
+    tb = ABP_Packet_Tx_Testbench(dut)
+    rng = random.Random(30)
+    packets = 64
+
+    await tb.reset()
+    profiler = activity_profile.ActivityProfiler(dut, dut.aclk)
+    profiler.start(activity_profile.WINDOW)
+
+    for i in range(packets):
+        await tb.send_abp_data(rng.getrandbits(32), i % 2)
+        await tb.sink.recv()
+
+    if activity_profile.WINDOW:
+        await profiler.wait()
+    activity_profile.save(profiler.stop(), "abp_packet_tx", tb.log)
+
 # Conditional TestFactory setup
 if cocotb.SIM_NAME:
     # Create test factory for simple packet test
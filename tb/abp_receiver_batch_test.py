@@ -0,0 +1,146 @@
+import cocotb
+from cocotb.clock import Clock
+from cocotb.triggers import RisingEdge, Timer
+from cocotbext.axi import AxiStreamBus, AxiStreamSource, AxiStreamSink
+
+import logging
+import random
+
+from abp_receiver_test import increment_value
+
+class ABP_Receiver_Batch_Testbench:
+    def __init__(self, dut):
+        self.dut = dut
+        self.log = logging.getLogger("abp_receiver_batch.tb")
+        self.log.setLevel(logging.DEBUG)
+
+        self.value_size = int(dut.VALUE_SIZE.value)
+        self.packet_size = int(dut.PACKET_SIZE.value)
+        self.batch_size = int(dut.BATCH_SIZE.value)
+
+        cocotb.start_soon(Clock(dut.aclk, 10, units='ns').start())
+
+        # AXI Stream interfaces
+        self.source = AxiStreamSource(AxiStreamBus.from_prefix(dut, "s_axis"), dut.aclk, dut.aresetn, reset_active_level=False)
+        self.sink = AxiStreamSink(AxiStreamBus.from_prefix(dut, "m_axis"), dut.aclk, dut.aresetn, reset_active_level=False)
+
+    async def reset(self):
+        self.dut.aresetn.setimmediatevalue(1)
+        await RisingEdge(self.dut.aclk)
+        await RisingEdge(self.dut.aclk)
+        self.dut.aresetn.value = 0
+        await RisingEdge(self.dut.aclk)
+        await RisingEdge(self.dut.aclk)
+        self.dut.aresetn.value = 1
+        await RisingEdge(self.dut.aclk)
+        await RisingEdge(self.dut.aclk)
+
+    def batch_packet(self, values, bit):
+        payload = b''.join(value.to_bytes(self.value_size, 'big') for value in values)
+        return payload + bytes(self.packet_size - 1 - len(payload)) + bytes([bit])
+
+    def parse_batch(self, tdata):
+        values = [
+            int.from_bytes(tdata[i * self.value_size:(i + 1) * self.value_size], 'big')
+            for i in range(self.batch_size)
+        ]
+        padding = tdata[self.batch_size * self.value_size:-1]
+        assert not any(padding), f"Padding between the batch and the bit is not zero: {padding.hex()}"
+        return values, tdata[-1]
+
+    async def send_batch(self, values, bit):
+        await self.source.send(self.batch_packet(values, bit))
+
+    async def receive_batch(self):
+        rx_frame = await self.sink.recv()
+        assert len(rx_frame.tdata) == self.packet_size, f"Packet size is incorrect: {len(rx_frame.tdata)}"
+        return self.parse_batch(rx_frame.tdata)
+
+@cocotb.test(timeout_time=10000, timeout_unit="ns")
+async def test_batch_acknowledged_as_a_whole(dut):
+    """
+    Test that a batch frame is answered by one acknowledgement carrying every value.
+
+    This test verifies:
+    - Each value in the batch comes back incremented in its own slot
+    - The bit of the batch is echoed in the last byte
+    - Exactly one acknowledgement frame is produced per batch
+    """
+    tb = ABP_Receiver_Batch_Testbench(dut)
+
+    await tb.reset()
+
+    values = [0x01000000 * i + i for i in range(tb.batch_size)]
+    await tb.send_batch(values, 1)
+
+    ack_values, ack_bit = await tb.receive_batch()
+    assert ack_values == [increment_value(v) for v in values], f"Batch corrupted: {ack_values}"
+    assert ack_bit == 1, f"Batch bit incorrect: {ack_bit}"
+
+    await Timer(2 * tb.packet_size * 10, units='ns')
+    assert tb.sink.empty(), "More than one acknowledgement for a single batch"
+
+@cocotb.test(timeout_time=100, timeout_unit="us")
+async def test_batch_integrity(dut):
+    """
+    Test batch integrity over many random batches and report payload efficiency.
+
+    This test verifies:
+    - Random values, including wrap-around at the maximum, survive every slot
+    - Alternating bits are carried per batch
+    - The padding between the batch and the bit byte stays zero
+    - Useful bytes per frame are reported from the acknowledgements received
+    """
+    tb = ABP_Receiver_Batch_Testbench(dut)
+    rng = random.Random(28)
+    max_value = (1 << (8 * tb.value_size)) - 1
+
+    await tb.reset()
+
+    frames = 20
+    frame_bytes = useful_bytes = 0
+    for i in range(frames):
+        values = [rng.choice([0, max_value, rng.randint(0, max_value)]) for _ in range(tb.batch_size)]
+        bit = i % 2
+        await tb.send_batch(values, bit)
+
+        rx_frame = await tb.sink.recv()
+        assert len(rx_frame.tdata) == tb.packet_size, f"Batch {i} packet size is incorrect: {len(rx_frame.tdata)}"
+        ack_values, ack_bit = tb.parse_batch(rx_frame.tdata)
+        assert ack_values == [increment_value(v, 8 * tb.value_size) for v in values], f"Batch {i} corrupted"
+        assert ack_bit == bit, f"Batch {i} bit incorrect"
+
+        # Count the bytes of the frame that carried a checked value
+        frame_bytes += len(rx_frame.tdata)
+        useful_bytes += len(ack_values) * tb.value_size
+
+    tb.log.info(
+        f"useful bytes/frame: {useful_bytes / frames:.1f}/{frame_bytes / frames:.1f} "
+        f"({100 * useful_bytes / frame_bytes:.1f}%), "
+        f"{tb.batch_size}x the single-value format"
+    )
+
+@cocotb.test(timeout_time=10000, timeout_unit="ns")
+async def test_truncated_batch_rejected(dut):
+    """
+    Test that a batch frame cut short inside the payload is dropped.
+
+    This test verifies:
+    - No acknowledgement is produced for the truncated batch
+    - The next complete batch is still acknowledged correctly
+    """
+    tb = ABP_Receiver_Batch_Testbench(dut)
+
+    await tb.reset()
+
+    values = list(range(100, 100 + tb.batch_size))
+    await tb.source.send(tb.batch_packet(values, 0)[:tb.batch_size * tb.value_size // 2])
+    await tb.source.wait()
+    await Timer(2 * tb.packet_size * 10, units='ns')
+    assert tb.sink.empty(), "Truncated batch was acknowledged"
+    assert dut.stat_early_terminations.value == 1, "Truncated batch was not counted"
+
+    await tb.send_batch(values, 1)
+    ack_values, ack_bit = await tb.receive_batch()
+    assert ack_values == [v + 1 for v in values], f"Batch after truncation corrupted: {ack_values}"
+    assert ack_bit == 1, f"Batch bit incorrect: {ack_bit}"
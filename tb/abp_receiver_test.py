@@ -7,6 +7,8 @@ from cocotb.regression import TestFactory
 import logging
 import random
 
+from utils.abp_stats import AbpCounters, RECEIVER_COUNTERS
+
 class ABP_Receiver_Testbench:
     def __init__(self, dut):
         self.dut = dut
@@ -195,6 +197,105 @@ async def test_abp_receiver_max_value_wrapping(dut):
     assert rx_frame[0:4] == expected_value.to_bytes(4, 'big'), f"Max value wrapping failed. Expected: {expected_value:08X}, Got: {int.from_bytes(rx_frame[0:4], 'little'):08X}"
     assert rx_frame[-1] & 0x01 == input_bit, "Last bit is not set correctly for max value packet"
 
+@cocotb.test(timeout_time=20000, timeout_unit="ns")
+async def test_abp_receiver_counters(dut):
+    """
+    Test the abp_receiver performance counters.
+
+    This test verifies the counters against the testbench's own accounting:
+    - frames_received and frames_sent match the packets exchanged
+    - bit_mismatches counts packets that repeat the previous bit
+    - early_terminations counts truncated packets, which are not answered
+    - stall_cycles only advances while the sink applies backpressure
+    """
+    tb = ABP_Receiver_Testbench(dut)
+
+    await tb.reset()
+
+    bits = [1, 0, 0, 1, 1, 1, 0]
+    repeats = sum(1 for prev, bit in zip(bits, bits[1:]) if prev == bit)
+    for i, bit in enumerate(bits):
+        await tb.send_packet(i, bit)
+        await tb.receive_packet()
+
+    # Truncated packet
+    await tb.source.send(bytes([0] * 20))
+    await tb.source.wait()
+    await Timer(100, units='ns')
+
+    counters = AbpCounters.from_dut(dut, RECEIVER_COUNTERS)
+    assert counters['frames_received'] == len(bits), f"frames_received={counters['frames_received']}"
+    assert counters['frames_sent'] == len(bits), f"frames_sent={counters['frames_sent']}"
+    assert counters['bit_mismatches'] == repeats, f"bit_mismatches={counters['bit_mismatches']}, expected {repeats}"
+    assert counters['early_terminations'] == 1, f"early_terminations={counters['early_terminations']}"
+    assert counters['stall_cycles'] == 0, "No backpressure was applied"
+
+    # Throttle the sink to half rate, on a fixed seed so the run is repeatable
+    rng = random.Random(27)
+    tb.sink.set_pause_generator(iter(lambda: rng.getrandbits(1), None))
+    await tb.send_packet(0x1234, 0)
+    rx_frame = await tb.receive_packet()
+    tb.sink.clear_pause_generator()
+
+    assert len(rx_frame) == 64, f"Frame size under backpressure is incorrect: {len(rx_frame)}"
+    assert rx_frame[0:4] == increment_value(0x1234).to_bytes(4, 'big'), "Frame under backpressure carries the wrong value"
+    counters = AbpCounters.from_dut(dut, RECEIVER_COUNTERS)
+    assert counters['frames_sent'] == len(bits) + 1, f"frames_sent={counters['frames_sent']}"
+    assert counters['stall_cycles'] > 0, "Backpressure was not counted"
+
+@cocotb.test(timeout_time=20000, timeout_unit="ns")
+async def test_abp_receiver_counter_readout(dut):
+    """
+    Test decoding the counters from register words and turning them into rates.
+
+    This test verifies:
+    - from_words decodes words in register map order to the same values as from_dut
+    - A word list of the wrong length is rejected
+    - rates gives frames per second and the stall fraction over the interval
+    - Deltas are taken modulo the counter width across a wrap
+    """
+    tb = ABP_Receiver_Testbench(dut)
+    clock_hz = 100e6
+
+    await tb.reset()
+
+    def read_words():
+        return [int(getattr(dut, f'stat_{name}').value) for name in RECEIVER_COUNTERS]
+
+    prev = AbpCounters.from_words(read_words(), RECEIVER_COUNTERS)
+    assert prev.values == AbpCounters.from_dut(dut, RECEIVER_COUNTERS).values, "from_words disagrees with from_dut"
+    try:
+        AbpCounters.from_words(read_words()[:-1], RECEIVER_COUNTERS)
+    except ValueError:
+        pass
+    else:
+        assert False, "A short word list was accepted"
+
+    frames = 4
+    for i in range(frames):
+        await tb.send_packet(i, i % 2)
+        await tb.receive_packet()
+    curr = AbpCounters.from_words(read_words(), RECEIVER_COUNTERS)
+
+    delta = curr.delta(prev)
+    rates = curr.rates(prev, clock_hz)
+    seconds = delta['cycles'] / clock_hz
+    assert delta['frames_received'] == frames and delta['frames_sent'] == frames, f"delta={delta}"
+    assert rates['frames_received_per_sec'] == frames / seconds, f"frames_received_per_sec={rates['frames_received_per_sec']}"
+    assert rates['frames_sent_per_sec'] == frames / seconds, f"frames_sent_per_sec={rates['frames_sent_per_sec']}"
+    assert rates['stall_fraction'] == 0, f"stall_fraction={rates['stall_fraction']}"
+    assert 'retransmission_ratio' not in rates and 'rtt_min_sec' not in rates, "Transmitter rates reported for the receiver"
+
+    # The same interval, with every counter having wrapped past 2**32 in between
+    wrapped = AbpCounters({name: (value - 1000) % (1 << 32) for name, value in prev.values.items()})
+    assert curr.delta(wrapped)['cycles'] == delta['cycles'] + 1000, "Delta across a wrap is incorrect"
+    try:
+        curr.rates(curr, clock_hz)
+    except ValueError:
+        pass
+    else:
+        assert False, "Rates over zero cycles were accepted"
+
 # Conditional TestFactory setup
 if cocotb.SIM_NAME:
     factory = TestFactory(run_simple_packet_test)
@@ -0,0 +1,121 @@
+import cocotb
+from cocotb.clock import Clock
+from cocotb.triggers import RisingEdge
+from cocotbext.axi import AxiStreamBus, AxiStreamSource, AxiStreamSink
+
+import logging
+
+class ABP_Receiver_Window_Testbench:
+    def __init__(self, dut):
+        self.dut = dut
+        self.log = logging.getLogger("abp_receiver_window.tb")
+        self.log.setLevel(logging.DEBUG)
+
+        self.packet_size = int(dut.PACKET_SIZE.value)
+        self.seq_mod = 1 << int(dut.SEQ_BITS.value)
+
+        cocotb.start_soon(Clock(dut.aclk, 10, units='ns').start())
+
+        # AXI Stream interfaces
+        self.source = AxiStreamSource(AxiStreamBus.from_prefix(dut, "s_axis"), dut.aclk, dut.aresetn, reset_active_level=False)
+        self.sink = AxiStreamSink(AxiStreamBus.from_prefix(dut, "m_axis"), dut.aclk, dut.aresetn, reset_active_level=False)
+
+    async def reset(self):
+        self.dut.aresetn.setimmediatevalue(1)
+        await RisingEdge(self.dut.aclk)
+        await RisingEdge(self.dut.aclk)
+        self.dut.aresetn.value = 0
+        await RisingEdge(self.dut.aclk)
+        await RisingEdge(self.dut.aclk)
+        self.dut.aresetn.value = 1
+        await RisingEdge(self.dut.aclk)
+        await RisingEdge(self.dut.aclk)
+
+    async def send_packet(self, value, seq):
+        packet = value.to_bytes(4, 'big')
+        packet += bytes([0] * (self.packet_size - 5))  # Padding
+        packet += bytes([seq])
+        await self.source.send(packet)
+
+    async def receive_ack(self):
+        rx_frame = await self.sink.recv()
+        return int.from_bytes(rx_frame.tdata[0:4], 'big'), rx_frame.tdata[-1]
+
+@cocotb.test(timeout_time=20, timeout_unit="us")
+async def test_in_order_frames_acknowledged(dut):
+    """
+    Test that in-order frames are acknowledged with their own sequence number.
+
+    This test verifies:
+    - Each in-order frame is answered with the same sequence number
+    - The acknowledgement carries the incremented value
+    - The expected sequence number wraps modulo 2**SEQ_BITS
+    """
+    tb = ABP_Receiver_Window_Testbench(dut)
+
+    await tb.reset()
+
+    for i in range(tb.seq_mod + 2):
+        seq = i % tb.seq_mod
+        await tb.send_packet(100 + i, seq)
+        value, ack_seq = await tb.receive_ack()
+        assert ack_seq == seq, f"Frame {i}: expected ack {seq}, got {ack_seq}"
+        assert value == 101 + i, f"Frame {i}: expected value {101 + i}, got {value}"
+
+@cocotb.test(timeout_time=20, timeout_unit="us")
+async def test_out_of_order_frame_reacknowledges(dut):
+    """
+    Test that a frame ahead of the expected sequence number is discarded.
+
+    This test verifies:
+    - A frame skipping the expected sequence number is not accepted
+    - The acknowledgement repeats the last in-order frame
+    - The missing frame is still accepted afterwards
+    """
+    tb = ABP_Receiver_Window_Testbench(dut)
+
+    await tb.reset()
+
+    # Nothing accepted yet, so the receiver acknowledges seq -1
+    await tb.send_packet(0xAABBCCDD, 1)
+    value, ack_seq = await tb.receive_ack()
+    assert ack_seq == tb.seq_mod - 1, f"Expected ack {tb.seq_mod - 1} before first frame, got {ack_seq}"
+    assert value == 1, f"Expected initial value 1, got {value}"
+
+    await tb.send_packet(10, 0)
+    value, ack_seq = await tb.receive_ack()
+    assert (value, ack_seq) == (11, 0), f"In-order frame not accepted: value={value}, ack={ack_seq}"
+
+    await tb.send_packet(30, 2)
+    value, ack_seq = await tb.receive_ack()
+    assert (value, ack_seq) == (11, 0), f"Out-of-order frame accepted: value={value}, ack={ack_seq}"
+
+    await tb.send_packet(20, 1)
+    value, ack_seq = await tb.receive_ack()
+    assert (value, ack_seq) == (21, 1), f"Missing frame not accepted: value={value}, ack={ack_seq}"
+
+@cocotb.test(timeout_time=20, timeout_unit="us")
+async def test_duplicate_frame_reacknowledges(dut):
+    """
+    Test that a retransmitted frame is acknowledged but not accepted twice.
+
+    This test verifies:
+    - A duplicate of an accepted frame gets the cumulative acknowledgement
+    - The expected sequence number does not advance on the duplicate
+    """
+    tb = ABP_Receiver_Window_Testbench(dut)
+
+    await tb.reset()
+
+    await tb.send_packet(10, 0)
+    await tb.receive_ack()
+    await tb.send_packet(20, 1)
+    await tb.receive_ack()
+
+    await tb.send_packet(10, 0)
+    value, ack_seq = await tb.receive_ack()
+    assert (value, ack_seq) == (21, 1), f"Duplicate changed receiver state: value={value}, ack={ack_seq}"
+
+    await tb.send_packet(30, 2)
+    value, ack_seq = await tb.receive_ack()
+    assert (value, ack_seq) == (31, 2), f"Next frame not accepted after duplicate: value={value}, ack={ack_seq}"
@@ -0,0 +1,124 @@
+import cocotb
+from cocotb.clock import Clock
+from cocotb.triggers import RisingEdge, Timer
+from cocotbext.axi import AxiStreamBus, AxiStreamSource, AxiStreamSink
+
+import logging
+
+class ABP_Transmitter_Batch_Testbench:
+    def __init__(self, dut):
+        self.dut = dut
+        self.log = logging.getLogger("abp_transmitter_batch.tb")
+        self.log.setLevel(logging.DEBUG)
+
+        self.value_size = int(dut.VALUE_SIZE.value)
+        self.packet_size = int(dut.PACKET_SIZE.value)
+        self.batch_size = int(dut.BATCH_SIZE.value)
+        self.timeout_cycles = int(dut.TIMEOUT_CYCLES.value)
+        self.value_mask = (1 << (8 * self.value_size)) - 1
+
+        cocotb.start_soon(Clock(dut.aclk, 10, units='ns').start())
+
+        # AXI Stream interfaces
+        self.source = AxiStreamSource(AxiStreamBus.from_prefix(dut, "s_axis"), dut.aclk, dut.aresetn, reset_active_level=False)
+        self.sink = AxiStreamSink(AxiStreamBus.from_prefix(dut, "m_axis"), dut.aclk, dut.aresetn, reset_active_level=False)
+
+    async def reset(self):
+        self.dut.aresetn.setimmediatevalue(1)
+        await RisingEdge(self.dut.aclk)
+        await RisingEdge(self.dut.aclk)
+        self.dut.aresetn.value = 0
+        await RisingEdge(self.dut.aclk)
+        await RisingEdge(self.dut.aclk)
+        self.dut.aresetn.value = 1
+
+    def batch_packet(self, values, bit):
+        payload = b''.join(value.to_bytes(self.value_size, 'big') for value in values)
+        return payload + bytes(self.packet_size - 1 - len(payload)) + bytes([bit])
+
+    def consecutive(self, first):
+        """The values of a batch starting at first, wrapping per slot."""
+        return [(first + slot) & self.value_mask for slot in range(self.batch_size)]
+
+    def next_batch(self, ack_values):
+        """
+        The batch that follows an acknowledgement. The transmitter moves on
+        to the first acknowledged value plus BATCH_SIZE, and abp_packet_tx
+        adds one to every slot on the way out.
+        """
+        return self.consecutive(ack_values[0] + self.batch_size + 1)
+
+    async def send_ack(self, values, bit):
+        await self.source.send(self.batch_packet(values, bit))
+
+    async def receive_batch(self):
+        rx_frame = await self.sink.recv()
+        tdata = rx_frame.tdata
+        assert len(tdata) == self.packet_size, f"Packet size is incorrect: {len(tdata)}"
+        values = [
+            int.from_bytes(tdata[i * self.value_size:(i + 1) * self.value_size], 'big')
+            for i in range(self.batch_size)
+        ]
+        padding = tdata[self.batch_size * self.value_size:-1]
+        assert not any(padding), f"Padding between the batch and the bit is not zero: {padding.hex()}"
+        return values, tdata[-1]
+
+@cocotb.test(timeout_time=50, timeout_unit="us")
+async def test_batch_sequence(dut):
+    """
+    Test the values the transmitter packs into consecutive batches.
+
+    This test verifies:
+    - The first batch carries BATCH_SIZE consecutive values from 1, with bit 1
+    - Every slot holds the first value of its batch plus the slot index
+    - An acknowledgement advances the counter by BATCH_SIZE and flips the bit
+    - The first value of the acknowledgement decides the next batch
+    """
+    tb = ABP_Transmitter_Batch_Testbench(dut)
+
+    await tb.reset()
+
+    values, bit = await tb.receive_batch()
+    assert values == tb.consecutive(1) and bit == 1, f"First batch incorrect: {values}, bit {bit}"
+
+    for i in range(6):
+        # Acknowledge as abp_receiver does, every value incremented
+        ack = [(v + 1) & tb.value_mask for v in values]
+        await tb.send_ack(ack, bit)
+
+        next_values, next_bit = await tb.receive_batch()
+        assert next_values == tb.next_batch(ack), f"Batch {i + 1} incorrect: {next_values}, expected {tb.next_batch(ack)}"
+        assert next_bit == bit ^ 1, f"Batch {i + 1} bit incorrect: {next_bit}"
+        values, bit = next_values, next_bit
+
+@cocotb.test(timeout_time=50, timeout_unit="us")
+async def test_batch_wrap_and_stale_ack(dut):
+    """
+    Test batches near the top of the counter and acknowledgements that do not match.
+
+    This test verifies:
+    - An acknowledgement with the wrong bit does not advance the batch
+    - The batch is retransmitted unchanged after a timeout
+    - Slots past the maximum value wrap around to zero individually
+    """
+    tb = ABP_Transmitter_Batch_Testbench(dut)
+
+    await tb.reset()
+
+    values, bit = await tb.receive_batch()
+
+    # Stale acknowledgement: the batch is sent again only on the timeout
+    await tb.send_ack(values, bit ^ 1)
+    await tb.source.wait()
+    await Timer(tb.packet_size * 10, units='ns')
+    assert tb.sink.empty(), "Acknowledgement with the wrong bit advanced the transmitter"
+    retx_values, retx_bit = await tb.receive_batch()
+    assert (retx_values, retx_bit) == (values, bit), f"Retransmitted batch differs: {retx_values}, bit {retx_bit}"
+
+    # Acknowledge with a first value just below the maximum
+    ack = tb.consecutive(tb.value_mask - tb.batch_size - 1)
+    await tb.send_ack(ack, bit)
+    next_values, next_bit = await tb.receive_batch()
+    assert next_values == tb.next_batch(ack), f"Wrapped batch incorrect: {next_values}, expected {tb.next_batch(ack)}"
+    assert 0 in next_values, f"Batch did not cross the wrap: {next_values}"
+    assert next_bit == bit ^ 1, f"Wrapped batch bit incorrect: {next_bit}"
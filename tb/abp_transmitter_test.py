@@ -1,118 +1,154 @@
 import cocotb
 from cocotb.clock import Clock
-from cocotb.triggers import RisingEdge, Timer
+from cocotb.triggers import ReadOnly, RisingEdge, Timer
+from cocotbext.axi import AxiStreamBus, AxiStreamSource, AxiStreamSink
+
+from utils import sim_snapshot
+from utils.abp_stats import AbpCounters, TRANSMITTER_COUNTERS
 
 class ABPTransmitterTB:
+    # Inputs driven by the tests, captured with snapshots
+    INPUTS = ('aresetn', 's_axis_tvalid', 's_axis_tdata', 's_axis_tlast', 'm_axis_tready')
+
     def __init__(self, dut):
         self.dut = dut
-        self.axi_data_width = int(dut.DATA_WIDTH.value)
         self.value_size = int(dut.VALUE_SIZE.value)
         self.packet_size = int(dut.PACKET_SIZE.value)
+        self.batch_size = int(dut.BATCH_SIZE.value)
         self.timeout_cycles = int(dut.TIMEOUT_CYCLES.value)
+        self.value_mask = (1 << (8 * self.value_size)) - 1
 
     async def reset(self):
+        self.dut.s_axis_tvalid.value = 0
+        self.dut.s_axis_tdata.value = 0
+        self.dut.s_axis_tlast.value = 0
+        self.dut.m_axis_tready.value = 0
         self.dut.aresetn.value = 0
         await RisingEdge(self.dut.aclk)
         await RisingEdge(self.dut.aclk)
         self.dut.aresetn.value = 1
         await RisingEdge(self.dut.aclk)
 
+    def next_value(self, ack_value):
+        """
+        The value sent after an acknowledgement of ack_value. The transmitter
+        moves on to ack_value + BATCH_SIZE, and abp_packet_tx adds one on the
+        way out.
+        """
+        return (ack_value + self.batch_size + 1) & self.value_mask
+
     async def send_rx_packet(self, value, bit):
-        self.dut.s_axis_tvalid.value = 1
-        self.dut.s_axis_tdata.value = value & ((1 << self.axi_data_width) - 1)
-        self.dut.s_axis_tlast.value = bit
-        await RisingEdge(self.dut.aclk)
-        while not self.dut.s_axis_tready.value:
+        """Send one acknowledgement frame on s_axis, a beat per accepted cycle."""
+        frame = (value & self.value_mask).to_bytes(self.value_size, 'big')
+        frame += bytes(self.packet_size - self.value_size - 1) + bytes([bit])
+        for i, byte in enumerate(frame):
+            self.dut.s_axis_tvalid.value = 1
+            self.dut.s_axis_tdata.value = byte
+            self.dut.s_axis_tlast.value = int(i == len(frame) - 1)
             await RisingEdge(self.dut.aclk)
+            while not self.dut.s_axis_tready.value:
+                await RisingEdge(self.dut.aclk)
         self.dut.s_axis_tvalid.value = 0
+        self.dut.s_axis_tlast.value = 0
 
     async def receive_tx_packet(self):
-        while not self.dut.m_axis_tvalid.value:
-            await RisingEdge(self.dut.aclk)
-        value = 0
-        for _ in range(self.value_size):
-            value = (value << self.axi_data_width) | self.dut.m_axis_tdata.value
+        """
+        Accept one frame on m_axis and return its value and bit. tready is
+        only raised while receiving, so frames sent in between are held by
+        the transmitter until the test asks for them.
+        """
+        self.dut.m_axis_tready.value = 1
+        frame = bytearray()
+        while True:
             await RisingEdge(self.dut.aclk)
-        bit = self.dut.m_axis_tlast.value
-        return value, bit
+            if self.dut.m_axis_tvalid.value:
+                frame.append(int(self.dut.m_axis_tdata.value))
+                if self.dut.m_axis_tlast.value:
+                    break
+        self.dut.m_axis_tready.value = 0
+        assert len(frame) == self.packet_size, f"Frame size is incorrect: {len(frame)}"
+        return int.from_bytes(frame[:self.value_size], 'big'), frame[-1]
 
-@cocotb.test(timeout_time=15000, timeout_unit="ns")
-async def test_normal_operation(dut):
-    tb = ABPTransmitterTB(dut)
-    clock = Clock(dut.aclk, 10, units="ns")
-    cocotb.start_soon(clock.start())
-
-    await tb.reset()
-
-    # Check initial transmission
-    value, bit = await tb.receive_tx_packet()
-    assert value == 0 and bit == 1, f"Initial packet incorrect: value={value}, bit={bit}"
+    async def warm_start(self, name, warm_up, refresh=sim_snapshot.REFRESH):
+        """Run warm_up, or restore the state it ends in when SNAPSHOT is set."""
+        return await sim_snapshot.warm_start(self.dut, self.dut.aclk, name, warm_up, inputs=self.INPUTS, refresh=refresh)
 
-    # Send a response and check next transmission
-    await tb.send_rx_packet(42, 1)
-    value, bit = await tb.receive_tx_packet()
-    assert value == 43 and bit == 0, f"Response packet incorrect: value={value}, bit={bit}"
+    async def first_frame(self):
+        """Warm-up: reset and receive the initial transmission."""
+        await self.reset()
+        return await self.receive_tx_packet()
 
-    # Continue for a few more exchanges
-    for i in range(3):
-        await tb.send_rx_packet(value, bit)
-        value, bit = await tb.receive_tx_packet()
-        assert value == (value + 1) % (1 << (tb.value_size * 8)), f"Packet {i} incorrect: value={value}"
-        assert bit == (i % 2 == 0), f"Packet {i} incorrect bit: {bit}"
+    async def first_timeout(self):
+        """Warm-up: receive the initial transmission and leave it unanswered until it times out."""
+        value, bit = await self.first_frame()
+        await Timer(self.timeout_cycles * 10, units="ns")
+        return value, bit
 
-@cocotb.test(timeout_time=10000, timeout_unit="ns")
+@cocotb.test(timeout_time=30, timeout_unit="us")
 async def test_normal_operation(dut):
+    """
+    Test the transmitter's sequence with every frame acknowledged in time.
+
+    This test verifies:
+    - The initial frame carries 1 with bit 1
+    - Each acknowledgement advances the value from the acknowledged one and
+      flips the bit
+    """
     tb = ABPTransmitterTB(dut)
     clock = Clock(dut.aclk, 10, units="ns")
     cocotb.start_soon(clock.start())
 
-    await tb.reset()
-
     # Check initial transmission
-    value, bit = await tb.receive_tx_packet()
-    assert value == 0 and bit == 1, f"Initial packet incorrect: value={value}, bit={bit}"
+    value, bit = await tb.warm_start('first_frame', tb.first_frame)
+    assert value == 1 and bit == 1, f"Initial packet incorrect: value={value}, bit={bit}"
 
     # Send a response and check next transmission
     await tb.send_rx_packet(42, 1)
     value, bit = await tb.receive_tx_packet()
-    assert value == 43 and bit == 0, f"Response packet incorrect: value={value}, bit={bit}"
+    assert value == tb.next_value(42) and bit == 0, f"Response packet incorrect: value={value}, bit={bit}"
 
     # Continue for a few more exchanges
     for i in range(3):
         await tb.send_rx_packet(value, bit)
-        value, bit = await tb.receive_tx_packet()
-        assert value == (value + 1) % (1 << (tb.value_size * 8)), f"Packet {i} incorrect: value={value}"
-        assert bit == (i % 2 == 0), f"Packet {i} incorrect bit: {bit}"
+        next_value, next_bit = await tb.receive_tx_packet()
+        assert next_value == tb.next_value(value), f"Packet {i} incorrect: value={next_value}, expected {tb.next_value(value)}"
+        assert next_bit == bit ^ 1, f"Packet {i} incorrect bit: {next_bit}"
+        value, bit = next_value, next_bit
 
 @cocotb.test(timeout_time=100, timeout_unit="us")
 async def test_timeout_retransmission(dut):
+    """
+    Test that an unanswered frame is sent again after TIMEOUT_CYCLES.
+
+    This test verifies:
+    - The retransmission carries the same value and bit
+    """
     tb = ABPTransmitterTB(dut)
     clock = Clock(dut.aclk, 10, units="ns")
     cocotb.start_soon(clock.start())
 
-    await tb.reset()
-
-    # Receive initial transmission
-    initial_value, initial_bit = await tb.receive_tx_packet()
-
-    # Wait for timeout
-    await Timer(tb.timeout_cycles * 10, units="ns")
+    # Receive initial transmission and wait for timeout
+    initial_value, initial_bit = await tb.warm_start('first_timeout', tb.first_timeout)
 
     # Check retransmission
     retrans_value, retrans_bit = await tb.receive_tx_packet()
     assert retrans_value == initial_value and retrans_bit == initial_bit, \
         f"Retransmission doesn't match: initial=({initial_value}, {initial_bit}), retrans=({retrans_value}, {retrans_bit})"
 
-@cocotb.test(timeout_time=10000, timeout_unit="ns")
+@cocotb.test(timeout_time=100, timeout_unit="us")
 async def test_multiple_timeouts(dut):
+    """
+    Test repeated timeouts on the same frame.
+
+    This test verifies:
+    - Every timeout resends the same value and bit
+    """
     tb = ABPTransmitterTB(dut)
     clock = Clock(dut.aclk, 10, units="ns")
     cocotb.start_soon(clock.start())
 
-    await tb.reset()
-
     # Receive initial transmission
-    initial_value, initial_bit = await tb.receive_tx_packet()
+    initial_value, initial_bit = await tb.warm_start('first_frame', tb.first_frame)
 
     # Check multiple retransmissions
     for _ in range(3):
@@ -121,23 +157,113 @@ async def test_multiple_timeouts(dut):
         assert retrans_value == initial_value and retrans_bit == initial_bit, \
             f"Retransmission doesn't match: initial=({initial_value}, {initial_bit}), retrans=({retrans_value}, {retrans_bit})"
 
-@cocotb.test(timeout_time=10000, timeout_unit="ns")
+@cocotb.test(timeout_time=30, timeout_unit="us")
 async def test_late_response(dut):
+    """
+    Test an acknowledgement that completes just before the timeout.
+
+    This test verifies:
+    - The frame is not retransmitted
+    - The next frame follows from the acknowledgement
+    """
     tb = ABPTransmitterTB(dut)
     clock = Clock(dut.aclk, 10, units="ns")
     cocotb.start_soon(clock.start())
 
-    await tb.reset()
-
     # Receive initial transmission
-    initial_value, initial_bit = await tb.receive_tx_packet()
+    initial_value, initial_bit = await tb.warm_start('first_frame', tb.first_frame)
 
-    # Wait for almost a timeout
-    await Timer((tb.timeout_cycles - 10) * 10, units="ns")
+    # The timeout runs from the start of the initial frame, which took a
+    # frame time to receive; the response takes another frame time to send
+    await Timer((tb.timeout_cycles - 3 * tb.packet_size) * 10, units="ns")
 
     # Send a late response
     await tb.send_rx_packet(42, initial_bit)
 
     # Check next transmission
     value, bit = await tb.receive_tx_packet()
-    assert value == 43 and bit == (not initial_bit), f"Late response handling incorrect: value={value}, bit={bit}"
+    assert value == tb.next_value(42) and bit == initial_bit ^ 1, \
+        f"Late response handling incorrect: value={value}, bit={bit}"
+
+@cocotb.test(timeout_time=100, timeout_unit="us", skip=not sim_snapshot.ENABLED)
+async def test_snapshot_restore(dut):
+    """
+    Test that a restored snapshot carries on exactly like the warm-up it replaces.
+
+    This test verifies:
+    - Restoring a snapshot hands back the warm-up's result
+    - Every variable in the design matches, past a timeout, between a run
+      from the captured warm-up and a run from the restored snapshot
+    """
+    tb = ABPTransmitterTB(dut)
+    clock = Clock(dut.aclk, 10, units="ns")
+    cocotb.start_soon(clock.start())
+    cycles = tb.timeout_cycles + 100
+
+    states = []
+    results = []
+    for refresh in (True, False):
+        results.append(tuple(await tb.warm_start('first_frame', tb.first_frame, refresh=refresh)))
+        for _ in range(cycles):
+            await RisingEdge(dut.aclk)
+        await ReadOnly()
+        states.append(sim_snapshot.Snapshot.capture(dut).state)
+
+    assert results[0] == results[1], f"Warm-up returned {results[0]}, restore returned {results[1]}"
+    diverged = sorted(path for path in states[0] if states[0][path] != states[1][path])
+    assert not diverged, f"State diverged after restore: {diverged}"
+
+@cocotb.test(timeout_time=100, timeout_unit="us")
+async def test_counters(dut):
+    """
+    Test the performance counters of the stop-and-wait transmitter.
+
+    This test verifies:
+    - A frame left unanswered times out once and is retransmitted once
+    - No round trip is sampled from the acknowledgement of a retransmitted
+      frame, as it could belong to either copy
+    - The round trip of the next frame, sent only once, is sampled
+    - frames_sent and frames_received match the frames exchanged
+    """
+    tb = ABPTransmitterTB(dut)
+    clock = Clock(dut.aclk, 10, units="ns")
+    cocotb.start_soon(clock.start())
+
+    source = AxiStreamSource(AxiStreamBus.from_prefix(dut, "s_axis"), dut.aclk, dut.aresetn, reset_active_level=False)
+    sink = AxiStreamSink(AxiStreamBus.from_prefix(dut, "m_axis"), dut.aclk, dut.aresetn, reset_active_level=False)
+    unsampled = (1 << int(dut.COUNTER_WIDTH.value)) - 1
+
+    async def exchange(ack=None):
+        if ack is not None:
+            value, bit = ack
+            await source.send(value.to_bytes(4, 'big') + bytes(tb.packet_size - 5) + bytes([bit]))
+        frame = (await sink.recv()).tdata
+        assert len(frame) == tb.packet_size, f"Frame size is incorrect: {len(frame)}"
+        return int.from_bytes(frame[0:4], 'big'), frame[-1]
+
+    await tb.reset()
+
+    # Leave the first frame unanswered until it is sent again
+    first = await exchange()
+    assert await exchange() == first, "Retransmission does not match the first frame"
+
+    # Acknowledge the retransmitted frame: no round trip sample
+    second = await exchange(first)
+    counters = AbpCounters.from_dut(dut, TRANSMITTER_COUNTERS)
+    assert counters['timeouts'] == 1, f"timeouts={counters['timeouts']}"
+    assert counters['retransmissions'] == 1, f"retransmissions={counters['retransmissions']}"
+    assert counters['rtt_min'] == unsampled and counters['rtt_max'] == 0, \
+        f"Round trip sampled from a retransmitted frame: min={counters['rtt_min']}, max={counters['rtt_max']}"
+
+    # Acknowledge a frame sent once: one round trip sample
+    await exchange(second)
+    counters = AbpCounters.from_dut(dut, TRANSMITTER_COUNTERS)
+    assert counters['timeouts'] == 1, f"timeouts={counters['timeouts']}"
+    assert counters['retransmissions'] == 1, f"retransmissions={counters['retransmissions']}"
+    assert counters['frames_sent'] == 4, f"frames_sent={counters['frames_sent']}"
+    assert counters['frames_received'] == 2, f"frames_received={counters['frames_received']}"
+    assert counters['bit_mismatches'] == 0, f"bit_mismatches={counters['bit_mismatches']}"
+    assert counters['rtt_min'] == counters['rtt_max'], \
+        f"Expected a single round trip sample: min={counters['rtt_min']}, max={counters['rtt_max']}"
+    assert 2 * tb.packet_size <= counters['rtt_min'] < tb.timeout_cycles, \
+        f"Round trip of {counters['rtt_min']} cycles is out of range"
@@ -0,0 +1,233 @@
+import cocotb
+from cocotb.clock import Clock
+from cocotb.triggers import RisingEdge
+from cocotbext.axi import AxiStreamBus, AxiStreamSource, AxiStreamSink
+
+import logging
+import random
+
+from utils.abp_stats import AbpCounters, TRANSMITTER_COUNTERS
+
+class ABP_Transmitter_Window_Testbench:
+    """
+    Drives abp_transmitter built with WINDOW_SIZE > 1 against a Python
+    go-back-N receiver. Frames leaving the DUT can be dropped or reordered
+    before they reach the model, which acknowledges cumulatively.
+    """
+    def __init__(self, dut):
+        self.dut = dut
+        self.log = logging.getLogger("abp_transmitter_window.tb")
+        self.log.setLevel(logging.DEBUG)
+
+        self.packet_size = int(dut.PACKET_SIZE.value)
+        self.timeout_cycles = int(dut.TIMEOUT_CYCLES.value)
+        self.window_size = int(dut.WINDOW_SIZE.value)
+        self.seq_bits = int(dut.SEQ_BITS.value)
+        self.seq_mod = 1 << self.seq_bits
+
+        cocotb.start_soon(Clock(dut.aclk, 10, units='ns').start())
+
+        # AXI Stream interfaces
+        self.source = AxiStreamSource(AxiStreamBus.from_prefix(dut, "s_axis"), dut.aclk, dut.aresetn, reset_active_level=False)
+        self.sink = AxiStreamSink(AxiStreamBus.from_prefix(dut, "m_axis"), dut.aclk, dut.aresetn, reset_active_level=False)
+
+        # Go-back-N receiver model
+        self.expected_seq = 0
+        self.delivered = []
+
+        # Accounting checked against the DUT performance counters
+        self.frames_seen = 0
+        self.values_seen = set()
+        self.acks_sent = 0
+        self.stale_acks = 0
+        self.last_ack_seq = self.seq_mod - 1
+
+    async def reset(self):
+        self.dut.aresetn.setimmediatevalue(1)
+        await RisingEdge(self.dut.aclk)
+        await RisingEdge(self.dut.aclk)
+        self.dut.aresetn.value = 0
+        await RisingEdge(self.dut.aclk)
+        await RisingEdge(self.dut.aclk)
+        self.dut.aresetn.value = 1
+        await RisingEdge(self.dut.aclk)
+        await RisingEdge(self.dut.aclk)
+
+    async def collect_frames(self, idle_cycles):
+        """Gather transmitted frames until the link has been idle for idle_cycles."""
+        frames = []
+        idle = 0
+        while idle < idle_cycles:
+            await RisingEdge(self.dut.aclk)
+            if self.sink.empty():
+                idle += 1
+                continue
+            idle = 0
+            tdata = self.sink.recv_nowait().tdata
+            value = int.from_bytes(tdata[0:4], 'big')
+            frames.append((value, tdata[-1]))
+            self.frames_seen += 1
+            self.values_seen.add(value)
+        return frames
+
+    async def quiesce(self):
+        """Snapshot the performance counters once no frame is queued or on the wire."""
+        await self.source.wait()
+        while True:
+            await self.collect_frames(idle_cycles=2 * self.packet_size)
+            snapshot = AbpCounters.from_dut(self.dut, TRANSMITTER_COUNTERS)
+            for _ in range(4):
+                await RisingEdge(self.dut.aclk)
+                if self.dut.m_axis_tvalid.value:
+                    break
+            else:
+                return snapshot
+
+    async def deliver(self, value, seq):
+        """Hand one frame to the receiver model and send back its acknowledgement."""
+        if seq == self.expected_seq:
+            self.delivered.append(value)
+            self.expected_seq = (self.expected_seq + 1) % self.seq_mod
+        ack_seq = (self.expected_seq - 1) % self.seq_mod
+        self.acks_sent += 1
+        if ack_seq == self.last_ack_seq:
+            self.stale_acks += 1
+        self.last_ack_seq = ack_seq
+        ack_value = self.delivered[-1] if self.delivered else 0
+        packet = ack_value.to_bytes(4, 'big')
+        packet += bytes([0] * (self.packet_size - 5))  # Padding
+        packet += bytes([ack_seq])
+        await self.source.send(packet)
+
+def check_delivered(tb, count):
+    assert len(tb.delivered) >= count, f"Only {len(tb.delivered)} of {count} values delivered"
+    expected = list(range(1, count + 1))
+    assert tb.delivered[:count] == expected, f"Delivered values out of sequence: {tb.delivered[:count]}"
+
+@cocotb.test(timeout_time=100, timeout_unit="us")
+async def test_window_fills_without_acks(dut):
+    """
+    Test that the transmitter keeps a full window in flight.
+
+    This test verifies:
+    - WINDOW_SIZE frames are sent back to back before any acknowledgement
+    - The frames carry consecutive sequence numbers starting at 0
+    - No further frame is sent until the window is acknowledged or times out
+    """
+    tb = ABP_Transmitter_Window_Testbench(dut)
+
+    await tb.reset()
+
+    frames = await tb.collect_frames(idle_cycles=2 * tb.packet_size)
+
+    assert len(frames) == tb.window_size, f"Expected {tb.window_size} frames in flight, got {len(frames)}"
+    assert [seq for _, seq in frames] == list(range(tb.window_size)), f"Sequence numbers incorrect: {frames}"
+    assert [value for value, _ in frames] == list(range(1, tb.window_size + 1)), f"Values incorrect: {frames}"
+
+@cocotb.test(timeout_time=200, timeout_unit="us")
+async def test_in_order_delivery(dut):
+    """
+    Test go-back-N operation over a perfect channel.
+
+    This test verifies:
+    - Every frame is acknowledged as it arrives
+    - The sequence number wraps around modulo 2**SEQ_BITS
+    - Values are delivered in order without retransmission
+    """
+    tb = ABP_Transmitter_Window_Testbench(dut)
+    count = 4 * tb.seq_mod
+
+    await tb.reset()
+
+    while len(tb.delivered) < count:
+        frames = await tb.collect_frames(idle_cycles=4)
+        for value, seq in frames:
+            await tb.deliver(value, seq)
+
+    check_delivered(tb, count)
+
+@cocotb.test(timeout_time=2000, timeout_unit="us")
+async def test_lossy_delivery(dut):
+    """
+    Test go-back-N recovery from dropped frames.
+
+    This test verifies:
+    - Randomly dropped frames are recovered by the window timeout
+    - Frames after a gap are discarded by the receiver and resent
+    - Values are delivered in order and without gaps
+    """
+    tb = ABP_Transmitter_Window_Testbench(dut)
+    rng = random.Random(26)
+    count = 3 * tb.seq_mod
+
+    await tb.reset()
+
+    while len(tb.delivered) < count:
+        frames = await tb.collect_frames(idle_cycles=4)
+        for value, seq in frames:
+            if rng.random() < 0.25:
+                tb.log.debug(f"dropping frame seq={seq} value={value}")
+                continue
+            await tb.deliver(value, seq)
+
+    check_delivered(tb, count)
+
+@cocotb.test(timeout_time=2000, timeout_unit="us")
+async def test_reordered_delivery(dut):
+    """
+    Test go-back-N recovery from reordered frames.
+
+    This test verifies:
+    - Each burst of frames reaches the receiver in shuffled order
+    - Duplicate acknowledgements from out-of-order frames are ignored
+    - Values are delivered in order and without gaps
+    """
+    tb = ABP_Transmitter_Window_Testbench(dut)
+    rng = random.Random(27)
+    count = 3 * tb.seq_mod
+
+    await tb.reset()
+
+    while len(tb.delivered) < count:
+        frames = await tb.collect_frames(idle_cycles=2 * tb.packet_size)
+        rng.shuffle(frames)
+        for value, seq in frames:
+            await tb.deliver(value, seq)
+
+    check_delivered(tb, count)
+
+@cocotb.test(timeout_time=2000, timeout_unit="us")
+async def test_counters_match_accounting(dut):
+    """
+    Test the performance counters against the testbench's own accounting.
+
+    This test verifies:
+    - frames_sent matches the frames seen on the wire
+    - retransmissions matches the frames that repeated an earlier value
+    - frames_received and bit_mismatches match the acknowledgements sent
+    - A timeout was counted and the RTT watermarks cover a frame round trip
+    """
+    tb = ABP_Transmitter_Window_Testbench(dut)
+    rng = random.Random(2027)
+    count = 2 * tb.seq_mod
+
+    await tb.reset()
+
+    while len(tb.delivered) < count:
+        frames = await tb.collect_frames(idle_cycles=4)
+        for value, seq in frames:
+            if rng.random() < 0.25:
+                continue
+            await tb.deliver(value, seq)
+
+    counters = await tb.quiesce()
+
+    assert counters['frames_sent'] == tb.frames_seen, f"frames_sent={counters['frames_sent']}, seen {tb.frames_seen}"
+    assert counters['retransmissions'] == tb.frames_seen - len(tb.values_seen), \
+        f"retransmissions={counters['retransmissions']}, expected {tb.frames_seen - len(tb.values_seen)}"
+    assert counters['frames_received'] == tb.acks_sent, f"frames_received={counters['frames_received']}, sent {tb.acks_sent}"
+    assert counters['bit_mismatches'] == tb.stale_acks, f"bit_mismatches={counters['bit_mismatches']}, expected {tb.stale_acks}"
+    assert counters['early_terminations'] == 0, "No truncated frames were sent"
+    assert counters['timeouts'] > 0, "Dropped frames should have caused a timeout"
+    assert 2 * tb.packet_size <= counters['rtt_min'] <= counters['rtt_max'], \
+        f"RTT watermarks implausible: min={counters['rtt_min']}, max={counters['rtt_max']}"
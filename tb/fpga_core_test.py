@@ -0,0 +1,269 @@
+import cocotb
+from cocotb.clock import Clock
+from cocotb.triggers import RisingEdge, ClockCycles, Timer
+from cocotb.utils import get_sim_time
+from cocotbext.axi import AxiStreamBus, AxiStreamSource, AxiStreamSink
+
+import logging
+import random
+
+from utils.abp_stats import AbpCounters, RECEIVER_COUNTERS
+
+class FPGA_Core_Testbench:
+    """
+    Runs fpga_core end to end with the vendor MAC replaced by
+    rtl/sim/tri_mode_ethernet_mac_0_model.v. The testbench plays the MAC:
+    it injects received frames on rx_axis_mac and collects transmitted frames
+    from tx_axis_mac, spacing both by the preamble and inter-frame gap so the
+    client FIFOs, their clock crossings and abp_receiver_i see 1G line-rate
+    traffic.
+    """
+    # Preamble/SFD plus minimum inter-frame gap, in byte times
+    FRAME_OVERHEAD = 8 + 12
+
+    # Recovered receive clock, 250 ppm fast against gtx_clk so the receive
+    # FIFO's clock crossing drifts through every phase during a run. The
+    # period must be even: the design's precision is 1 ps and cocotb's
+    # Clock cannot place a half-picosecond edge.
+    RX_CLOCK_PERIOD_PS = 7998
+
+    def __init__(self, dut, seed=29):
+        self.dut = dut
+        self.log = logging.getLogger("fpga_core.tb")
+        self.log.setLevel(logging.DEBUG)
+
+        self.rng = random.Random(seed)
+        self.mac = dut.trimac_fifo_block.tri_mode_ethernet_mac_i
+        self.fifo = dut.trimac_fifo_block.user_side_FIFO
+        self.receiver = dut.abp_receiver_i
+
+        self.packet_size = int(self.receiver.PACKET_SIZE.value)
+        self.value_size = int(self.receiver.VALUE_SIZE.value)
+
+        cocotb.start_soon(Clock(dut.clk_25mhz_ref, 40, units='ns').start())
+        cocotb.start_soon(Clock(dut.rgmii_gem2_rxc, self.RX_CLOCK_PERIOD_PS, units='ps').start())
+
+        # MAC client interfaces
+        self.source = AxiStreamSource(AxiStreamBus.from_prefix(self.mac, "rx_axis_mac"), self.mac.rx_mac_aclk, self.mac.rx_reset)
+        self.sink = AxiStreamSink(AxiStreamBus.from_prefix(self.mac, "tx_axis_mac"), self.mac.tx_mac_aclk, self.mac.tx_reset)
+
+        # Probability that the transmit MAC withholds tready on a given cycle
+        self.tx_stall_probability = 0.0
+
+        # Accounting
+        self.injected = {}
+        self.acks = []
+        self.rx_fifo_high_water = 0
+        self.tx_fifo_high_water = 0
+        self.rx_fifo_overflow_cycles = 0
+
+    async def reset(self):
+        self.dut.glbl_rst.setimmediatevalue(1)
+        self.dut.rgmii_gem2_rxd.setimmediatevalue(0)
+        self.dut.rgmii_gem2_rx_ctl.setimmediatevalue(0)
+        await Timer(1, units='us')
+        self.dut.glbl_rst.value = 0
+
+        # MMCM lock, then the reset synchronisers release the client FIFOs
+        while not self.dut.gtx_resetn.value:
+            await RisingEdge(self.dut.gtx_clk_bufg_out)
+        await ClockCycles(self.dut.gtx_clk_bufg_out, 16)
+
+        cocotb.start_soon(self._transmit_mac())
+        cocotb.start_soon(self._collect())
+        cocotb.start_soon(self._watch_rx_fifo())
+        cocotb.start_soon(self._watch_tx_fifo())
+
+    async def _transmit_mac(self):
+        """Withhold tready for the preamble and gap after every frame, plus random stalls."""
+        clk = self.mac.tx_mac_aclk
+        while True:
+            await RisingEdge(clk)
+            if self.mac.tx_axis_mac_tvalid.value and self.mac.tx_axis_mac_tready.value and self.mac.tx_axis_mac_tlast.value:
+                self.sink.pause = True
+                await ClockCycles(clk, self.FRAME_OVERHEAD - 1)
+            self.sink.pause = self.rng.random() < self.tx_stall_probability
+
+    async def _collect(self):
+        while True:
+            frame = await self.sink.recv()
+            tdata = frame.tdata
+            value = int.from_bytes(tdata[0:self.value_size], 'big')
+            self.acks.append((value, tdata[-1], len(tdata), get_sim_time('ns')))
+
+    async def _watch_rx_fifo(self):
+        rx_fifo = self.fifo.rx_fifo_i
+        while True:
+            await RisingEdge(self.mac.rx_mac_aclk)
+            self.rx_fifo_high_water = max(self.rx_fifo_high_water, int(rx_fifo.fifo_status.value))
+            if rx_fifo.fifo_overflow.value:
+                self.rx_fifo_overflow_cycles += 1
+
+    async def _watch_tx_fifo(self):
+        tx_fifo = self.fifo.tx_fifo_i
+        while True:
+            await RisingEdge(self.mac.tx_mac_aclk)
+            self.tx_fifo_high_water = max(self.tx_fifo_high_water, int(tx_fifo.fifo_status.value))
+
+    def packet(self, value, bit):
+        payload = value.to_bytes(self.value_size, 'big')
+        return payload + bytes(self.packet_size - 1 - len(payload)) + bytes([bit])
+
+    async def inject(self, value, bit, gap=None):
+        """Receive one frame from the wire, followed by an inter-frame gap of gap byte times."""
+        self.injected[value] = (bit, get_sim_time('ns'))
+        await self.source.send(self.packet(value, bit))
+        await self.source.wait()
+        await ClockCycles(self.mac.rx_mac_aclk, self.FRAME_OVERHEAD if gap is None else gap)
+
+    async def drain(self, idle_cycles=None):
+        """Wait until no acknowledgement has left the core for idle_cycles."""
+        idle_cycles = idle_cycles or 8 * (self.packet_size + self.FRAME_OVERHEAD)
+        idle = 0
+        count = len(self.acks)
+        while idle < idle_cycles:
+            await RisingEdge(self.mac.tx_mac_aclk)
+            if len(self.acks) != count:
+                count = len(self.acks)
+                idle = 0
+            else:
+                idle += 1
+
+    async def run_load(self, count, gap=None, first_value=1):
+        """Offer count frames back to back and return the measured statistics."""
+        acks_before = len(self.acks)
+        counters_before = AbpCounters.from_dut(self.receiver, RECEIVER_COUNTERS)
+        start = get_sim_time('ns')
+
+        for i in range(count):
+            await self.inject(first_value + i, i % 2, gap)
+        offered_end = get_sim_time('ns')
+        await self.drain()
+
+        acks = self.acks[acks_before:]
+        counters = AbpCounters.from_dut(self.receiver, RECEIVER_COUNTERS)
+        delta = counters.delta(counters_before)
+        latencies = [t - self.injected[v - 1][1] for v, _, _, t in acks if v - 1 in self.injected]
+        end = acks[-1][3] if acks else offered_end
+
+        stats = {
+            'offered': count,
+            'acknowledged': len(acks),
+            'lost': count - len(acks),
+            'offered_fps': count / ((offered_end - start) * 1e-9),
+            'frames_per_sec': len(acks) / ((end - start) * 1e-9),
+            'latency_min_ns': min(latencies, default=None),
+            'latency_mean_ns': sum(latencies) / len(latencies) if latencies else None,
+            'latency_max_ns': max(latencies, default=None),
+            'rx_fifo_high_water': self.rx_fifo_high_water,
+            'tx_fifo_high_water': self.tx_fifo_high_water,
+            'rx_fifo_overflow_cycles': self.rx_fifo_overflow_cycles,
+            'receiver_frames_received': delta['frames_received'],
+            'receiver_early_terminations': delta['early_terminations'],
+            'receiver_stall_fraction': delta['stall_cycles'] / delta['cycles'],
+        }
+        return acks, stats
+
+    def report(self, label, stats):
+        self.log.info(
+            f"{label}: {stats['acknowledged']}/{stats['offered']} frames acknowledged, "
+            f"{stats['frames_per_sec'] / 1e6:.3f} Mframes/s "
+            f"(offered {stats['offered_fps'] / 1e6:.3f} Mframes/s)"
+        )
+        if stats['latency_mean_ns'] is not None:
+            self.log.info(
+                f"{label}: latency min/mean/max "
+                f"{stats['latency_min_ns']:.0f}/{stats['latency_mean_ns']:.0f}/{stats['latency_max_ns']:.0f} ns"
+            )
+        self.log.info(
+            f"{label}: FIFO high water rx {stats['rx_fifo_high_water']}/15 tx {stats['tx_fifo_high_water']}/15, "
+            f"rx overflow cycles {stats['rx_fifo_overflow_cycles']}, "
+            f"abp_receiver_i stalled {100 * stats['receiver_stall_fraction']:.1f}% of cycles"
+        )
+
+def check_acks(tb, acks):
+    """Every acknowledgement must echo an injected frame, incremented, in injection order."""
+    previous = 0
+    for value, bit, length, _ in acks:
+        assert length == tb.packet_size, f"Acknowledgement has {length} bytes"
+        assert value - 1 in tb.injected, f"Acknowledgement {value} does not match any injected frame"
+        assert bit == tb.injected[value - 1][0], f"Acknowledgement {value} carries the wrong bit"
+        assert value > previous, f"Acknowledgement {value} arrived out of order"
+        previous = value
+
+@cocotb.test(timeout_time=200, timeout_unit="us")
+async def test_fpga_core_single_frame(dut):
+    """
+    Test a single frame through the full client FIFO path.
+
+    This test verifies:
+    - The core comes out of reset once the MMCM locks
+    - A frame received by the MAC is acknowledged on the MAC transmit side
+    - The acknowledgement carries the incremented value and the same bit
+    - The unloaded round-trip latency is reported
+    """
+    tb = FPGA_Core_Testbench(dut)
+
+    await tb.reset()
+
+    acks, stats = await tb.run_load(1)
+    tb.report("single frame", stats)
+
+    assert stats['acknowledged'] == 1, f"Expected one acknowledgement, got {stats['acknowledged']}"
+    check_acks(tb, acks)
+
+@cocotb.test(timeout_time=2000, timeout_unit="us")
+async def test_fpga_core_line_rate(dut):
+    """
+    Test throughput and latency at 1G line rate.
+
+    This test verifies:
+    - Back-to-back minimum-gap frames are all acknowledged
+    - Acknowledgements arrive in order with the right value and bit
+    - Achieved frames/sec keeps up with the offered rate
+    - The receive FIFO never overflows
+    """
+    tb = FPGA_Core_Testbench(dut)
+    count = 200
+
+    await tb.reset()
+
+    acks, stats = await tb.run_load(count)
+    tb.report("line rate", stats)
+
+    check_acks(tb, acks)
+    assert stats['lost'] == 0, f"{stats['lost']} frames lost at line rate"
+    assert stats['rx_fifo_overflow_cycles'] == 0, "Receive FIFO overflowed at line rate"
+    assert stats['frames_per_sec'] >= 0.9 * stats['offered_fps'], \
+        f"Core fell behind: {stats['frames_per_sec']:.0f} of {stats['offered_fps']:.0f} frames/s"
+
+@cocotb.test(timeout_time=4000, timeout_unit="us")
+async def test_fpga_core_transmit_backpressure(dut):
+    """
+    Test the client FIFO path with a congested transmit MAC.
+
+    This test verifies:
+    - Random transmit stalls back the transmit FIFO up into abp_receiver_i,
+      which holds off the receive FIFO while an acknowledgement is pending
+    - The receive FIFO drops whole frames when it fills, and never passes
+      a partial frame to abp_receiver_i
+    - Every frame abp_receiver_i accepts is acknowledged, and every
+      acknowledgement is a correct, in-order echo
+    - Frames lost to the backpressure are reported rather than corrupted
+    """
+    tb = FPGA_Core_Testbench(dut)
+    tb.tx_stall_probability = 0.5
+    count = 200
+
+    await tb.reset()
+
+    acks, stats = await tb.run_load(count)
+    tb.report("transmit backpressure", stats)
+
+    check_acks(tb, acks)
+    assert stats['receiver_early_terminations'] == 0, \
+        f"abp_receiver_i saw {stats['receiver_early_terminations']} truncated frames"
+    assert stats['acknowledged'] == stats['receiver_frames_received'], \
+        f"abp_receiver_i accepted {stats['receiver_frames_received']} frames but acknowledged {stats['acknowledged']}"
+    assert stats['acknowledged'] > 0, "No acknowledgement made it through the congested MAC"
+    tb.log.info(f"transmit backpressure: {stats['lost']} frames dropped whole by the receive FIFO")
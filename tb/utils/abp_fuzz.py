@@ -0,0 +1,360 @@
+"""
+ABP Frame Fuzzer
+
+This module holds the simulator-independent half of the coverage-guided
+fuzzer for abp_packet_rx: the fuzz case format, the mutators, the on-disk
+corpus and a launcher that runs several fuzz workers in parallel. The cocotb
+harness that executes cases and collects coverage is tb/abp_packet_rx_fuzz.py.
+
+A fuzz case is a list of beats plus a consumer ready pattern. Each beat is
+(gap, tdata, tlast, idle_tdata, idle_tlast): gap idle cycles with tvalid low,
+during which tdata and tlast carry idle_tdata and idle_tlast (AXI-Stream
+leaves them undefined while tvalid is low), followed by the beat itself.
+Frames are delimited only by tlast, so mutating tlast placement also mutates
+frame length. The ready pattern is a string of '0' and '1' repeated over the
+run and drives abp_tx_ready.
+
+Coverage points are short strings produced by the harness. A case is kept
+when it reaches a point the worker has not seen before.
+
+Usage:
+    $ python utils/abp_fuzz.py run --workers 8 --time 600
+    $ python utils/abp_fuzz.py stats corpus_abp_packet_rx
+
+Corpus layout:
+    queue/<sha1>.json    Interesting cases and the coverage points they hit
+    crashes/<sha1>.json  Cases that broke an invariant, with the message
+    stats/<worker>.json  Execs, run time and findings per worker
+    logs/<worker>.log    Simulator output of workers started by 'run'
+
+Environment (read by tb/abp_packet_rx_fuzz.py):
+    FUZZ_CORPUS   Corpus directory (default corpus_abp_packet_rx)
+    FUZZ_EXECS    Stop after this many executions (default 500 without FUZZ_TIME)
+    FUZZ_TIME     Stop after this many seconds
+    FUZZ_SEED     Random seed (default: worker number)
+    FUZZ_WORKER   Worker number, used to name stats files (default 0)
+    FUZZ_REPORT   Seconds between progress reports and corpus syncs (default 10)
+    FUZZ_REPLAY   Colon-separated case files to replay instead of fuzzing
+
+Note:
+    Cases are named by the SHA-1 of their canonical JSON, so identical inputs
+    found by different workers are stored once. Files are written to a
+    temporary name and renamed, so workers can read the corpus while others
+    write to it. Workers pick up each other's cases on every sync, together
+    with the coverage those cases recorded, without re-running them.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+CORPUS = os.environ.get('FUZZ_CORPUS', 'corpus_abp_packet_rx')
+TIME = float(os.environ.get('FUZZ_TIME') or 0) or None
+EXECS = int(os.environ.get('FUZZ_EXECS') or 0) or (None if TIME else 500)
+WORKER = int(os.environ.get('FUZZ_WORKER', '0'))
+SEED = int(os.environ.get('FUZZ_SEED', str(WORKER)))
+REPORT_INTERVAL = float(os.environ.get('FUZZ_REPORT', '10'))
+REPLAY = [path for path in os.environ.get('FUZZ_REPLAY', '').split(':') if path]
+
+BEAT_FIELDS = ('gap', 'data', 'last', 'idle_data', 'idle_last')
+
+# Bytes worth trying in any field: bit values, sign and byte boundaries
+INTERESTING_BYTES = (0x00, 0x01, 0x02, 0x7f, 0x80, 0xfe, 0xff)
+
+class FuzzCase:
+    __slots__ = ('beats', 'ready')
+
+    def __init__(self, beats, ready='1'):
+        self.beats = [tuple(beat) for beat in beats]
+        self.ready = ready or '1'
+
+    @classmethod
+    def from_frames(cls, frames, gap=0, ready='1'):
+        """Build a case of back-to-back frames, each a bytes object."""
+        beats = []
+        for frame in frames:
+            for i, byte in enumerate(frame):
+                beats.append((gap, byte, int(i == len(frame) - 1), 0, 0))
+        return cls(beats, ready)
+
+    def to_json(self):
+        return {'beats': [list(beat) for beat in self.beats], 'ready': self.ready}
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(data['beats'], data['ready'])
+
+    @property
+    def key(self):
+        canonical = json.dumps(self.to_json(), separators=(',', ':'), sort_keys=True)
+        return hashlib.sha1(canonical.encode()).hexdigest()
+
+def seed_cases(packet_size, payload_bytes):
+    """Starting corpus: well-formed traffic and the obvious length boundaries."""
+    def frame(value, bit, length=packet_size):
+        payload = bytes((value + i) & 0xff for i in range(payload_bytes))
+        body = payload + bytes(max(0, packet_size - 1 - payload_bytes)) + bytes([bit])
+        return (body * (length // packet_size + 1))[:length]
+
+    return [
+        FuzzCase.from_frames([frame(0x0a, 1)]),
+        FuzzCase.from_frames([frame(0x10, 0), frame(0x20, 1)]),
+        FuzzCase.from_frames([frame(0x30, 1)], gap=1, ready='0001'),
+        FuzzCase.from_frames([frame(0x40, 0, payload_bytes), frame(0x50, 1)]),
+        FuzzCase.from_frames([frame(0x60, 1, packet_size - 1)]),
+        FuzzCase.from_frames([frame(0x70, 0, packet_size + 1)]),
+    ]
+
+class Mutator:
+    """Structure-aware mutations of a FuzzCase. Every mutation returns a new case."""
+
+    def __init__(self, rng, packet_size, max_beats=None):
+        self.rng = rng
+        self.packet_size = packet_size
+        self.max_beats = max_beats or 4 * packet_size
+        self.operators = (
+            self.flip_byte,
+            self.interesting_byte,
+            self.insert_beats,
+            self.delete_beats,
+            self.move_tlast,
+            self.toggle_tlast,
+            self.change_gap,
+            self.idle_noise,
+            self.mutate_ready,
+        )
+
+    def mutate(self, case, other=None):
+        """Apply a havoc stack of 1 to 8 mutations, with an occasional splice."""
+        beats = list(case.beats)
+        ready = case.ready
+        if other is not None and other.beats and self.rng.random() < 0.1:
+            beats = self.splice(beats, other.beats)
+        for _ in range(1 << self.rng.randrange(4)):
+            beats, ready = self.rng.choice(self.operators)(beats, ready)
+        if not beats:
+            beats = [(0, 0, 1, 0, 0)]
+        return FuzzCase(beats[:self.max_beats], ready)
+
+    def _index(self, beats):
+        return self.rng.randrange(len(beats)) if beats else None
+
+    def _replace(self, beats, i, **fields):
+        beat = dict(zip(BEAT_FIELDS, beats[i]))
+        beat.update(fields)
+        beats[i] = tuple(beat[name] for name in BEAT_FIELDS)
+        return beats
+
+    def flip_byte(self, beats, ready):
+        i = self._index(beats)
+        if i is not None:
+            beats = self._replace(beats, i, data=beats[i][1] ^ (1 << self.rng.randrange(8)))
+        return beats, ready
+
+    def interesting_byte(self, beats, ready):
+        i = self._index(beats)
+        if i is not None:
+            beats = self._replace(beats, i, data=self.rng.choice(INTERESTING_BYTES))
+        return beats, ready
+
+    def insert_beats(self, beats, ready):
+        count = self.rng.choice((1, 1, 2, 4, self.rng.randrange(1, self.packet_size + 1)))
+        at = self.rng.randrange(len(beats) + 1)
+        new = [(0, self.rng.randrange(256), 0, 0, 0) for _ in range(count)]
+        return beats[:at] + new + beats[at:], ready
+
+    def delete_beats(self, beats, ready):
+        if beats:
+            at = self.rng.randrange(len(beats))
+            count = self.rng.choice((1, 1, 2, 4, self.rng.randrange(1, self.packet_size + 1)))
+            beats = beats[:at] + beats[at + count:]
+        return beats, ready
+
+    def move_tlast(self, beats, ready):
+        """Move a tlast by a few beats, growing one frame and shrinking its neighbour."""
+        lasts = [i for i, beat in enumerate(beats) if beat[2]]
+        if lasts:
+            i = self.rng.choice(lasts)
+            j = min(len(beats) - 1, max(0, i + self.rng.choice((-2, -1, 1, 2, self.rng.randrange(-8, 9)))))
+            beats = self._replace(beats, i, last=0)
+            beats = self._replace(beats, j, last=1)
+        return beats, ready
+
+    def toggle_tlast(self, beats, ready):
+        """Split a frame in two, or merge two frames into one."""
+        i = self._index(beats)
+        if i is not None:
+            beats = self._replace(beats, i, last=1 - beats[i][2])
+        return beats, ready
+
+    def change_gap(self, beats, ready):
+        i = self._index(beats)
+        if i is not None:
+            beats = self._replace(beats, i, gap=self.rng.choice((0, 0, 1, 2, self.rng.randrange(16))))
+        return beats, ready
+
+    def idle_noise(self, beats, ready):
+        """Put garbage on tdata and tlast during a gap, which the parser must ignore."""
+        i = self._index(beats)
+        if i is not None:
+            beats = self._replace(
+                beats, i,
+                gap=beats[i][0] or 1,
+                idle_data=self.rng.randrange(256),
+                idle_last=self.rng.randrange(2),
+            )
+        return beats, ready
+
+    def mutate_ready(self, beats, ready):
+        choice = self.rng.randrange(4)
+        if choice == 0:
+            ready = '1'
+        elif choice == 1:
+            ready = ''.join(self.rng.choice('01') for _ in range(self.rng.randrange(1, 17)))
+        elif choice == 2:
+            ready = '0' * self.rng.randrange(1, 2 * self.packet_size) + '1'
+        else:
+            i = self.rng.randrange(len(ready))
+            ready = ready[:i] + ('1' if ready[i] == '0' else '0') + ready[i + 1:]
+        return beats, ready
+
+    def splice(self, beats, other):
+        """Head of one case followed by the tail of another."""
+        return beats[:self.rng.randrange(len(beats) + 1)] + list(other[self.rng.randrange(len(other)):])
+
+class Corpus:
+    def __init__(self, path):
+        self.path = path
+        self.seen = set()
+        for sub in ('queue', 'crashes', 'stats', 'logs'):
+            os.makedirs(os.path.join(path, sub), exist_ok=True)
+
+    def _write(self, sub, name, data):
+        target = os.path.join(self.path, sub, name)
+        tmp = f'{target}.{os.getpid()}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp, target)
+
+    def add(self, case, coverage, worker=WORKER):
+        """Store an interesting case. Returns False if an identical case is already stored."""
+        key = case.key
+        self.seen.add(key)
+        if os.path.exists(os.path.join(self.path, 'queue', f'{key}.json')):
+            return False
+        self._write('queue', f'{key}.json', {'case': case.to_json(), 'coverage': sorted(coverage), 'worker': worker})
+        return True
+
+    def add_crash(self, case, message, worker=WORKER):
+        self._write('crashes', f'{case.key}.json', {'case': case.to_json(), 'message': message, 'worker': worker})
+
+    def sync(self):
+        """Cases stored since the last sync, by this worker or any other, with their coverage."""
+        entries = []
+        queue = os.path.join(self.path, 'queue')
+        for name in sorted(os.listdir(queue)):
+            key, ext = os.path.splitext(name)
+            if ext != '.json' or key in self.seen:
+                continue
+            self.seen.add(key)
+            try:
+                with open(os.path.join(queue, name)) as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                continue
+            entries.append((FuzzCase.from_json(entry['case']), set(entry['coverage'])))
+        return entries
+
+    def write_stats(self, worker, stats):
+        self._write('stats', f'worker{worker}.json', stats)
+
+    def summary(self):
+        """Corpus size, coverage, findings and throughput summed over all workers."""
+        coverage = set()
+        entries = 0
+        for name in os.listdir(os.path.join(self.path, 'queue')):
+            if name.endswith('.json'):
+                with open(os.path.join(self.path, 'queue', name)) as f:
+                    coverage.update(json.load(f)['coverage'])
+                entries += 1
+        workers = []
+        for name in sorted(os.listdir(os.path.join(self.path, 'stats'))):
+            if name.endswith('.json'):
+                with open(os.path.join(self.path, 'stats', name)) as f:
+                    workers.append(json.load(f))
+        crashes = [name for name in os.listdir(os.path.join(self.path, 'crashes')) if name.endswith('.json')]
+        return {
+            'entries': entries,
+            'coverage': len(coverage),
+            'crashes': len(crashes),
+            'workers': len(workers),
+            'execs': sum(w['execs'] for w in workers),
+            'execs_per_sec': sum(w['execs'] / w['seconds'] for w in workers if w['seconds']),
+        }
+
+def format_summary(summary):
+    return (
+        f"{summary['workers']} worker(s), {summary['execs']} execs, "
+        f"{summary['execs_per_sec']:.1f} execs/s, {summary['entries']} corpus entries, "
+        f"{summary['coverage']} coverage points, {summary['crashes']} crash(es)"
+    )
+
+def run_workers(corpus, workers, seconds, execs, seed):
+    """Start one simulator per worker on a shared corpus and wait for them all."""
+    tb_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    corpus = os.path.abspath(corpus)
+    Corpus(corpus)
+
+    procs = []
+    for worker in range(workers):
+        env = dict(os.environ)
+        env.update(
+            FUZZ_CORPUS=corpus,
+            FUZZ_WORKER=str(worker),
+            FUZZ_SEED=str(seed + worker),
+            FUZZ_TIME=str(seconds or ''),
+            FUZZ_EXECS=str(execs or ''),
+        )
+        log = open(os.path.join(corpus, 'logs', f'worker{worker}.log'), 'w')
+        procs.append((subprocess.Popen(
+            [
+                'make', 'TOPLEVEL=abp_packet_rx', 'MODULE=abp_packet_rx_fuzz',
+                f'SIM_BUILD=sim_build_fuzz_{worker}', f'COCOTB_RESULTS_FILE=results_fuzz_{worker}.xml',
+            ],
+            cwd=tb_dir, env=env, stdout=log, stderr=subprocess.STDOUT,
+        ), log))
+
+    status = 0
+    for proc, log in procs:
+        status |= proc.wait()
+        log.close()
+    return status
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Parallel coverage-guided fuzzing of abp_packet_rx')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    run = sub.add_parser('run', help='Run fuzz workers on a shared corpus')
+    run.add_argument('--corpus', default=CORPUS, help='Corpus directory')
+    run.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Number of parallel simulators')
+    run.add_argument('--time', type=float, help='Seconds to fuzz for')
+    run.add_argument('--execs', type=int, help='Executions per worker')
+    run.add_argument('--seed', type=int, default=random.randrange(1 << 16), help='Seed of worker 0')
+
+    stats = sub.add_parser('stats', help='Summarise a corpus')
+    stats.add_argument('corpus', nargs='?', default=CORPUS, help='Corpus directory')
+
+    args = parser.parse_args()
+    if args.command == 'run':
+        start = time.time()
+        status = run_workers(args.corpus, args.workers, args.time, args.execs, args.seed)
+        print(f'Fuzzed for {time.time() - start:.0f} s')
+        print(format_summary(Corpus(args.corpus).summary()))
+        sys.exit(status)
+    else:
+        print(format_summary(Corpus(args.corpus).summary()))
@@ -0,0 +1,125 @@
+"""
+ABP Performance Counter Readout
+
+This module decodes snapshots of the free-running performance counters that
+abp_transmitter, abp_receiver and abp_mux export on their stat_* ports, and
+turns two snapshots into rates.
+
+A snapshot can be taken either from a cocotb DUT handle, by reading the
+stat_* signals directly, or from a list of 32-bit words read back over a
+memory-mapped interface. The word order is the register map below: counter
+i sits at byte offset 4*i.
+
+Usage:
+    prev = AbpCounters.from_dut(dut, TRANSMITTER_COUNTERS)
+    ...
+    curr = AbpCounters.from_dut(dut, TRANSMITTER_COUNTERS)
+    rates = curr.rates(prev, clock_hz=125e6)
+
+Note:
+    Counters wrap at 2**COUNTER_WIDTH, so deltas are taken modulo that width.
+    A snapshot pair is only meaningful if fewer than 2**COUNTER_WIDTH cycles
+    elapsed between the two reads (about 34 s at 125 MHz with 32 bits).
+    rtt_min and rtt_max are watermarks rather than counters and are reported
+    as-is; rtt_min reads all ones until the first round trip is sampled.
+"""
+
+# Register map of abp_transmitter, in stat_* port order
+TRANSMITTER_COUNTERS = (
+    'cycles',
+    'frames_sent',
+    'frames_received',
+    'retransmissions',
+    'timeouts',
+    'bit_mismatches',
+    'early_terminations',
+    'stall_cycles',
+    'rtt_min',
+    'rtt_max',
+)
+
+# Register map of abp_receiver, in stat_* port order
+RECEIVER_COUNTERS = (
+    'cycles',
+    'frames_received',
+    'frames_sent',
+    'bit_mismatches',
+    'early_terminations',
+    'stall_cycles',
+)
+
+# Register map of abp_mux, in stat_* port order
+MUX_COUNTERS = (
+    'cycles',
+    'frames_received',
+    'frames_sent',
+    'unknown_sessions',
+    'stall_cycles',
+)
+
+WATERMARKS = ('rtt_min', 'rtt_max')
+
+class AbpCounters:
+    def __init__(self, values, counter_width=32):
+        self.values = dict(values)
+        self.counter_width = counter_width
+
+    @classmethod
+    def from_dut(cls, dut, names, counter_width=32):
+        """Sample the stat_* ports of a cocotb DUT handle."""
+        return cls({name: int(getattr(dut, f'stat_{name}').value) for name in names}, counter_width)
+
+    @classmethod
+    def from_words(cls, words, names, counter_width=32):
+        """Decode register words read back in register map order."""
+        if len(words) != len(names):
+            raise ValueError(f'Expected {len(names)} counter words, got {len(words)}')
+        return cls(zip(names, words), counter_width)
+
+    def __getitem__(self, name):
+        return self.values[name]
+
+    def delta(self, prev):
+        """Per-counter increments since prev, corrected for wrap-around."""
+        mask = (1 << self.counter_width) - 1
+        return {
+            name: (value - prev[name]) & mask
+            for name, value in self.values.items()
+            if name not in WATERMARKS
+        }
+
+    def rates(self, prev, clock_hz):
+        """
+        Convert the increments since prev into rates.
+
+        Returns frames per second for every frame counter, events per second
+        for the error counters, the fraction of cycles spent stalled, the
+        fraction of sent frames that were retransmissions, and the RTT
+        watermarks in seconds (None before the first sample).
+        """
+        delta = self.delta(prev)
+        cycles = delta['cycles']
+        if cycles == 0:
+            raise ValueError('Snapshots were taken on the same cycle')
+        seconds = cycles / clock_hz
+
+        rates = {}
+        for name, count in delta.items():
+            if name == 'cycles':
+                continue
+            if name == 'stall_cycles':
+                rates['stall_fraction'] = count / cycles
+            else:
+                rates[f'{name}_per_sec'] = count / seconds
+
+        if 'retransmissions' in delta:
+            sent = delta['frames_sent']
+            rates['retransmission_ratio'] = delta['retransmissions'] / sent if sent else 0.0
+
+        if 'rtt_min' in self.values:
+            unsampled = (1 << self.counter_width) - 1
+            rtt_min = self.values['rtt_min']
+            rates['rtt_min_sec'] = None if rtt_min == unsampled else rtt_min / clock_hz
+            rates['rtt_max_sec'] = self.values['rtt_max'] / clock_hz if rtt_min != unsampled else None
+
+        return rates
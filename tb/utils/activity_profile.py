@@ -0,0 +1,404 @@
+"""
+Switching Activity Profiler
+
+This module counts toggles per net over a window of simulation as input for
+dynamic power estimation, and writes the result as SAIF for Vivado power
+analysis or as a report of the hottest nets.
+
+Activity can be collected two ways:
+
+- ActivityProfiler samples every net under a cocotb handle on each rising
+  edge of a clock. It is opt-in (see ENABLED below) and captures all
+  register activity in single-clock designs such as the ABP cores, but not
+  combinational glitches between edges.
+- ActivityProfile.from_vcd() reads a VCD dump written by the simulator, which
+  records every value change, glitches included.
+
+Usage:
+    profiler = ActivityProfiler(dut, dut.aclk)
+    profiler.start()
+    ...
+    profile = profiler.stop()
+    profile.write_saif('abp_packet_tx.saif')
+    print(profile.report(10))
+
+    $ python activity_profile.py dump.vcd --scope abp_packet_tx --saif out.saif --top 20
+
+Environment (read by the activity tests in tb/):
+    ACTIVITY         Set to 1 to run the activity tests
+    ACTIVITY_WINDOW  Cycles to profile (default: the whole workload)
+    ACTIVITY_TOP     Number of nets in the report (default 10)
+    ACTIVITY_SAIF    SAIF output path (default <toplevel>.saif)
+
+Note:
+    Per-bit counters live in array('Q') buffers and are only touched when a
+    bit changes, so the cost of a sample is one read per net plus work in
+    proportion to the bits that toggled. X and Z count as a separate state:
+    time spent there is reported as TX, and transitions into or out of X are
+    not counted as toggles. Bit 0 is taken to be the LSB of every vector.
+    Unpacked arrays (memories) are not profiled.
+"""
+
+from array import array
+import argparse
+import datetime
+import os
+import re
+import sys
+
+ENABLED = bool(os.environ.get('ACTIVITY'))
+WINDOW = int(os.environ.get('ACTIVITY_WINDOW', '0')) or None
+TOP_N = int(os.environ.get('ACTIVITY_TOP', '10'))
+
+_ONES = str.maketrans('01xXzZuUwWlLhH-', '010000000000110')
+_UNKNOWN = str.maketrans('01xXzZuUwWlLhH-', '001111111100001')
+
+def _decode(binstr):
+    """Split a bit string into (value, x/z mask) integers."""
+    return int(binstr.translate(_ONES), 2), int(binstr.translate(_UNKNOWN), 2)
+
+class NetActivity:
+    __slots__ = ('path', 'width', 'toggles', 'time_high', 'time_x', 'last_change', 'value', 'xmask')
+
+    def __init__(self, path, width, time, value=0, xmask=0):
+        self.path = path
+        self.width = width
+        self.value = value
+        self.xmask = xmask
+        self.reset(time)
+
+    def reset(self, time):
+        """Clear the counters and start a new window at time."""
+        self.toggles = array('Q', bytes(8 * self.width))
+        self.time_high = array('Q', bytes(8 * self.width))
+        self.time_x = array('Q', bytes(8 * self.width))
+        self.last_change = array('Q', [time] * self.width)
+
+    def update(self, time, value, xmask):
+        changed = (value ^ self.value) | (xmask ^ self.xmask)
+        if not changed:
+            return
+        toggled = (value ^ self.value) & ~(xmask | self.xmask)
+        while changed:
+            bit = changed & -changed
+            i = bit.bit_length() - 1
+            self._close(i, bit, time)
+            if toggled & bit:
+                self.toggles[i] += 1
+            changed ^= bit
+        self.value = value
+        self.xmask = xmask
+
+    def _close(self, i, bit, time):
+        span = time - self.last_change[i]
+        if self.xmask & bit:
+            self.time_x[i] += span
+        elif self.value & bit:
+            self.time_high[i] += span
+        self.last_change[i] = time
+
+    def flush(self, time):
+        """Account the time since each bit last changed up to time."""
+        for i in range(self.width):
+            self._close(i, 1 << i, time)
+
+    @property
+    def total_toggles(self):
+        return sum(self.toggles)
+
+class ActivityProfile:
+    """
+    Per-bit toggle counts and high/X durations for a set of nets over one
+    window. Times are integers in units of timescale.
+    """
+    def __init__(self, nets, duration, timescale='1 ps', cycles=None):
+        self.nets = nets
+        self.duration = duration
+        self.timescale = timescale
+        self.cycles = cycles
+
+    def activity(self, net):
+        """Average toggles per bit per cycle, the activity factor used by power tools."""
+        if not self.cycles:
+            return None
+        return net.total_toggles / (net.width * self.cycles)
+
+    def hottest(self, n=10):
+        return sorted(self.nets, key=lambda net: net.total_toggles, reverse=True)[:n]
+
+    def report(self, n=10):
+        window = f'{self.cycles} cycles, ' if self.cycles else ''
+        lines = [
+            f'Top {n} nets by toggles ({window}{self.duration} x {self.timescale}, '
+            f'{sum(net.total_toggles for net in self.nets)} toggles over {len(self.nets)} nets)',
+            f'{"toggles":>10} {"activity":>9} {"width":>6}  net',
+        ]
+        for net in self.hottest(n):
+            activity = self.activity(net)
+            activity = f'{activity:9.4f}' if activity is not None else f'{"-":>9}'
+            lines.append(f'{net.total_toggles:>10} {activity} {net.width:>6}  {net.path}')
+        return '\n'.join(lines)
+
+    def write_saif(self, path, design=''):
+        """Write the profile as backward SAIF 2.0, one INSTANCE per hierarchy level."""
+        tree = {}
+        for net in self.nets:
+            *scopes, name = net.path.split('.')
+            node = tree
+            for scope in scopes:
+                node = node.setdefault(scope, {})
+            node.setdefault(None, []).append((name, net))
+
+        with open(path, 'w') as f:
+            f.write('(SAIFILE\n')
+            f.write('(SAIFVERSION "2.0")\n')
+            f.write('(DIRECTION "backward")\n')
+            f.write(f'(DESIGN "{design}")\n')
+            f.write(f'(DATE "{datetime.datetime.now().strftime("%a %b %d %H:%M:%S %Y")}")\n')
+            f.write('(VENDOR "ABPVerilog")\n')
+            f.write('(PROGRAM_NAME "activity_profile.py")\n')
+            f.write('(VERSION "1.0")\n')
+            f.write('(DIVIDER / )\n')
+            f.write(f'(TIMESCALE {self.timescale})\n')
+            f.write(f'(DURATION {self.duration})\n')
+            self._write_instance(f, tree, 0)
+            f.write(')\n')
+
+    def _write_instance(self, f, node, depth):
+        indent = '  ' * depth
+        for scope, child in node.items():
+            if scope is None:
+                continue
+            f.write(f'{indent}(INSTANCE {_saif_name(scope)}\n')
+            nets = child.get(None, [])
+            if nets:
+                f.write(f'{indent}  (NET\n')
+                for name, net in nets:
+                    for i in range(net.width):
+                        bit_name = _saif_name(name if net.width == 1 else f'{name}[{i}]')
+                        t1 = net.time_high[i]
+                        tx = net.time_x[i]
+                        t0 = self.duration - t1 - tx
+                        f.write(
+                            f'{indent}    ({bit_name}\n'
+                            f'{indent}      (T0 {t0}) (T1 {t1}) (TX {tx})\n'
+                            f'{indent}      (TC {net.toggles[i]}) (IG 0)\n'
+                            f'{indent}    )\n'
+                        )
+                f.write(f'{indent}  )\n')
+            self._write_instance(f, child, depth + 1)
+            f.write(f'{indent})\n')
+
+    @classmethod
+    def from_vcd(cls, path, scope=None, start=None, end=None, clock_period=None):
+        """
+        Build a profile from a VCD dump.
+
+        scope restricts the profile to nets under that dotted hierarchy path,
+        start and end bound the window in dump time units, and clock_period
+        (same units) turns the window length into a cycle count.
+        """
+        with open(path) as f:
+            tokens = iter(f.read().split())
+
+        timescale = '1 ps'
+        stack = []
+        by_code = {}
+        nets = []
+
+        # Declarations
+        for token in tokens:
+            if token == '$timescale':
+                words = _until_end(tokens)
+                timescale = re.sub(r'(\d+)\s*(\w+)', r'\1 \2', ''.join(words))
+            elif token == '$scope':
+                stack.append(_until_end(tokens)[1])
+            elif token == '$upscope':
+                _until_end(tokens)
+                stack.pop()
+            elif token == '$var':
+                words = _until_end(tokens)
+                width, code, name = int(words[1]), words[2], words[3]
+                net_path = '.'.join(stack + [name])
+                if scope is None or net_path.startswith(scope + '.'):
+                    net = NetActivity(net_path, width, 0, 0, (1 << width) - 1)
+                    by_code.setdefault(code, []).append(net)
+                    nets.append(net)
+            elif token == '$enddefinitions':
+                _until_end(tokens)
+                break
+            elif token.startswith('$'):
+                _until_end(tokens)
+
+        # Value changes
+        time = 0
+        begin = start or 0
+        started = start is None
+        for token in tokens:
+            c = token[0]
+            if c == '#':
+                time = int(token[1:])
+                if not started and time >= begin:
+                    for net in nets:
+                        net.reset(begin)
+                    started = True
+                if end is not None and time > end:
+                    time = end
+                    break
+                continue
+            if c in 'bB':
+                bits, code = token[1:], next(tokens)
+            elif c in '01xXzZ':
+                bits, code = c, token[1:]
+            elif c in 'rR':
+                next(tokens)
+                continue
+            else:
+                if token == '$comment':
+                    _until_end(tokens)
+                continue
+            for net in by_code.get(code, ()):
+                value, xmask = _decode(_extend(bits, net.width))
+                net.update(time, value, xmask)
+
+        if not started:
+            for net in nets:
+                net.reset(begin)
+            time = begin
+        for net in nets:
+            net.flush(time)
+        duration = time - begin
+        cycles = duration // clock_period if clock_period else None
+        return cls(nets, duration, timescale, cycles)
+
+class ActivityProfiler:
+    """
+    Samples every logic net under root on each rising edge of clock.
+
+    include and exclude are regular expressions matched against the dotted
+    net path. The clock net itself is skipped, since sampling on its edge
+    always sees it high.
+    """
+    def __init__(self, root, clock, include=None, exclude=None):
+        import cocotb.handle
+        from .hierarchy import walk
+
+        self.root = root
+        self.clock = clock
+        self.handles = []
+        include = re.compile(include) if include else None
+        exclude = re.compile(exclude) if exclude else None
+
+        skip = (cocotb.handle.RealObject, cocotb.handle.StringObject)
+        for handle in walk(root):
+            path = handle._path
+            if handle._path == clock._path or isinstance(handle, skip):
+                continue
+            if include and not include.search(path):
+                continue
+            if exclude and exclude.search(path):
+                continue
+            self.handles.append(handle)
+
+        self.nets = []
+        self.cycles = 0
+        self._start_time = 0
+        self._task = None
+
+    def _now(self):
+        from cocotb.utils import get_sim_time
+        return get_sim_time('ps')
+
+    def _sample(self, handle):
+        value = handle.value
+        if isinstance(value, int):
+            return value, 0
+        if value.is_resolvable:
+            return value.integer, 0
+        return _decode(value.binstr)
+
+    def start(self, cycles=None):
+        """Begin a window now; it ends after cycles clock edges or on stop()."""
+        import cocotb
+
+        self._start_time = self._now()
+        self.cycles = 0
+        self.nets = []
+        for handle in self.handles:
+            value, xmask = self._sample(handle)
+            self.nets.append(NetActivity(handle._path, len(handle), self._start_time, value, xmask))
+        self._task = cocotb.start_soon(self._run(cycles))
+
+    async def _run(self, cycles):
+        from cocotb.triggers import RisingEdge
+
+        while cycles is None or self.cycles < cycles:
+            await RisingEdge(self.clock)
+            self.cycles += 1
+            time = self._now()
+            for handle, net in zip(self.handles, self.nets):
+                value, xmask = self._sample(handle)
+                net.update(time, value, xmask)
+        self._end_time = self._now()
+
+    async def wait(self):
+        """Wait for a window started with a cycle count to complete."""
+        await self._task
+
+    def stop(self):
+        """End the window and return the ActivityProfile for it."""
+        if self._task.done():
+            end = self._end_time
+        else:
+            self._task.kill()
+            end = self._now()
+        for net in self.nets:
+            net.flush(end)
+        return ActivityProfile(self.nets, end - self._start_time, '1 ps', self.cycles)
+
+def save(profile, toplevel, log):
+    """Write the SAIF file and log the hottest nets, as configured by the environment."""
+    path = os.environ.get('ACTIVITY_SAIF', f'{toplevel}.saif')
+    profile.write_saif(path, design=toplevel)
+    for line in profile.report(TOP_N).splitlines():
+        log.info(line)
+    log.info(f'SAIF written to {path}')
+
+def _until_end(tokens):
+    words = []
+    for token in tokens:
+        if token == '$end':
+            break
+        words.append(token)
+    return words
+
+def _extend(bits, width):
+    """Left-extend a VCD vector value to width bits."""
+    if len(bits) >= width:
+        return bits[-width:]
+    pad = bits[0] if bits[0] in 'xXzZ' else '0'
+    return pad * (width - len(bits)) + bits
+
+def _saif_name(name):
+    return re.sub(r'([\[\]/\\.])', r'\\\1', name)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Toggle profile and SAIF export from a VCD dump')
+    parser.add_argument('vcd', help='VCD file written by the simulator')
+    parser.add_argument('--scope', help='Dotted hierarchy path to profile, e.g. abp_packet_tx')
+    parser.add_argument('--start', type=int, help='Window start in dump time units')
+    parser.add_argument('--end', type=int, help='Window end in dump time units')
+    parser.add_argument('--clock-period', type=int, help='Clock period in dump time units')
+    parser.add_argument('--saif', help='Write the profile to this SAIF file')
+    parser.add_argument('--top', type=int, default=10, help='Number of nets in the report')
+    args = parser.parse_args()
+
+    try:
+        profile = ActivityProfile.from_vcd(args.vcd, args.scope, args.start, args.end, args.clock_period)
+    except (OSError, ValueError) as e:
+        print(f'Error reading {args.vcd}: {e}', file=sys.stderr)
+        sys.exit(1)
+
+    print(profile.report(args.top))
+    if args.saif:
+        profile.write_saif(args.saif, design=args.scope or '')
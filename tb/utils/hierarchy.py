@@ -0,0 +1,41 @@
+"""
+Design Hierarchy Walk
+
+This module enumerates the signals under a cocotb handle, descending into
+every module instance and generate block. It is shared by the testbench
+utilities that act on all of a design's state at once, such as
+sim_snapshot and activity_profile.
+
+Usage:
+    for handle in walk(dut, memories=True):
+        print(handle._path)
+
+Note:
+    cocotb is imported on first use, so modules that import this one still
+    load outside a simulation.
+"""
+
+def walk(root, memories=False, constants=False):
+    """
+    Yield every signal handle under root, depth first.
+
+    Words of unpacked arrays (memories) are yielded one by one if memories
+    is set, and skipped otherwise. Parameters and other constants are only
+    yielded if constants is set.
+    """
+    import cocotb.handle
+
+    leaves = (cocotb.handle.ModifiableObject,)
+    if constants:
+        leaves += (cocotb.handle.ConstantObject,)
+    yield from _walk(root, cocotb.handle, leaves, memories)
+
+def _walk(handle, handles, leaves, memories):
+    for child in handle:
+        if isinstance(child, (handles.HierarchyObject, handles.HierarchyArrayObject)):
+            yield from _walk(child, handles, leaves, memories)
+        elif isinstance(child, handles.NonHierarchyIndexableObject):
+            if memories:
+                yield from child
+        elif isinstance(child, leaves):
+            yield child
@@ -0,0 +1,229 @@
+"""
+Simulation Snapshots
+
+This module checkpoints the state of a design after reset or a named warm-up
+phase, so that later tests, and later runs with other seeds, can start from
+the checkpoint instead of simulating the warm-up again.
+
+A snapshot is the value of every variable under a cocotb handle (regs,
+logic, enum and integer variables, and the words of unpacked memories),
+plus the testbench-driven inputs named by the caller, taken in the middle
+of a clock cycle. Restoring deposits those values at the same point of a
+later cycle; nets and combinational logic then settle from the restored
+variables, and the next rising edge carries on as it would have after the
+warm-up.
+
+Snapshots are cached on disk, keyed by:
+- a hash of the RTL sources
+- the simulator and its version
+- the design's parameter values
+- the warm-up name
+- the source of the warm-up coroutine (but not of what it calls)
+- any extra key the caller passes
+
+A change to any of these invalidates the cache.
+
+Usage:
+    async def first_frame():
+        await tb.reset()
+        return await tb.receive_tx_packet()
+
+    value, bit = await warm_start(dut, dut.aclk, 'first_frame', first_frame,
+                                  inputs=('aresetn', 's_axis_tvalid'))
+
+Environment:
+    SNAPSHOT          Set to 1 to use snapshots (default: always run the warm-up)
+    SNAPSHOT_DIR      Cache directory (default snapshots)
+    SNAPSHOT_REFRESH  Set to 1 to run every warm-up again and overwrite the cache
+
+Note:
+    Only state inside the simulator is captured. Whatever the warm-up
+    returns is stored with the snapshot and handed back on a restore, so it
+    must be JSON serializable. Testbench objects that the warm-up changes
+    are not captured. Neither are pending cocotbext-axi transfers, so the
+    warm-up should end with the buses idle. Simulation time is not restored.
+    Verilator's own --savable checkpoints are not reachable through cocotb,
+    but the same snapshots work under Verilator, which cocotb builds with
+    --public-flat-rw.
+"""
+
+import hashlib
+import inspect
+import json
+import logging
+import os
+import time
+
+from .hierarchy import walk
+
+ENABLED = bool(os.environ.get('SNAPSHOT'))
+DIRECTORY = os.environ.get('SNAPSHOT_DIR', 'snapshots')
+REFRESH = bool(os.environ.get('SNAPSHOT_REFRESH'))
+
+RTL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'rtl')
+
+# Simulator object types that hold state
+_VARIABLES = ('GPI_REGISTER', 'GPI_ENUM', 'GPI_INTEGER')
+
+_handles = {}
+_snapshots = {}
+
+def rtl_hash(directory=RTL_DIR):
+    """SHA-256 over every Verilog and SystemVerilog file under directory."""
+    digest = hashlib.sha256()
+    for base, dirs, files in sorted(os.walk(directory)):
+        dirs.sort()
+        for name in sorted(files):
+            if name.endswith(('.v', '.sv', '.vh', '.svh')):
+                path = os.path.join(base, name)
+                digest.update(os.path.relpath(path, directory).encode())
+                with open(path, 'rb') as f:
+                    digest.update(f.read())
+    return digest.hexdigest()
+
+def _state_handles(root):
+    """Variables under root by path relative to root, and the parameter values."""
+    if root._path not in _handles:
+        import cocotb.handle
+
+        prefix = root._path + '.'
+        variables = {}
+        parameters = {}
+        for handle in walk(root, memories=True, constants=True):
+            path = handle._path[len(prefix):] if handle._path.startswith(prefix) else handle._path
+            if isinstance(handle, cocotb.handle.ConstantObject):
+                parameters[path] = str(handle.value)
+            elif handle._type in _VARIABLES:
+                variables[path] = handle
+        _handles[root._path] = (variables, parameters)
+    return _handles[root._path]
+
+def _read(handle):
+    value = handle.value
+    return value if isinstance(value, int) else value.binstr
+
+def _write(handle, value):
+    if isinstance(value, str):
+        from cocotb.binary import BinaryValue
+        value = BinaryValue(value, n_bits=len(value))
+    handle.value = value
+
+class Snapshot:
+    def __init__(self, state, inputs, result=None, sim_time_ns=0, wall_seconds=0.0):
+        self.state = state
+        self.inputs = inputs
+        self.result = result
+        self.sim_time_ns = sim_time_ns
+        self.wall_seconds = wall_seconds
+
+    @classmethod
+    def capture(cls, root, inputs=(), **kwargs):
+        """Read every variable under root and the named inputs. Call from a ReadOnly phase."""
+        variables, _ = _state_handles(root)
+        state = {path: _read(handle) for path, handle in variables.items()}
+        return cls(state, {name: _read(getattr(root, name)) for name in inputs}, **kwargs)
+
+    def restore(self, root):
+        """Deposit the captured values. Call away from the clock edge the design samples on."""
+        variables, _ = _state_handles(root)
+        missing = set(self.state) - set(variables)
+        if missing:
+            raise ValueError(f'Snapshot does not match the design, missing {sorted(missing)[:5]}')
+        for name, value in self.inputs.items():
+            _write(getattr(root, name), value)
+        for path, value in self.state.items():
+            _write(variables[path], value)
+
+    def to_json(self):
+        return {
+            'state': self.state,
+            'inputs': self.inputs,
+            'result': self.result,
+            'sim_time_ns': self.sim_time_ns,
+            'wall_seconds': self.wall_seconds,
+        }
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self.to_json(), f)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls(**json.load(f))
+
+def snapshot_key(root, name, warm_up, key=()):
+    """Cache key for the state warm_up leaves root in."""
+    import cocotb
+
+    _, parameters = _state_handles(root)
+    try:
+        source = inspect.getsource(warm_up)
+    except (OSError, TypeError):
+        source = getattr(warm_up, '__qualname__', repr(warm_up))
+    material = json.dumps([
+        rtl_hash(),
+        cocotb.SIM_NAME,
+        cocotb.SIM_VERSION,
+        root._name,
+        sorted(parameters.items()),
+        name,
+        source,
+        [str(part) for part in key],
+    ])
+    return hashlib.sha256(material.encode()).hexdigest()
+
+async def warm_start(root, clock, name, warm_up, inputs=(), key=(), refresh=REFRESH):
+    """
+    Bring root to the state the coroutine function warm_up leaves it in.
+
+    With SNAPSHOT unset this just runs warm_up. Otherwise a cached snapshot
+    is restored if there is one, and the warm-up is run and captured if not
+    or if refresh is set. Either way the call returns just after a rising edge of clock, with
+    whatever warm_up returned.
+    """
+    from cocotb.triggers import FallingEdge, ReadOnly, RisingEdge
+    from cocotb.utils import get_sim_time
+
+    if not ENABLED:
+        result = await warm_up()
+        await RisingEdge(clock)
+        return result
+
+    log = logging.getLogger('sim_snapshot')
+    path = os.path.join(DIRECTORY, f'{root._name}-{name}-{snapshot_key(root, name, warm_up, key)[:16]}.json')
+    snapshot = None
+    if not refresh:
+        snapshot = _snapshots.get(path)
+        if snapshot is None and os.path.exists(path):
+            snapshot = _snapshots[path] = Snapshot.load(path)
+
+    if snapshot is not None:
+        await FallingEdge(clock)
+        snapshot.restore(root)
+        await RisingEdge(clock)
+        log.info(
+            f"Restored '{name}' from {path}, skipping {snapshot.sim_time_ns:.0f} ns "
+            f"({snapshot.wall_seconds:.2f} s) of warm-up"
+        )
+        return snapshot.result
+
+    start_ns = get_sim_time('ns')
+    start = time.time()
+    result = await warm_up()
+    await FallingEdge(clock)
+    await ReadOnly()
+    snapshot = Snapshot.capture(
+        root, inputs,
+        result=result,
+        sim_time_ns=get_sim_time('ns') - start_ns,
+        wall_seconds=time.time() - start,
+    )
+    snapshot.save(path)
+    _snapshots[path] = snapshot
+    await RisingEdge(clock)
+    log.info(f"Captured '{name}' to {path}")
+    return result